@@ -0,0 +1,138 @@
+"""Benchmark of the tournament match loop before and after the hook API.
+
+Usage (from the repository root):
+    python benchmarks/round_hooks.py [--rounds N] [--repeat K]
+
+Compares TournamentSimulation._run_match without hooks and with a single no-op round
+hook against a copy of _run_match as it was before hooks were added (bots asked and
+scored in one loop, logged to a file the same way). The variants take turns after a
+warm-up pass, the best of K runs is reported per round and match logs go to a
+temporary directory.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation.match_engine import decide, load_bot_class
+from simulation.results_store import ResultsStore
+from simulation.simulate_tournament import TournamentSimulation
+from utils.game_config import RunConfig
+from utils.moves import Move
+
+BOTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bots', 'prebuilt')
+
+
+def pre_hook_run_match(bot1, bot2, rounds, tournament_dir, config):
+    """_run_match before the hook API, without fast-forwarding (which the benchmark does not use)."""
+    payoffs = config.payoff_table()
+    bot1 = bot1.__class__.create(config)
+    bot2 = bot2.__class__.create(config)
+    scores = {bot1.name: 0, bot2.name: 0}
+    stats = {'mutual_cooperation': 0, 'mutual_defection': 0, 'betrayals': {bot1.name: 0, bot2.name: 0}}
+    output_lines = [
+        "="*50,
+        f"MATCH RESULTS - {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        f"Bot 1: {bot1.name}",
+        f"Bot 2: {bot2.name}",
+        "="*50,
+        "",
+        "ROUND HISTORY:",
+        f"{'Round':^6} | {'Bot 1':^10} | {'Bot 2':^10} | {'Round Result':^12} | {'Current Score':^12}",
+        "-"*60
+    ]
+    for round_num in range(rounds):
+        move1 = decide(bot1)
+        move2 = decide(bot2)
+        bot1.opponent_history.append(move2)
+        bot1.my_history.append(move1)
+        bot2.opponent_history.append(move1)
+        bot2.my_history.append(move2)
+
+        score1, score2 = payoffs[move1, move2]
+        round_result = f"{score1:^2} - {score2:^2}"
+        scores[bot1.name] += score1
+        scores[bot2.name] += score2
+        if move1 == Move.COOPERATE and move2 == Move.COOPERATE:
+            stats['mutual_cooperation'] += 1
+        elif move1 == Move.COOPERATE and move2 == Move.DEFECT:
+            stats['betrayals'][bot2.name] += 1
+        elif move1 == Move.DEFECT and move2 == Move.COOPERATE:
+            stats['betrayals'][bot1.name] += 1
+        else:
+            stats['mutual_defection'] += 1
+        current_score = f"{scores[bot1.name]:^5} - {scores[bot2.name]:^5}"
+        output_lines.append(f"{round_num+1:^6} | {move1.name:^10} | {move2.name:^10} | {round_result:^12} | {current_score}")
+
+    output_lines.extend([
+        "\nMATCH STATISTICS:",
+        "-"*50,
+        f"Total Rounds: {rounds}",
+        f"Mutual Cooperation: {stats['mutual_cooperation']} ({stats['mutual_cooperation']/rounds*100:.1f}%)",
+        f"Mutual Defection: {stats['mutual_defection']} ({stats['mutual_defection']/rounds*100:.1f}%)",
+        f"Betrayals by {bot1.name}: {stats['betrayals'][bot1.name]} ({stats['betrayals'][bot1.name]/rounds*100:.1f}%)",
+        f"Betrayals by {bot2.name}: {stats['betrayals'][bot2.name]} ({stats['betrayals'][bot2.name]/rounds*100:.1f}%)",
+        "",
+        "FINAL SCORES:",
+        "-"*50,
+        f"{bot1.name}: {scores[bot1.name]}",
+        f"{bot2.name}: {scores[bot2.name]}",
+        "="*50
+    ])
+    with open(os.path.join(tournament_dir, f"{bot1.name}_vs_{bot2.name}.txt"), 'w') as f:
+        f.write('\n'.join(output_lines))
+    return {'scores': scores, 'mutual_cooperation': stats['mutual_cooperation'],
+            'mutual_defection': stats['mutual_defection'], 'betrayals': stats['betrayals']}
+
+
+def no_op_hook(bot1, bot2, round_index, move1, move2):
+    pass
+
+
+def best_times(variants, bot_classes, config, repeat):
+    """Best time of every variant, running the variants in turn so drift and warm-up hit all alike."""
+    best = [None] * len(variants)
+    for attempt in range(repeat + 1):  # The first pass only warms up
+        for index, (_, run) in enumerate(variants):
+            bot1, bot2 = (bot_class.create(config) for bot_class in bot_classes)
+            start = time.perf_counter()
+            run(bot1, bot2)
+            elapsed = time.perf_counter() - start
+            if attempt and (best[index] is None or elapsed < best[index]):
+                best[index] = elapsed
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cost of round hooks in the match loop.")
+    parser.add_argument('--rounds', type=int, default=200000, help="rounds per match (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=7, help="runs per variant, best is kept (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    config = RunConfig.from_game_config(number_of_rounds=args.rounds)
+    bot_classes = [load_bot_class(os.path.join(BOTS_DIR, name)) for name in ("tit_for_tat.py", "grudge_bot.py")]
+    tournament_dir = tempfile.mkdtemp(prefix="round_hooks_")
+    results_store = ResultsStore(os.path.join(tournament_dir, 'results.db'))
+    plain = TournamentSimulation(results_store=results_store, config=config)
+    hooked = TournamentSimulation(results_store=results_store, config=config)
+    hooked.hooks.on_round(no_op_hook)
+    variants = [
+        ("_run_match before hooks", lambda b1, b2: pre_hook_run_match(b1, b2, args.rounds, tournament_dir, config)),
+        ("_run_match, no hooks", lambda b1, b2: plain._run_match(b1, b2, args.rounds, tournament_dir, config)),
+        ("_run_match, 1 no-op hook", lambda b1, b2: hooked._run_match(b1, b2, args.rounds, tournament_dir, config)),
+    ]
+
+    print(f"Tit for Tat vs Grudge, {args.rounds} rounds, best of {args.repeat}")
+    times = best_times(variants, bot_classes, config, args.repeat)
+    baseline = times[0]
+    for (label, _), elapsed in zip(variants, times):
+        print(f"{label:<28} {elapsed * 1e9 / args.rounds:8.1f} ns/round  {(elapsed / baseline - 1) * 100:+6.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
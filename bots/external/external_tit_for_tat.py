@@ -0,0 +1,16 @@
+import os
+import sys
+from utils.external_bot import ExternalBot
+
+
+class ExternalTitForTatBot(ExternalBot):
+    # The program next to this file, run with the simulator's Python so it also works on Windows
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tit_for_tat")]
+
+    @property
+    def name(self) -> str:
+        return "External Tit for Tat Bot"
+
+    @property
+    def description(self) -> str:
+        return "Tit for Tat played by an external program over stdin/stdout"
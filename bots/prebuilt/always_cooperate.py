@@ -11,5 +11,8 @@ class AlwaysCooperateBot(AbstractBot):
     def description(self) -> str:
         return "A bot that always cooperates"
     
+    def state_snapshot(self):
+        return ()  # No state at all
+    
     def strategy(self, my_history: List[Move], opponent_history: List[Move], current_round: int, total_rounds: int) -> Move:
         return self.cooperate
\ No newline at end of file
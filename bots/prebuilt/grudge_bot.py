@@ -15,6 +15,9 @@ class GrudgeBot(AbstractBot):
     def description(self) -> str:
         return "A bot that never forgives betrayal"
     
+    def state_snapshot(self):
+        return (self.been_betrayed, tuple(self.opponent_history[-1:]))
+    
     def strategy(self, my_history: List[Move], opponent_history: List[Move], current_round: int, total_rounds: int) -> Move:
         if not opponent_history:
             return self.cooperate
@@ -11,6 +11,9 @@ class TitForTatBot(AbstractBot):
     def description(self) -> str:
         return "A bot that copies opponent's last move"
     
+    def state_snapshot(self):
+        return tuple(self.opponent_history[-1:])  # Only the last opponent move matters
+    
     def strategy(self, my_history: List[Move], opponent_history: List[Move], current_round: int, total_rounds: int) -> Move:
         if not opponent_history:
             return self.cooperate
@@ -2,9 +2,15 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 import importlib.util
+import inspect
 from utils.abstract_bot import AbstractBot
+from utils.bot_index import BotIndex
 from simulation.simulate_tournament import TournamentSimulation
 from simulation.simulate_games import PrisonersDilemmaSimulation
+from simulation.batch_eval import format_result, record_result, shared_evaluator
+from simulation.watch import BotWatcher, format_report
+from simulation.results_store import ResultsStore
+from simulation.log_retention import read_run_file
 from .shared_style import Style
 
 class GameUI:
@@ -28,8 +34,10 @@ class GameUI:
         screen_height = parent.winfo_screenheight()
         
         # Initialize variables first
+        self.bot_index = BotIndex()
         self.available_bots = self.load_bots()
         self.filename_to_display = {}
+        self.bot_descriptions = {}  # Display name -> description, used by tooltips
         self.game_button = None
         self.tournament_button = None
         self.player2_path = None
@@ -37,6 +45,8 @@ class GameUI:
         self.bot_paths = []  # Add bot_paths as instance variable
         self.show_prebuilt = tk.BooleanVar(value=True)
         self.show_custom = tk.BooleanVar(value=True)
+        self.watcher = None  # BotWatcher while watch mode is on
+        self.watch_after_id = None
         
         # Configure parent frame to expand
         parent.grid_rowconfigure(1, weight=1)  # Changed from 0 to 1 to match the content row
@@ -402,23 +412,12 @@ class GameUI:
         )
         if filepath:
             try:
-                # Try to load the bot to verify it's valid
-                spec = importlib.util.spec_from_file_location("custom_bot", filepath)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-                
-                # Find the bot class
-                bot_class = None
-                for item in dir(module):
-                    obj = getattr(module, item)
-                    if isinstance(obj, type) and issubclass(obj, AbstractBot) and obj != AbstractBot:
-                        bot_class = obj
-                        break
-                
-                if bot_class:
-                    bot_instance = bot_class()
-                    display_name = f"{bot_instance.name} (Custom)"
+                entry = self.bot_index.get(filepath)
+                self.bot_index.save()
+                if entry:
+                    display_name = f"{entry['name']} (Custom)"
                     self.filename_to_display[display_name] = filepath
+                    self.bot_descriptions[display_name] = entry['description'] or "Custom bot"
                     self.bot_paths.append(filepath)  # Add to bot paths
                     if self.show_custom.get():  # Only add to listbox if custom bots are shown
                         self.bot_listbox.insert(tk.END, display_name)
@@ -462,7 +461,7 @@ class GameUI:
             self.player1_path.set(filename)
 
     def load_bots(self):
-        """Load bot classes from the bots directory and its immediate subfolders"""
+        """Load bot entries from the bots directory and its immediate subfolders using the bot index"""
         bots = {'prebuilt': {}, 'user_created': {}}
         bots_dir = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'bots'))
         
@@ -479,42 +478,16 @@ class GameUI:
             if not os.path.exists(directory):
                 os.makedirs(directory)
 
-        # Load bots from each directory
-        for entry in os.scandir(prebuilt_dir):
-            if entry.is_file() and entry.name.endswith('.py') and not entry.name.startswith('__'):
-                try:
-                    spec = importlib.util.spec_from_file_location(entry.name[:-3], entry.path)
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                    
-                    for item in dir(module):
-                        obj = getattr(module, item)
-                        if isinstance(obj, type) and issubclass(obj, AbstractBot) and obj != AbstractBot:
-                            bot_instance = obj()
-                            rel_path = os.path.relpath(entry.path, bots_dir)
-                            bots['prebuilt'][rel_path] = bot_instance
-                            break
-                except Exception as e:
-                    continue
-
-        # Load user-created bots
-        for entry in os.scandir(user_created_dir):
-            if entry.is_file() and entry.name.endswith('.py') and not entry.name.startswith('__'):
-                try:
-                    spec = importlib.util.spec_from_file_location(entry.name[:-3], entry.path)
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                    
-                    for item in dir(module):
-                        obj = getattr(module, item)
-                        if isinstance(obj, type) and issubclass(obj, AbstractBot) and obj != AbstractBot:
-                            bot_instance = obj()
-                            rel_path = os.path.relpath(entry.path, bots_dir)
-                            bots['user_created'][rel_path] = bot_instance
-                            break
-                except Exception as e:
-                    continue
+        # Cached entries are reused, so no bot code runs unless a file changed
+        for key, directory in [('prebuilt', prebuilt_dir), ('user_created', user_created_dir)]:
+            for path, entry in self.bot_index.scan(directory).items():
+                rel_path = os.path.relpath(path, bots_dir)
+                bots[key][rel_path] = entry
         
+        try:
+            self.bot_index.save()
+        except OSError:
+            pass  # Index is only a cache
         return bots
 
     def update_bot_dropdown(self):
@@ -537,9 +510,10 @@ class GameUI:
         # Show prebuilt bots
         if self.show_prebuilt.get():
             for rel_path, bot in self.available_bots['prebuilt'].items():
-                display_name = bot.name
+                display_name = bot['name']
                 full_path = os.path.join(bots_dir, rel_path)
                 self.filename_to_display[display_name] = rel_path
+                self.bot_descriptions[display_name] = bot['description']
                 self.bot_paths.append(full_path)
                 self.bot_listbox.insert(tk.END, display_name)
         
@@ -547,9 +521,10 @@ class GameUI:
         if self.show_custom.get():
             # Add bots from user-created folder
             for rel_path, bot in self.available_bots['user_created'].items():
-                display_name = f"{bot.name} (User)"
+                display_name = f"{bot['name']} (User)"
                 full_path = os.path.join(bots_dir, rel_path)
                 self.filename_to_display[display_name] = rel_path
+                self.bot_descriptions[display_name] = bot['description']
                 self.bot_paths.append(full_path)
                 self.bot_listbox.insert(tk.END, display_name)
             
@@ -586,24 +561,7 @@ class GameUI:
         index = self.bot_listbox.nearest(event.y)
         if index >= 0:
             bot_name = self.bot_listbox.get(index)
-            filename = self.filename_to_display.get(bot_name)
-            
-            # Get description
-            description = ""
-            if "(Custom)" in bot_name:
-                try:
-                    spec = importlib.util.spec_from_file_location("custom_bot", filename)
-                    module = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(module)
-                    for item in dir(module):
-                        obj = getattr(module, item)
-                        if isinstance(obj, type) and issubclass(obj, AbstractBot) and obj != AbstractBot:
-                            description = obj().description
-                            break
-                except:
-                    description = "Custom bot"
-            elif filename in self.available_bots:
-                description = self.available_bots[filename].description
+            description = self.bot_descriptions.get(bot_name, "")
             
             # Create or update tooltip
             if description:
@@ -649,44 +607,26 @@ class GameUI:
         self.log_text.update_idletasks()
 
     def read_latest_log(self, summary_type="game"):
-        """Read the latest log file of specified type"""
-        logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+        """Read the latest log file of specified type, as recorded in the results database"""
         try:
-            # Get all directories sorted by creation time
-            dirs = [d for d in os.listdir(logs_dir) if os.path.isdir(os.path.join(logs_dir, d))]
-            if not dirs:
-                return "No log directories found"
-                
-            # Find latest directory based on type
-            if summary_type == "tournament":
-                tournament_dirs = [d for d in dirs if "tournament" in d]
-                if not tournament_dirs:
-                    return "No tournament logs found"
-                latest_dir = max(tournament_dirs, key=lambda d: d.split('_')[0])
-                filepath = os.path.join(logs_dir, latest_dir, "tournament_summary.txt")
+            run = ResultsStore().latest_run("tournament" if summary_type == "tournament" else "games")
+            if run is None:
+                return "No tournament logs found" if summary_type == "tournament" else "No game logs found"
+
+            if summary_type == "game":
+                # Latest vs file of the latest games run
+                matches = ResultsStore().run_matches(run['id'])
+                if not matches or not matches[-1]['log_file']:
+                    return "No game logs found in directory"
+                filename = matches[-1]['log_file']
             else:
-                # For game or games_summary
-                game_dirs = [d for d in dirs if "games" in d]
-                if not game_dirs:
-                    return "No game logs found"
-                latest_dir = max(game_dirs, key=lambda d: d.split('_')[0])
-                if summary_type == "game":
-                    # Find latest vs file
-                    game_files = [f for f in os.listdir(os.path.join(logs_dir, latest_dir)) 
-                                if f.endswith('.txt') and '_vs_' in f]
-                    if not game_files:
-                        return "No game logs found in directory"
-                    latest_file = max(game_files, key=lambda f: os.path.getmtime(
-                        os.path.join(logs_dir, latest_dir, f)))
-                    filepath = os.path.join(logs_dir, latest_dir, latest_file)
-                else:
-                    filepath = os.path.join(logs_dir, latest_dir, "games_summary.txt")
+                filename = run['summary_file']
                     
-            # Read and return the content
-            if os.path.exists(filepath):
-                with open(filepath, 'r') as f:
-                    return f.read()
-            return f"Log file not found: {filepath}"
+            # Read and return the content, packed runs are read from their archive
+            try:
+                return read_run_file(run['directory'], filename)
+            except (OSError, KeyError):
+                return f"Log file not found: {os.path.join(run['directory'], filename)}"
             
         except Exception as e:
             return f"Error reading log: {str(e)}"
@@ -704,21 +644,42 @@ class GameUI:
             return
 
         try:
-            simulation = PrisonersDilemmaSimulation(player1_bot)
             if self.mode == "game":
-                simulation.run_games([opponents[0]])
+                PrisonersDilemmaSimulation(player1_bot).run_games([opponents[0]])
                 self.update_log(self.read_latest_log("game"))
             else:
-                # For multiple test mode
-                simulation.run_games(opponents)
-                # Force a small delay to ensure file is written
-                self.parent.after(100)  
-                self.update_log(self.read_latest_log("games_summary"))
+                # For multiple test mode: log-free evaluation on the warm worker pool, saved as a games run
+                result = shared_evaluator().evaluate(player1_bot, opponents)
+                record_result(result)
+                self.update_log(format_result(result))
                 self.center_frame.update_idletasks()  # Force UI update
                     
         except Exception as e:
             tk.messagebox.showerror("Error", f"Simulation failed: {str(e)}")
 
+    def set_watching(self, enabled):
+        """Turn watch mode on or off: re-test the player bot whenever its file changes."""
+        if not enabled:
+            if self.watch_after_id:
+                self.parent.after_cancel(self.watch_after_id)
+            self.watcher = self.watch_after_id = None
+            return True
+        if not self.player1_path.get():
+            tk.messagebox.showerror("Error", "Please select Player bot")
+            return False
+        self.watcher = BotWatcher([self.player1_path.get()], self.get_selected_bots(), evaluator=shared_evaluator())
+        self.poll_watcher()
+        return True
+
+    def poll_watcher(self):
+        # Follow the current selection; the watcher only re-runs what changed
+        self.watcher.paths = [self.player1_path.get()]
+        self.watcher.opponent_paths = self.get_selected_bots()
+        reports = self.watcher.poll() if self.watcher.opponent_paths else []
+        if reports:
+            self.update_log("\n\n".join(format_report(report) for report in reports))
+        self.watch_after_id = self.parent.after(int(self.watcher.interval * 1000), self.poll_watcher)
+
     def load_bot(self, bot_path):
         """Load a bot from a file path."""
         try:
@@ -728,7 +689,7 @@ class GameUI:
             
             for item in dir(module):
                 obj = getattr(module, item)
-                if isinstance(obj, type) and issubclass(obj, AbstractBot) and obj != AbstractBot:
+                if isinstance(obj, type) and issubclass(obj, AbstractBot) and not inspect.isabstract(obj):
                     return obj()
             raise ValueError("No valid bot class found in file")
         except Exception as e:
@@ -79,6 +79,15 @@ class MultipleTestScreen:
                            command=self.back_to_menu,
                            **Style.button_style())
         back_btn.grid(row=0, column=0, padx=5)
+
+        # Watch toggle: re-test the player bot whenever its file is saved
+        self.watching = tk.BooleanVar(value=False)
+        watch_check = ttk.Checkbutton(button_frame,
+                                      text="Re-test on save",
+                                      variable=self.watching,
+                                      command=self.toggle_watch,
+                                      style='Custom.TCheckbutton')
+        watch_check.grid(row=0, column=1, padx=5, sticky="e")
         
         # Start button on right with shared style
         start_btn = tk.Button(button_frame,
@@ -98,7 +107,12 @@ class MultipleTestScreen:
         self.game_ui.log_text.update_idletasks()
         self.game_ui.start_games()
 
+    def toggle_watch(self):
+        if not self.game_ui.set_watching(self.watching.get()):
+            self.watching.set(False)
+
     def back_to_menu(self):
+        self.game_ui.set_watching(False)
         from interface.menu_screen import MenuScreen  # Changed from relative to absolute import
         for widget in self.root.winfo_children():
             widget.destroy()
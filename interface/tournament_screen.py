@@ -1,14 +1,25 @@
 import tkinter as tk
 from tkinter import ttk
 import os
+import queue
+import threading
 from interface.game_ui import GameUI
 from interface.menu_screen import MenuScreen
 from simulation.simulate_tournament import TournamentSimulation
+from simulation.log_retention import read_run_file
 from .shared_style import Style
 
 class TournamentScreen:
+    # Milliseconds between leaderboard refreshes; events arriving in between are applied in one batch
+    LEADERBOARD_INTERVAL = 250
+
+    # Number of bots shown on the live leaderboard
+    LEADERBOARD_ROWS = 40
+
     def __init__(self, root):
         self.root = root
+        self.events = queue.Queue()  # Tournament events posted by the worker thread
+        self.running = False
         self.root.state('zoomed')
         self.root.title("Tournament Mode")
         self.root.configure(bg=Style.COLORS['bg'])
@@ -95,7 +106,7 @@ class TournamentScreen:
         back_btn.grid(row=0, column=0, padx=5)
         
         # Tournament button on right with shared style
-        start_btn = tk.Button(button_frame,
+        self.start_btn = start_btn = tk.Button(button_frame,
                             text="Start Tournament",
                             command=self.start_tournament,
                             **Style.button_style())
@@ -107,6 +118,8 @@ class TournamentScreen:
             btn.bind('<Leave>', lambda e, b=btn: b.configure(bg=Style.COLORS['button']))
         
     def start_tournament(self):
+        if self.running:
+            return
         selected_indices = self.game_ui.bot_listbox.curselection()
         if len(selected_indices) < 2:
             self.game_ui.log_text.delete(1.0, tk.END)
@@ -115,22 +128,81 @@ class TournamentScreen:
         
         selected_bot_paths = self.game_ui.get_selected_bots()
         self.game_ui.log_text.delete(1.0, tk.END)
+        self.game_ui.log_text.insert(tk.END, "Starting tournament...\n")
         self.game_ui.log_text.update_idletasks()
         
-        # Start tournament and display summary in widget
+        # Run the tournament on a worker thread; it only posts events, the UI thread renders them
         tournament = TournamentSimulation()
+        tournament.add_observer(self.events.put)
+        self.running = True
+        self.leaderboard = {}
+        self.progress = (0, 0)
+        self.start_btn.configure(state=tk.DISABLED)
+        threading.Thread(target=self._run_tournament, args=(tournament, selected_bot_paths), daemon=True).start()
+        self.root.after(self.LEADERBOARD_INTERVAL, self._drain_events)
+
+    def _run_tournament(self, tournament, bot_paths):
+        try:
+            tournament.run_all_against_all(bot_paths, visualize=False)
+        except Exception as e:
+            self.events.put({'type': 'error', 'message': str(e)})
+
+    def _drain_events(self):
+        """Apply all queued events, then redraw the leaderboard once."""
+        if not self.game_ui.log_text.winfo_exists():
+            return  # Screen was left while the tournament runs
+        changed = False
+        finished = None
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event['type'] == 'tournament_started':
+                self.leaderboard = {name: [0, 0] for name in event['bots']}
+                self.progress = (0, event['total_matches'])
+                changed = True
+            elif event['type'] == 'match_finished':
+                self.leaderboard.update(event['totals'])
+                self.progress = (event['done'], event['total'])
+                changed = True
+            elif event['type'] in ('tournament_finished', 'error'):
+                finished = event
+
+        if finished:
+            self._finish_tournament(finished)
+            return
+        if changed:
+            self._render_leaderboard()
+        self.root.after(self.LEADERBOARD_INTERVAL, self._drain_events)
+
+    def _render_leaderboard(self):
+        done, total = self.progress
+        standings = sorted(self.leaderboard.items(),
+                           key=lambda item: item[1][0] / item[1][1] if item[1][1] else 0, reverse=True)
+        name_width = max([len(name) for name in self.leaderboard] + [3])
+        lines = [f"LIVE LEADERBOARD - {done}/{total} matches", "",
+                 f"{'#':>3}  {'Bot'.ljust(name_width)}  {'Matches':>7}  {'Avg score':>9}"]
+        for rank, (name, (score, matches)) in enumerate(standings[:self.LEADERBOARD_ROWS], 1):
+            average = score / matches if matches else 0
+            lines.append(f"{rank:>3}  {name.ljust(name_width)}  {matches:>7}  {average:>9.1f}")
+        if len(standings) > self.LEADERBOARD_ROWS:
+            lines.append(f"... {len(standings) - self.LEADERBOARD_ROWS} more")
+
+        self.game_ui.log_text.delete(1.0, tk.END)
+        self.game_ui.log_text.insert(tk.END, "\n".join(lines))
+
+    def _finish_tournament(self, event):
+        self.running = False
+        self.start_btn.configure(state=tk.NORMAL)
+        if event['type'] == 'error':
+            self.game_ui.log_text.delete(1.0, tk.END)
+            self.game_ui.log_text.insert(tk.END, f"Error during tournament: {event['message']}\n")
+            return
         try:
-            # Run tournament with visualization disabled
-            tournament_dir = tournament.run_all_against_all(selected_bot_paths, visualize=False)
-            
-            # Add delay to ensure files are written
-            self.root.after(100)
-            
             # Read and display tournament summary
-            with open(os.path.join(tournament_dir, "tournament_summary.txt"), 'r') as f:
-                summary = f.read()
-                self.game_ui.update_log(summary)
-                
+            summary = read_run_file(event['directory'], "tournament_summary.txt")
+            self.game_ui.update_log(summary)
         except Exception as e:
             self.game_ui.log_text.delete(1.0, tk.END)
             self.game_ui.log_text.insert(tk.END, f"Error during tournament: {str(e)}\n")
@@ -1,6 +1,9 @@
+import io
+import os
 import tkinter as tk
 from tkinter import font
 import pandas as pd
+from simulation.log_retention import read_run_file
 from .shared_style import Style
 
 class TournamentVisualizer:
@@ -9,7 +12,12 @@ class TournamentVisualizer:
         self.BOT_WIDTH = 500
         self.SCORE_WIDTH = 150
         
-        self.df = pd.read_csv(csv_path)
+        if os.path.exists(csv_path):
+            self.df = pd.read_csv(csv_path)
+        else:
+            # Run was packed into an archive by the log retention policy
+            csv_text = read_run_file(os.path.dirname(csv_path), os.path.basename(csv_path))
+            self.df = pd.read_csv(io.StringIO(csv_text))
         self.df = self.df.sort_values('Average', ascending=False)
         self.current_index = 0
         
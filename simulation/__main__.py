@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Bots import `utils...` absolutely, so the repository root has to be importable
+# no matter where `python -m simulation` is started from.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation.cli import main
+
+sys.exit(main())
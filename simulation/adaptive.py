@@ -0,0 +1,87 @@
+"""Per-bot score estimates for adaptive sampling tournaments.
+
+A bot's round-robin result is the average of its scores against all n - 1 other bots.
+Playing a uniform sample of those opponents estimates that average; the confidence
+interval uses the sample variance with a finite population correction, so it shrinks
+to zero once a bot has met every opponent.
+"""
+import math
+import random
+from statistics import NormalDist
+
+
+class ScoreEstimates:
+    """Running match scores of every bot, indexed by bot position."""
+
+    def __init__(self, bot_count, confidence=0.95, rng=None):
+        self.bot_count = bot_count
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.rng = rng or random.Random()
+        self.sums = [0] * bot_count
+        self.squares = [0] * bot_count
+        self.counts = [0] * bot_count
+        self.played = set()  # frozenset({i, j}) of every pair that has met
+
+    def add_match(self, i, j, score_i, score_j):
+        for bot, score in ((i, score_i), (j, score_j)):
+            self.sums[bot] += score
+            self.squares[bot] += score * score
+            self.counts[bot] += 1
+        self.played.add(frozenset((i, j)))
+
+    def mean(self, i):
+        return self.sums[i] / self.counts[i] if self.counts[i] else 0
+
+    def half_width(self, i):
+        """Half width of the confidence interval of bot i's round-robin average."""
+        count = self.counts[i]
+        population = self.bot_count - 1
+        if count >= population:
+            return 0.0
+        if count < 2:
+            return math.inf
+        variance = max(0.0, (self.squares[i] - self.sums[i] ** 2 / count) / (count - 1))
+        correction = math.sqrt((population - count) / (population - 1))
+        return self.z * math.sqrt(variance / count) * correction
+
+    def bounds(self, i):
+        half_width = self.half_width(i)
+        return self.mean(i) - half_width, self.mean(i) + half_width
+
+    def ranking(self):
+        """Bot positions ordered by estimated average, best first."""
+        return sorted(range(self.bot_count), key=lambda i: -self.mean(i))
+
+    def unplayed_opponents(self, i):
+        return [j for j in range(self.bot_count) if j != i and frozenset((i, j)) not in self.played]
+
+    def uncertain(self, top_k):
+        """Bots whose interval still overlaps the boundary between the top k and the rest.
+
+        An empty list means the top-k set is separated at the configured confidence.
+        """
+        ranking = self.ranking()
+        top, rest = ranking[:top_k], ranking[top_k:]
+        if not top or not rest:
+            return []
+        lowest_top = min(self.bounds(i)[0] for i in top)
+        highest_rest = max(self.bounds(i)[1] for i in rest)
+        return ([i for i in top if self.bounds(i)[0] <= highest_rest]
+                + [i for i in rest if self.bounds(i)[1] >= lowest_top])
+
+    def next_pair(self, top_k, min_matches):
+        """Pick the next match to play, or None when sampling should stop.
+
+        Bots with fewer than min_matches matches come first; after that the uncertain bot
+        with the widest interval plays a uniformly drawn opponent it has not met yet.
+        """
+        warm_up = [i for i in range(self.bot_count) if self.counts[i] < min_matches and self.unplayed_opponents(i)]
+        if warm_up:
+            candidates = warm_up
+        else:
+            candidates = [i for i in self.uncertain(top_k) if self.unplayed_opponents(i)]
+            if not candidates:
+                return None
+        widest = max(self.half_width(i) for i in candidates)
+        bot = self.rng.choice([i for i in candidates if self.half_width(i) == widest])
+        return bot, self.rng.choice(self.unplayed_opponents(bot))
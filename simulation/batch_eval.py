@@ -0,0 +1,270 @@
+"""Fast evaluation of one candidate bot against many opponents, without logs.
+
+    evaluator = BatchEvaluator()
+    result = evaluator.evaluate("bots/user-created/your_bot.py", opponent_paths)
+
+The evaluator keeps a process pool alive between evaluate() calls. Every worker
+caches the bot classes it has loaded, keyed by path and modification time, so
+opponents stay warm across calls. An edited candidate file is simply loaded again.
+Matches are spread over the workers and played with the log-free match engine
+(matches with external-program bots concurrently, see simulation.external_matches).
+evaluate() can also reuse the results of a cache dict. Its keys cover the contents
+of both bot files, the config and the match seed, so only pairs whose code changed
+are played again. record_result() saves a result as a games run, with its summary
+file and matches in the results database, like a logged run of the same games.
+
+The result is a plain dict:
+
+    bot, config, seconds, cached (number of matches taken from the cache)
+    matches         one dict per opponent, in the order given: opponent, path, rounds,
+                    score, opponent_score, mutual_cooperation, mutual_defection,
+                    betrayals, opponent_betrayals, and forfeit/error if a bot failed
+                    (an opponent that cannot be loaded has only path and error)
+    total_score, opponent_total_score, average_score, average_opponent_score
+"""
+import atexit
+import hashlib
+import os
+import random
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from simulation.checkpoint import BotError
+from simulation.log_retention import apply_configured_retention, create_run_dir
+from simulation.match_engine import count_outcomes, forfeit_scores, load_bot_class, play_match, score_outcomes
+from simulation.results_store import ResultsStore
+from utils.external_bot import is_external
+from utils.game_config import RunConfig
+
+# Loaded bot classes of the current (worker) process: path -> (mtime, class)
+_BOT_CLASSES = {}
+
+_SHARED = None
+
+
+def _bot_class(path):
+    mtime = os.stat(path).st_mtime_ns
+    cached = _BOT_CLASSES.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = _BOT_CLASSES[path] = (mtime, load_bot_class(path))
+    return cached[1]
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _play_tasks(candidate_path, tasks, config):
+    """Play (index, opponent path, rounds, seed) tasks; return (index, match dict) pairs.
+
+    Matches with an external-program bot are played concurrently (see
+    simulation.external_matches), the others one after another.
+    """
+    candidate = _bot_class(candidate_path)
+    candidate_name = candidate().name
+    results = []
+    loaded = []
+    for index, path, rounds, seed in tasks:
+        try:
+            loaded.append((index, path, rounds, seed, _bot_class(path)))
+        except Exception as e:
+            results.append((index, {'path': path, 'error': str(e)}))
+
+    external = [task for task in loaded if is_external(candidate) or is_external(task[4])]
+    outcomes = {}
+    if external:
+        from simulation.external_matches import play_matches  # asyncio, only for external bots
+
+        played = play_matches([(candidate, opponent, rounds) for _, _, rounds, _, opponent in external], config)
+        outcomes = {task[0]: outcome for task, outcome in zip(external, played)}
+
+    for index, path, rounds, seed, opponent in loaded:
+        match = {'opponent': opponent().name, 'path': path, 'rounds': rounds}
+        if seed is not None:
+            random.seed(seed)
+        try:
+            if index in outcomes:
+                if isinstance(outcomes[index], BotError):
+                    raise outcomes[index]
+                moves1, moves2 = outcomes[index]
+            else:
+                moves1, moves2 = play_match(candidate, opponent, rounds, config)
+            stats = score_outcomes(count_outcomes(moves1, moves2), config)
+            match.update(score=stats['scores'][0], opponent_score=stats['scores'][1],
+                         mutual_cooperation=stats['mutual_cooperation'], mutual_defection=stats['mutual_defection'],
+                         betrayals=stats['betrayals1'], opponent_betrayals=stats['betrayals2'])
+        except BotError as e:
+            score, opponent_score = forfeit_scores(rounds, config, e.bot_name in (candidate_name, candidate.__name__))
+            match.update(score=score, opponent_score=opponent_score, mutual_cooperation=0, mutual_defection=0,
+                         betrayals=0, opponent_betrayals=0, forfeit=e.bot_name, error=str(e))
+        results.append((index, match))
+    return results
+
+
+class BatchEvaluator:
+    """Play a candidate bot against many opponents on a persistent pool of warm workers."""
+
+    def __init__(self, workers=None, config=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.config = config or RunConfig.from_game_config()
+        self._executor = None
+
+    def evaluate(self, candidate_path, opponent_paths, config=None, seed=None, cache=None):
+        """Play the candidate once against every opponent and return the result dict.
+
+        With a seed (falling back to config.seed), noisy match lengths and random bots
+        are reproducible; both are seeded per opponent file name, so adding or removing
+        an opponent does not change the other matches. Matches found in cache
+        (a dict, filled with the newly played ones) are not played again; only use a
+        cache with a seed, or random bots get stuck with their first result. Raises
+        ValueError if the candidate cannot be loaded.
+        """
+        start = time.perf_counter()
+        config = config or self.config
+        seed = config.seed if seed is None else seed
+        try:
+            candidate_name = _bot_class(candidate_path)().name
+        except Exception as e:
+            raise ValueError(str(e))
+
+        rounds = config.number_of_rounds
+        tasks = []
+        for index, path in enumerate(opponent_paths):
+            match_seed = zlib.crc32(f"{seed}:{os.path.basename(path)}".encode()) if seed is not None else None
+            match_rounds = rounds
+            if config.add_noise:
+                match_rounds = random.Random(match_seed).randint(int(rounds * 0.8), int(rounds * 1.2))
+            tasks.append((index, path, match_rounds, match_seed))
+
+        matches = [None] * len(tasks)
+        keys = {}
+        if cache is not None:
+            settings = tuple(sorted(config.as_dict().items()))
+            candidate_digest = file_digest(candidate_path)
+            for index, path, match_rounds, match_seed in tasks:
+                try:
+                    keys[index] = (candidate_digest, file_digest(path), match_rounds, match_seed, settings)
+                except OSError:
+                    continue  # Reported by the worker that fails to load it
+                if keys[index] in cache:
+                    matches[index] = dict(cache[keys[index]], path=path)
+        cached = sum(match is not None for match in matches)
+
+        for index, match in self._run(candidate_path, [task for task in tasks if matches[task[0]] is None], config):
+            matches[index] = match
+            if index in keys and 'score' in match:
+                cache[keys[index]] = match
+
+        played = [match for match in matches if 'score' in match]
+        total = sum(match['score'] for match in played)
+        opponent_total = sum(match['opponent_score'] for match in played)
+        return {
+            'bot': candidate_name,
+            'config': config.as_dict(),
+            'matches': matches,
+            'total_score': total,
+            'opponent_total_score': opponent_total,
+            'average_score': total / len(played) if played else 0,
+            'average_opponent_score': opponent_total / len(played) if played else 0,
+            'seconds': time.perf_counter() - start,
+            'cached': cached,
+        }
+
+    def _run(self, candidate_path, tasks, config):
+        if not tasks:
+            return []
+        if self.workers <= 1 or len(tasks) <= 1:
+            return _play_tasks(candidate_path, tasks, config)
+
+        # One interleaved chunk per worker keeps the inter-process traffic to a minimum
+        chunks = [tasks[k::self.workers] for k in range(self.workers) if tasks[k::self.workers]]
+        for attempt in range(2):
+            try:
+                futures = [self._pool().submit(_play_tasks, candidate_path, chunk, config) for chunk in chunks]
+                return [result for future in futures for result in future.result()]
+            except BrokenProcessPool:
+                # A bot took a worker down (e.g. os._exit); start a fresh pool and retry once
+                self.close()
+                if attempt:
+                    raise
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def shared_evaluator():
+    """The process-wide BatchEvaluator, so repeated evaluations reuse its warm workers."""
+    global _SHARED
+    if _SHARED is None:
+        _SHARED = BatchEvaluator()
+        atexit.register(_SHARED.close)
+    return _SHARED
+
+
+def format_result(result):
+    """Render a result dict as a text summary in the style of games_summary.txt."""
+    lines = ["=" * 50, "MULTIPLE GAMES SUMMARY", f"Player: {result['bot']}", "=" * 50, ""]
+    for match in result['matches']:
+        if 'score' not in match:
+            lines.extend([f"Could not load {match['path']}:", "-" * 30, match['error'], ""])
+            continue
+        lines.extend([
+            f"Against {match['opponent']}:",
+            "-" * 30,
+            f"Score: {match['score']} - {match['opponent_score']}",
+            f"Mutual Cooperation: {match['mutual_cooperation']}",
+            f"Mutual Defection: {match['mutual_defection']}",
+            f"Times Betrayed: {match['opponent_betrayals']}",
+            f"Times Betrayed Opponent: {match['betrayals']}",
+        ])
+        if match.get('forfeit'):
+            lines.append(f"Forfeited by {match['forfeit']}: {match['error']}")
+        lines.append("")
+
+    played = sum(1 for match in result['matches'] if 'score' in match)
+    lines.extend([
+        "",
+        "OVERALL STATISTICS",
+        "-" * 30,
+        f"Total Games: {played}",
+        f"Total Score: {result['total_score']} - {result['opponent_total_score']}",
+        f"Average Score: {result['average_score']:.1f} - {result['average_opponent_score']:.1f}",
+        f"Evaluated in {result['seconds'] * 1000:.0f} ms",
+    ])
+    return "\n".join(lines)
+
+
+def record_result(result, results_store=None, logs_dir=None):
+    """Save a result like a games run: a run directory with its games_summary.txt and
+    the played matches in the results database. Returns the run directory."""
+    logs_dir = logs_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+    results_store = results_store or ResultsStore(os.path.join(logs_dir, 'results.db'))
+    games_dir = create_run_dir(logs_dir, f"{datetime.now().strftime('%H%M%S')}_{result['bot']}_games")
+    run_id = results_store.start_run('games', games_dir, result['config'])
+    for match in result['matches']:
+        if 'score' in match:
+            results_store.record_match(
+                run_id, result['bot'], match['opponent'], match['rounds'],
+                (match['score'], match['opponent_score']), match['mutual_cooperation'],
+                match['mutual_defection'], match['betrayals'], match['opponent_betrayals'])
+    with open(os.path.join(games_dir, "games_summary.txt"), "w") as f:
+        f.write(format_result(result))
+    results_store.finish_run(run_id, summary_file="games_summary.txt")
+    apply_configured_retention(logs_dir, games_dir)
+    return games_dir
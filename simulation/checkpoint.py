@@ -0,0 +1,111 @@
+"""Append-only match journal that lets an interrupted tournament be resumed.
+
+The first line of journal.jsonl describes the tournament (bots, config, plan, shard,
+equivalence classes of deduplicated bots), every following line is the record of one
+finished match. Lines are flushed as they are written and synced to disk every
+GameConfig.CHECKPOINT_EVERY matches, so a crash loses at most the matches since the
+last sync. A torn last line is ignored on replay.
+"""
+import json
+import os
+from utils.game_config import GameConfig, RunConfig
+
+JOURNAL_FILE = "journal.jsonl"
+JOURNAL_FORMAT = 1
+
+
+class BotError(Exception):
+    """Raised when a bot fails during a match; bot_name is the bot at fault."""
+
+    def __init__(self, bot_name, error):
+        super().__init__(f"{bot_name}: {type(error).__name__}: {error}")
+        self.bot_name = bot_name
+        self.error = error
+
+
+def journal_path(tournament_dir):
+    return os.path.join(tournament_dir, JOURNAL_FILE)
+
+
+class MatchJournal:
+    """Writer for the journal of one tournament directory."""
+
+    def __init__(self, tournament_dir, checkpoint_every=None):
+        self.path = journal_path(tournament_dir)
+        self.checkpoint_every = checkpoint_every or GameConfig.CHECKPOINT_EVERY
+        self._file = open(self.path, 'a')
+        self._unsynced = 0
+
+    def write_header(self, bot_paths, bot_names, config, plan, shard=None, shard_dir=None, classes=None):
+        self._write({
+            'type': 'tournament',
+            'format': JOURNAL_FORMAT,
+            'bot_paths': [os.path.abspath(path) for path in bot_paths],
+            'bots': bot_names,
+            'config': config.as_dict(),
+            'plan': [list(match) for match in plan],
+            'shard': list(shard) if shard else None,
+            'shard_dir': shard_dir,
+            'classes': classes,
+        })
+        self.checkpoint()
+
+    def append(self, record):
+        self._write(dict(record, type='match'))
+        self._unsynced += 1
+        if self._unsynced >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Force everything written so far to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.checkpoint()
+            self._file.close()
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+
+
+def read_journal(tournament_dir):
+    """Replay a journal; return (header, {(i, j): record}) of the matches it holds.
+
+    Raises ValueError if the directory has no usable journal.
+    """
+    path = journal_path(tournament_dir)
+    if not os.path.exists(path):
+        raise ValueError(f"No {JOURNAL_FILE} in {tournament_dir}")
+
+    header = None
+    records = {}
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break  # Torn write of the last line before the crash
+            kind = entry.pop('type')
+            if kind == 'tournament':
+                header = entry
+            elif kind == 'match':
+                records[entry['i'], entry['j']] = entry
+
+    if header is None or header.get('format') != JOURNAL_FORMAT:
+        raise ValueError(f"{path} has no valid tournament header")
+    header['config'] = RunConfig(**header['config'])
+    header['plan'] = [tuple(match) for match in header['plan']]
+    return header, records
+
+
+def truncate_torn_line(tournament_dir):
+    """Drop a partially written last line so new entries start on a line of their own."""
+    path = journal_path(tournament_dir)
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
@@ -0,0 +1,428 @@
+"""Headless command-line runner for the simulator.
+
+Usage (from the repository root):
+    python -m simulation tournament bots/prebuilt
+    python -m simulation tournament --resume logs/123456_tournament
+    python -m simulation tournament --dedupe bots/prebuilt bots/user-created
+    python -m simulation tournament --move-noise 0.05 bots/prebuilt
+    python -m simulation multiple bots/user-created/your_bot.py bots/prebuilt
+    python -m simulation match bots/prebuilt/tit_for_tat.py bots/prebuilt/grudge_bot.py
+    python -m simulation evaluate bots/user-created/your_bot.py bots/prebuilt
+    python -m simulation watch bots/prebuilt
+    python -m simulation matrix --workers 8 bots/generated
+    python -m simulation serve --port 8765
+    python -m simulation generate 1000 --out bots/generated
+    python -m simulation preflight bots/user-created
+
+Only the simulators and their shared helpers are imported up front; every other
+command imports its module when it runs, and tkinter and pandas are pulled in lazily
+when --visualize is requested. Progress goes to stderr, the path of the
+results directory is printed to stdout (evaluate prints its result as JSON, watch
+its reports and serve nothing instead).
+"""
+import time
+
+_START = time.perf_counter()
+
+import argparse
+import json
+import os
+import sys
+
+from simulation.log_retention import apply_retention, create_run_dir, finish_run
+from simulation.metrics import METRICS_FILE, summary_line
+from simulation.simulate_games import PrisonersDilemmaSimulation
+from simulation.simulate_tournament import TournamentSimulation
+from simulation.sharding import parse_shard
+from utils.game_config import GameConfig, RunConfig
+
+LOGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs')
+USER_BOTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'bots', 'user-created')
+
+
+def expand_bot_paths(paths):
+    """Expand directories into the bot files they contain (sorted, skipping __init__ etc.)."""
+    bot_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            for entry in sorted(os.scandir(path), key=lambda e: e.name):
+                if entry.is_file() and entry.name.endswith('.py') and not entry.name.startswith('__'):
+                    bot_paths.append(entry.path)
+        else:
+            bot_paths.append(path)
+    return bot_paths
+
+
+def print_progress(done, total, label):
+    """Progress callback writing a single status line per match to stderr."""
+    print(f"[{done}/{total}] {label}", file=sys.stderr, flush=True)
+
+
+def probability(value):
+    p = float(value)
+    if not 0 <= p <= 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a probability between 0 and 1")
+    return p
+
+
+def build_parser():
+    # Options shared by every command, accepted after the command name
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--rounds', type=int, default=GameConfig.NUMBER_OF_ROUNDS,
+                        help="rounds per match (default: %(default)s)")
+    common.add_argument('--noise', action='store_true', default=GameConfig.ADD_NOISE,
+                        help="vary the number of rounds per match between 80%% and 120%%")
+    common.add_argument('--move-noise', type=probability, default=GameConfig.MOVE_NOISE, metavar="P",
+                        help="flip every intended move with probability P (trembling hand, default: %(default)s)")
+    common.add_argument('--seed', type=int, default=None, help="seed for noise draws (and random bots in sweeps)")
+    common.add_argument('--fast-forward', action='store_true', default=GameConfig.FAST_FORWARD,
+                        help="skip the rest of a match once two bots with bounded state repeat a joint state")
+    common.add_argument('--metrics', action='store_true',
+                        help="print a one-line throughput summary (from the run's metrics.json) to stderr")
+    common.add_argument('--quiet', action='store_true', help="do not print progress to stderr")
+
+    parser = argparse.ArgumentParser(prog="python -m simulation",
+                                     description="Run Prisoner's Dilemma simulations without the GUI.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    tournament = subparsers.add_parser('tournament', parents=[common], help="round-robin tournament between bots")
+    tournament.add_argument('bots', nargs='*', help="bot files or directories containing bots")
+    tournament.add_argument('--resume', metavar="DIR",
+                            help="continue the interrupted tournament in DIR from its journal (bots and options come from the journal)")
+    tournament.add_argument('--visualize', action='store_true',
+                            help="open the results visualizer when done (needs tkinter and pandas)")
+    tournament.add_argument('--shard', type=parse_shard, metavar="I/K",
+                            help="play only shard I of K (zero-based) and write a shard file instead of the summary")
+    tournament.add_argument('--shard-dir', help="directory for the shard file, e.g. a shared directory")
+    tournament.add_argument('--dedupe', action='store_true',
+                            help="fingerprint the bots and let behaviorally identical deterministic bots share their matches")
+    tournament.add_argument('--preflight', action='store_true',
+                            help="check the bots first and leave out the broken ones (report in the tournament directory)")
+    tournament.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="worker processes for --preflight (default: %(default)s)")
+
+    swiss = subparsers.add_parser('swiss', parents=[common], help="Swiss-system tournament for large fields")
+    swiss.add_argument('bots', nargs='+', help="bot files or directories containing bots")
+    swiss.add_argument('--swiss-rounds', type=int, default=None,
+                       help="number of Swiss rounds (default: ceil(log2(bots)) + 2)")
+    swiss.add_argument('--compare', action='store_true',
+                       help="also score a log-free round-robin and report the Kendall tau between the rankings")
+
+    adaptive = subparsers.add_parser('adaptive', parents=[common],
+                                     help="sample pairings until the top-k ranking is settled")
+    adaptive.add_argument('bots', nargs='+', help="bot files or directories containing bots")
+    adaptive.add_argument('--top-k', type=int, default=3, help="size of the ranking head to settle (default: %(default)s)")
+    adaptive.add_argument('--confidence', type=float, default=0.95,
+                          help="confidence level of the score intervals (default: %(default)s)")
+    adaptive.add_argument('--min-matches', type=int, default=3,
+                          help="matches every bot plays before sampling adapts (default: %(default)s)")
+    adaptive.add_argument('--max-matches', type=int, default=None, help="stop after this many matches")
+
+    matrix = subparsers.add_parser('matrix', parents=[common],
+                                   help="log-free round-robin for huge fields, results in memory-mapped matrices")
+    matrix.add_argument('bots', nargs='+', help="bot files or directories containing bots")
+    matrix.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: %(default)s)")
+    matrix.add_argument('--top', type=int, default=None,
+                        help="bots listed in the summary and results.csv (default: 50)")
+    matrix.add_argument('--visualize', action='store_true', help="show the top bots in the results visualizer")
+
+    merge = subparsers.add_parser('merge', help="merge tournament shard files into the usual results")
+    merge.add_argument('shards', nargs='+', help="shard files or directories containing them")
+    merge.add_argument('--quiet', action='store_true', help=argparse.SUPPRESS)
+
+    multiple = subparsers.add_parser('multiple', parents=[common], help="test one bot against multiple opponents")
+    multiple.add_argument('bot', help="bot file to test")
+    multiple.add_argument('opponents', nargs='+', help="opponent bot files or directories")
+
+    evaluate = subparsers.add_parser('evaluate', parents=[common],
+                                     help="play one bot against many opponents in parallel, without logs")
+    evaluate.add_argument('bot', help="bot file to test")
+    evaluate.add_argument('opponents', nargs='+', help="opponent bot files or directories")
+    evaluate.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                          help="worker processes (default: %(default)s)")
+
+    watch = subparsers.add_parser('watch', parents=[common], help="re-test bots against opponents whenever their files change")
+    watch.add_argument('opponents', nargs='+', help="opponent bot files or directories")
+    watch.add_argument('--watch', action='append', dest='watch_paths', metavar="PATH",
+                       help="bot file or directory to watch, repeatable (default: bots/user-created)")
+    watch.add_argument('--interval', type=float, default=0.25, help="seconds between checks (default: %(default)s)")
+    watch.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help="worker processes (default: %(default)s)")
+
+    serve = subparsers.add_parser('serve', help="HTTP service for bot uploads and queued simulation jobs")
+    serve.add_argument('--host', default='127.0.0.1', help="address to listen on (default: %(default)s)")
+    serve.add_argument('--port', type=int, default=8765, help="port to listen on (default: %(default)s)")
+    serve.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help="jobs run at the same time (default: %(default)s)")
+    serve.add_argument('--quiet', action='store_true', help=argparse.SUPPRESS)
+
+    match = subparsers.add_parser('match', parents=[common], help="single match between two bots")
+    match.add_argument('bot', help="first bot file")
+    match.add_argument('opponent', help="second bot file")
+
+    sweep = subparsers.add_parser('sweep', parents=[common], help="run a tournament for every config of a parameter grid")
+    sweep.add_argument('bots', nargs='+', help="bot files or directories containing bots")
+    sweep.add_argument('--grid', action='append', default=[], metavar="FIELD=V1,V2,...",
+                       help="values for a RunConfig field, e.g. betrayal_points=5,6 (repeatable)")
+    sweep.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help="worker processes (default: %(default)s)")
+
+    preflight = subparsers.add_parser('preflight', parents=[common],
+                                      help="check bots for errors, invalid moves, slowness and memory use before a run")
+    preflight.add_argument('bots', nargs='+', help="bot files or directories containing bots")
+    preflight.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                           help="worker processes (default: %(default)s)")
+
+    generate = subparsers.add_parser('generate', help="write synthetic bots for benchmarks and load tests")
+    generate.add_argument('count', type=int, help="number of bots")
+    generate.add_argument('--out', metavar="DIR", help="directory for the bot files (default: a new temp directory)")
+    generate.add_argument('--seed', type=int, default=0, help="generation seed (default: %(default)s)")
+    generate.add_argument('--mix', metavar="KIND=WEIGHT,...",
+                          help="relative share of each kind of bot (fsm, lookup, schedule, slow, memory; "
+                               "default: simulation.synthetic_bots.DEFAULT_MIX)")
+    generate.add_argument('--quiet', action='store_true', help=argparse.SUPPRESS)
+
+    prune = subparsers.add_parser('prune', help="apply a retention policy to the logs directory")
+    prune.add_argument('--keep', type=int, default=GameConfig.LOG_KEEP_RUNS,
+                       help="number of most recent runs to keep (default: %(default)s)")
+    prune.add_argument('--max-mb', type=float, default=None,
+                       help="maximum total size of the kept runs in megabytes")
+    prune.add_argument('--pack', action='store_true', help="pack finished runs into zip archives")
+    prune.add_argument('--logs-dir', default=LOGS_DIR, help="logs directory (default: %(default)s)")
+
+    return parser
+
+
+def run_config(args):
+    return RunConfig.from_game_config(number_of_rounds=args.rounds, add_noise=args.noise, seed=args.seed,
+                                      fast_forward=args.fast_forward, move_noise=args.move_noise)
+
+
+def run_tournament(args, progress):
+    if args.resume:
+        try:
+            tournament_dir = TournamentSimulation().resume(args.resume, progress=progress)
+        except ValueError as e:
+            raise SystemExit(f"Cannot resume tournament: {e}")
+    else:
+        bot_paths = expand_bot_paths(args.bots)
+        reports = None
+        if args.preflight:
+            from simulation.preflight import excluded_paths, validate_bots, write_report
+
+            reports = validate_bots(bot_paths, config=run_config(args), workers=args.workers, progress=progress)
+            excluded = excluded_paths(reports)
+            for path in excluded:
+                print(f"Left out {path} (see preflight_report.txt)", file=sys.stderr)
+            bot_paths = [path for path in bot_paths if path not in excluded]
+        if len(bot_paths) < 2:
+            raise SystemExit("A tournament needs at least 2 bots")
+        tournament_dir = TournamentSimulation(config=run_config(args)).run_all_against_all(
+            bot_paths, progress=progress, shard=args.shard, shard_dir=args.shard_dir, dedupe=args.dedupe)
+        if reports is not None:
+            write_report(reports, tournament_dir)
+    if not os.path.exists(os.path.join(tournament_dir, "results.csv")):
+        return tournament_dir  # A shard: results come from merge
+
+    if args.visualize:
+        import tkinter as tk
+        from interface.tournament_visualizer import TournamentVisualizer
+
+        root = tk.Tk()
+        root.withdraw()
+        TournamentVisualizer(os.path.join(tournament_dir, "results.csv")).show()
+    return tournament_dir
+
+
+def run_swiss(args, progress):
+    bot_paths = expand_bot_paths(args.bots)
+    if len(bot_paths) < 2:
+        raise SystemExit("A tournament needs at least 2 bots")
+    return TournamentSimulation(config=run_config(args)).run_swiss(
+        bot_paths, swiss_rounds=args.swiss_rounds, progress=progress, compare=args.compare)
+
+
+def run_adaptive(args, progress):
+    bot_paths = expand_bot_paths(args.bots)
+    if len(bot_paths) < 2:
+        raise SystemExit("A tournament needs at least 2 bots")
+    return TournamentSimulation(config=run_config(args)).run_adaptive(
+        bot_paths, top_k=args.top_k, confidence=args.confidence, min_matches=args.min_matches,
+        max_matches=args.max_matches, progress=progress)
+
+
+def run_matrix(args, progress):
+    from simulation.matrix_store import SUMMARY_TOP, MatrixTournament
+
+    bot_paths = expand_bot_paths(args.bots)
+    if len(bot_paths) < 2:
+        raise SystemExit("A tournament needs at least 2 bots")
+    matrix_dir = MatrixTournament(bot_paths, config=run_config(args)).run(
+        workers=args.workers, progress=progress, top=args.top if args.top is not None else SUMMARY_TOP)
+
+    if args.visualize:
+        import tkinter as tk
+        from interface.tournament_visualizer import TournamentVisualizer
+
+        root = tk.Tk()
+        root.withdraw()
+        TournamentVisualizer(os.path.join(matrix_dir, "results.csv")).show()
+    return matrix_dir
+
+
+def run_merge(args, progress):
+    try:
+        return TournamentSimulation().merge_shards(args.shards)
+    except ValueError as e:
+        raise SystemExit(f"Cannot merge shards: {e}")
+
+
+def run_multiple(args, progress):
+    opponent_paths = expand_bot_paths(args.opponents)
+    return PrisonersDilemmaSimulation(args.bot, config=run_config(args)).run_games(opponent_paths, progress=progress)
+
+
+def run_evaluate(args, progress):
+    from simulation.batch_eval import BatchEvaluator
+
+    opponent_paths = expand_bot_paths(args.opponents)
+    with BatchEvaluator(workers=args.workers, config=run_config(args)) as evaluator:
+        try:
+            result = evaluator.evaluate(args.bot, opponent_paths)
+        except ValueError as e:
+            raise SystemExit(f"Cannot load {args.bot}: {e}")
+    print(json.dumps(result, indent=2))
+    return None  # No results directory
+
+
+def run_watch(args, progress):
+    from simulation.batch_eval import BatchEvaluator
+    from simulation.watch import BotWatcher, format_report
+
+    watch_paths = args.watch_paths or [USER_BOTS_DIR]
+    seed = args.seed if args.seed is not None else 0
+    watcher = BotWatcher(watch_paths, args.opponents, evaluator=BatchEvaluator(workers=args.workers),
+                         config=run_config(args), interval=args.interval, seed=seed)
+    print(f"Watching {', '.join(watch_paths)} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        watcher.run(lambda report: print(format_report(report), flush=True))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return None
+
+
+def run_serve(args, progress):
+    import asyncio
+    from simulation.job_server import JobServer
+
+    server = JobServer(args.host, args.port, workers=args.workers)
+    print(f"Serving on http://{args.host}:{args.port} (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return None
+
+
+def run_match(args, progress):
+    return PrisonersDilemmaSimulation(args.bot, config=run_config(args)).run_games([args.opponent], progress=progress)
+
+
+def parse_grid(specs, args):
+    """Parse FIELD=V1,V2 specs into RunConfig field values; --rounds/--noise/--fast-forward/--move-noise fill unset fields."""
+    grid = {'number_of_rounds': [args.rounds], 'add_noise': [args.noise], 'fast_forward': [args.fast_forward],
+            'move_noise': [args.move_noise]}
+    for spec in specs:
+        field, _, values = spec.partition('=')
+        if field not in RunConfig.__dataclass_fields__ or not values:
+            raise SystemExit(f"Invalid grid spec: {spec}")
+        if field in ('add_noise', 'fast_forward'):
+            grid[field] = [value.lower() in ('1', 'true', 'yes') for value in values.split(',')]
+        elif field == 'move_noise':
+            grid[field] = [probability(value) for value in values.split(',')]
+        else:
+            grid[field] = [int(value) for value in values.split(',')]
+    return grid
+
+
+def run_sweep(args, progress):
+    from simulation.parameter_sweep import ParameterSweep, config_grid
+
+    bot_paths = expand_bot_paths(args.bots)
+    if len(bot_paths) < 2:
+        raise SystemExit("A sweep needs at least 2 bots")
+    configs = config_grid(**parse_grid(args.grid, args))
+    seed = args.seed if args.seed is not None else 0
+    return ParameterSweep(bot_paths, configs, seed=seed).run(workers=args.workers, progress=progress)
+
+
+def run_preflight(args, progress):
+    from simulation.preflight import validate_bots, write_report
+
+    bot_paths = expand_bot_paths(args.bots)
+    reports = validate_bots(bot_paths, config=run_config(args), workers=args.workers, progress=progress)
+    preflight_dir = create_run_dir(LOGS_DIR, f"{time.strftime('%H%M%S')}_preflight")
+    write_report(reports, preflight_dir)
+    finish_run(preflight_dir)
+    return preflight_dir
+
+
+def run_generate(args, progress):
+    from simulation.synthetic_bots import write_bots
+
+    mix = None
+    if args.mix:
+        try:
+            mix = {kind: float(weight) for kind, _, weight in (spec.partition('=') for spec in args.mix.split(','))}
+        except ValueError:
+            raise SystemExit(f"Invalid mix: {args.mix}")
+    try:
+        return write_bots(args.count, args.out, seed=args.seed, mix=mix)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+
+def run_prune(args, progress):
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else GameConfig.LOG_MAX_BYTES
+    result = apply_retention(args.logs_dir, keep_runs=args.keep, max_bytes=max_bytes,
+                             pack=args.pack or GameConfig.PACK_LOGS)
+    print(f"Packed {len(result['packed'])} runs, deleted {len(result['deleted'])} runs", file=sys.stderr)
+    return args.logs_dir
+
+
+COMMANDS = {
+    'tournament': run_tournament,
+    'swiss': run_swiss,
+    'adaptive': run_adaptive,
+    'matrix': run_matrix,
+    'multiple': run_multiple,
+    'evaluate': run_evaluate,
+    'watch': run_watch,
+    'serve': run_serve,
+    'match': run_match,
+    'merge': run_merge,
+    'sweep': run_sweep,
+    'preflight': run_preflight,
+    'generate': run_generate,
+    'prune': run_prune,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    progress = None if getattr(args, 'quiet', False) else print_progress
+
+    if progress:
+        print(f"Startup took {(time.perf_counter() - _START) * 1000:.1f} ms", file=sys.stderr)
+    results_dir = COMMANDS[args.command](args, progress)
+    if results_dir is None:
+        return 0
+    metrics_path = os.path.join(results_dir, METRICS_FILE)
+    if getattr(args, 'metrics', False) and os.path.exists(metrics_path):
+        with open(metrics_path, 'r') as f:
+            print(summary_line(json.load(f)), file=sys.stderr)
+    print(results_dir)
+    return 0
@@ -0,0 +1,64 @@
+"""Incremental tournament events for observers such as a live leaderboard.
+
+Events are plain JSON-serializable dicts with a 'type' key:
+
+    tournament_started  bots, total_matches, directory
+    match_finished      i, j, bot1, bot2, rounds, scores, done, total,
+                        totals ({bot name: [total score, matches played]} for both bots)
+    tournament_finished directory
+
+Observers are called synchronously on the thread running the tournament, so they
+should be cheap; a GUI should hand events over to its own thread (see
+TournamentScreen). Every tournament also writes its events to events.jsonl.
+"""
+import json
+import os
+
+EVENTS_FILE = "events.jsonl"
+
+
+class EventStream:
+    """Observer that appends every event as a line of events.jsonl in a run directory."""
+
+    def __init__(self, directory):
+        self._file = open(os.path.join(directory, EVENTS_FILE), 'a')
+
+    def __call__(self, event):
+        self._file.write(json.dumps(event) + "\n")
+        self._file.flush()  # Let readers tail the file while the tournament runs
+        if event['type'] == 'tournament_finished':
+            self._file.close()
+
+
+class RunningTotals:
+    """Running score totals per bot, kept by the engine to annotate match events."""
+
+    def __init__(self, bot_names):
+        self.totals = {name: [0, 0] for name in bot_names}
+
+    def add(self, record):
+        for name, score in zip((record['bot1'], record['bot2']), record['scores']):
+            total = self.totals[name]
+            total[0] += score
+            total[1] += 1
+        return {name: list(self.totals[name]) for name in (record['bot1'], record['bot2'])}
+
+
+def publish(observers, event):
+    for observer in observers:
+        observer(event)
+
+
+def match_event(record, done, total, totals):
+    return {
+        'type': 'match_finished',
+        'i': record['i'],
+        'j': record['j'],
+        'bot1': record['bot1'],
+        'bot2': record['bot2'],
+        'rounds': record['rounds'],
+        'scores': record['scores'],
+        'done': done,
+        'total': total,
+        'totals': totals,
+    }
@@ -0,0 +1,192 @@
+"""Play many matches with external-program bots concurrently on one asyncio loop.
+
+    results = play_matches([(MyProgramBot, TitForTatBot, 200), ...], config)
+
+Through the regular engines an external bot costs one round trip to its program per
+move, and a match waits for every one of them. Here all matches run at once (up to
+`concurrency`), each as a coroutine. Every program gets the requests of all its games
+that are due in the same loop iteration as one write, and its reply reader resolves
+them as they arrive, so a program answers a batch of requests per round trip and the
+matches proceed together. In-process Python bots in these matches are asked directly.
+
+Every result is (moves1, moves2), or the BotError of the bot that failed (the match is
+forfeited, see match_engine.forfeit_scores). The matches are not fast-forwarded, and
+random Python bots draw from the shared random module in an interleaved order, so
+their matches are not reproducible from a seed.
+"""
+import asyncio
+from simulation.checkpoint import BotError
+from simulation.match_engine import _create, decide
+from simulation.move_noise import match_noise
+from utils.external_bot import ExternalProgramError, format_request, is_external, parse_reply
+
+# Matches in flight at once
+DEFAULT_CONCURRENCY = 256
+
+
+class AsyncProgram:
+    """A running bot program with pipelined requests: replies resolve futures by game id."""
+
+    def __init__(self, command, timeout):
+        self.command = command
+        self.timeout = timeout
+        self.process = None
+        self.pending = {}   # Game -> future of its reply
+        self.outgoing = []  # Request lines not written yet
+        self.error = None   # Set once the program is gone
+        self.replies = 0    # Replies read so far, for the watchdog
+        self._tasks = []
+
+    async def start(self):
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *self.command, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+        except OSError as e:
+            self.error = ExternalProgramError(f"cannot start {self.command[0]}: {e}")  # Its matches are forfeited
+            return
+        self._tasks = [asyncio.create_task(self._read()), asyncio.create_task(self._watch())]
+
+    def request(self, game, current_round, total_rounds, opponent_last):
+        """Queue a request and return the future of its Move; queued requests go out together."""
+        future = asyncio.get_running_loop().create_future()
+        if self.error is not None:
+            future.set_exception(self.error)
+            return future
+        if not self.outgoing:
+            asyncio.get_running_loop().call_soon(self._flush)
+        self.outgoing.append(format_request(game, current_round, total_rounds, opponent_last))
+        self.pending[game] = future
+        return future
+
+    def _flush(self):
+        data, self.outgoing = b"".join(self.outgoing), []
+        try:
+            self.process.stdin.write(data)
+        except (OSError, RuntimeError) as e:
+            self._fail(ExternalProgramError(f"program exited ({e})"))
+
+    async def _read(self):
+        buffer = b""
+        while True:
+            chunk = await self.process.stdout.read(65536)
+            if not chunk:
+                self._fail(ExternalProgramError(f"program exited with code {await self.process.wait()}"))
+                return
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            for line in lines:
+                try:
+                    game, move = parse_reply(line)
+                except ExternalProgramError as e:
+                    self._fail(e)
+                    return
+                future = self.pending.pop(game, None)
+                if future is not None and not future.done():
+                    future.set_result(move)
+            self.replies += len(lines)
+
+    async def _watch(self):
+        """Fail the program once it has requests pending but sent no reply for `timeout` seconds."""
+        while self.error is None:
+            replies = self.replies
+            await asyncio.sleep(self.timeout)
+            if self.pending and self.replies == replies:
+                self._fail(ExternalProgramError(f"no reply within {self.timeout} s"))
+
+    def _fail(self, error):
+        self.error = error
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+        if self.process.returncode is None:
+            self.process.kill()
+
+    async def close(self):
+        if self.process is None:
+            return
+        if self.process.returncode is None:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), 1)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        for task in self._tasks:
+            task.cancel()
+
+
+def _request(program, bot, current_round):
+    if program is None:
+        return None
+    opponent_last = bot.opponent_history[-1] if bot.opponent_history else None
+    return program.request(bot.game, current_round, bot.total_rounds, opponent_last)
+
+
+async def _move(bot, future):
+    if future is None:
+        return decide(bot)
+    try:
+        return await future
+    except ExternalProgramError as e:
+        raise BotError(bot.name, e) from e
+
+
+async def _play_match(bot1_class, bot2_class, rounds, config, programs, noise=False):
+    bot1 = _create(bot1_class, config)
+    bot2 = _create(bot2_class, config)
+    if noise is False:
+        noise = match_noise(config, bot1.name, bot2.name, rounds)
+    program1, program2 = programs.get(bot1_class), programs.get(bot2_class)
+    for current_round in range(1, rounds + 1):
+        # Send the external bots' requests before asking the Python bots, then wait for both
+        future1 = _request(program1, bot1, current_round)
+        future2 = _request(program2, bot2, current_round)
+        try:
+            move1 = await _move(bot1, future1)
+            move2 = await _move(bot2, future2)
+        except BotError:
+            if future2 is not None:
+                future2.cancel()  # Nobody waits for it any more
+            raise
+        if noise:
+            move1, move2 = noise.execute(move1, move2)
+        bot1.my_history.append(move1)
+        bot1.opponent_history.append(move2)
+        bot2.my_history.append(move2)
+        bot2.opponent_history.append(move1)
+    return bot1.my_history, bot2.my_history
+
+
+async def play_matches_async(matches, config, concurrency=DEFAULT_CONCURRENCY, noises=None):
+    """Play (bot1 class, bot2 class, rounds) matches concurrently; return their results in order.
+
+    noises, if given, holds the MoveNoise (or None) of every match, to use instead of
+    drawing new flips, so the caller can log them.
+    """
+    programs = {}
+    for bot1_class, bot2_class, _ in matches:
+        for bot_class in (bot1_class, bot2_class):
+            if is_external(bot_class) and bot_class not in programs:
+                programs[bot_class] = AsyncProgram(bot_class.command, bot_class.timeout)
+                await programs[bot_class].start()
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def play(match, noise):
+        async with slots:
+            try:
+                return await _play_match(*match, config, programs, noise)
+            except BotError as e:
+                return e
+
+    noises = noises if noises is not None else [False] * len(matches)
+    try:
+        return await asyncio.gather(*(play(match, noise) for match, noise in zip(matches, noises)))
+    finally:
+        for program in programs.values():
+            await program.close()
+
+
+def play_matches(matches, config, concurrency=DEFAULT_CONCURRENCY, noises=None):
+    """Synchronous play_matches_async, for the batch runners."""
+    return asyncio.run(play_matches_async(matches, config, concurrency, noises))
@@ -0,0 +1,120 @@
+"""Behavioral fingerprints for spotting bots that play exactly alike.
+
+Each bot is played against a fixed battery of scripted opponents (fixed move
+sequences, not bots) for as many rounds as the longest match of the run, twice
+with fresh instances. A bot that answers a probe differently the second time is
+nondeterministic and stays on its own. Deterministic bots whose answers match on
+every probe get the same fingerprint and form one equivalence class.
+
+Equal fingerprints are strong evidence, not proof: two bots may still differ against
+an opponent sequence the battery does not contain.
+"""
+import hashlib
+import random
+from simulation.match_engine import decide
+from utils.moves import Move
+
+C, D = Move.COOPERATE, Move.DEFECT
+
+# Seed of the pseudo-random probes; fixed so fingerprints are comparable across runs
+PROBE_SEED = 20240601
+
+
+def probe_sequences(rounds):
+    """The scripted opponent move sequences of the probe battery, each `rounds` long."""
+    patterns = [[C], [D], [C, D], [D, C], [C, C, D], [D, D, C], [C] * 5 + [D] * 5]
+    sequences = [(pattern * (rounds // len(pattern) + 1))[:rounds] for pattern in patterns]
+    # Single defection early, late and at the very end, and a switch to defection halfway
+    for position in (1, rounds // 3, rounds - 1):
+        sequence = [C] * rounds
+        if 0 <= position < rounds:
+            sequence[position] = D
+        sequences.append(sequence)
+    sequences.append([C] * (rounds // 2) + [D] * (rounds - rounds // 2))
+    rng = random.Random(PROBE_SEED)
+    for cooperation in (0.2, 0.5, 0.8, 0.95):
+        sequences.append([C if rng.random() < cooperation else D for _ in range(rounds)])
+    return sequences
+
+
+def probe(bot_class, config, opponent_moves):
+    """Return the moves of a fresh bot against a scripted opponent."""
+    bot = bot_class.create(config)
+    for opponent_move in opponent_moves:
+        move = decide(bot)
+        bot.my_history.append(move)
+        bot.opponent_history.append(opponent_move)
+    return bot.my_history
+
+
+def fingerprint(bot_class, config, rounds):
+    """Hex fingerprint of a bot's behavior against the battery, or None if the bot is
+    nondeterministic or fails a probe."""
+    digest = hashlib.sha256()
+    for sequence in probe_sequences(rounds):
+        try:
+            first = probe(bot_class, config, sequence)
+            second = probe(bot_class, config, sequence)
+        except Exception:  # Includes the BotError of a failing move
+            return None
+        if first != second:
+            return None
+        digest.update(bytes(1 if move == C else 0 for move in first))
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+def probe_rounds(config):
+    """Rounds to probe for: the longest match a run with this config can have."""
+    return int(config.number_of_rounds * 1.2) if config.add_noise else config.number_of_rounds
+
+
+def equivalence_classes(bot_classes, config, rounds):
+    """Map every bot position to the position of its class representative.
+
+    The representative is the first bot with the same fingerprint; bots without a
+    fingerprint represent themselves.
+    """
+    representatives = {}
+    classes = []
+    for position, bot_class in enumerate(bot_classes):
+        key = fingerprint(bot_class, config, rounds)
+        if key is None:
+            classes.append(position)
+        else:
+            classes.append(representatives.setdefault(key, position))
+    return classes
+
+
+def equivalent_groups(classes, bot_names):
+    """Names of the bots of every class with more than one member."""
+    groups = {}
+    for position, representative in enumerate(classes):
+        groups.setdefault(representative, []).append(bot_names[position])
+    return [names for names in groups.values() if len(names) > 1]
+
+
+def fan_out(record, i, j, bot1_name, bot2_name, swapped=False):
+    """Copy the record of a played match to the pair (i, j) of equivalent bots.
+
+    With swapped, the played match had the bots of pair (i, j) the other way round.
+    The copy's 'same_as' holds the pair that was actually played.
+    """
+    order = (1, 0) if swapped else (0, 1)
+    fanned = {
+        'i': i,
+        'j': j,
+        'bot1': bot1_name,
+        'bot2': bot2_name,
+        'rounds': record['rounds'],
+        'scores': [record['scores'][k] for k in order],
+        'mutual_cooperation': record['mutual_cooperation'],
+        'mutual_defection': record['mutual_defection'],
+        'betrayals': [record['betrayals'][k] for k in order],
+        'same_as': [record['i'], record['j']],
+    }
+    if record.get('forfeit'):
+        faulting = order.index((record['bot1'], record['bot2']).index(record['forfeit']))
+        fanned['forfeit'] = (bot1_name, bot2_name)[faulting]
+        fanned['error'] = record['error']
+    return fanned
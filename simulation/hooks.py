@@ -0,0 +1,55 @@
+"""Analytics hooks for the simulation engines.
+
+    hooks = SimulationHooks()
+
+    @hooks.on_round
+    def count_cooperation(bot1, bot2, round_index, move1, move2):
+        ...
+
+    TournamentSimulation(hooks=hooks).run_all_against_all(bot_paths)
+
+Round hooks are called after every round, once both bots' histories hold its moves.
+Match hooks get the two bot instances of every played match (forfeited matches have
+no bots to pass) and the stats dict the engine returns for it. Run hooks get the kind
+of run ('tournament', 'swiss', 'adaptive', 'games') and its directory, at the start
+and at the end of the run.
+
+Engines only switch to the round loop that calls hooks when a round hook is
+registered, so analytics that do not need rounds cost nothing per round.
+"""
+
+
+class SimulationHooks:
+    def __init__(self):
+        self.round = []      # callback(bot1, bot2, round_index, move1, move2)
+        self.match = []      # callback(bot1, bot2, stats)
+        self.run_start = []  # callback(kind, directory)
+        self.run_end = []    # callback(kind, directory)
+
+    def on_round(self, callback):
+        self.round.append(callback)
+        return callback
+
+    def on_match(self, callback):
+        self.match.append(callback)
+        return callback
+
+    def on_run_start(self, callback):
+        self.run_start.append(callback)
+        return callback
+
+    def on_run_end(self, callback):
+        self.run_end.append(callback)
+        return callback
+
+    def match_finished(self, bot1, bot2, stats):
+        for callback in self.match:
+            callback(bot1, bot2, stats)
+
+    def run_started(self, kind, directory):
+        for callback in self.run_start:
+            callback(kind, directory)
+
+    def run_finished(self, kind, directory):
+        for callback in self.run_end:
+            callback(kind, directory)
@@ -0,0 +1,327 @@
+"""Local HTTP service that takes bot uploads and runs simulations as queued jobs.
+
+    python -m simulation serve --port 8765 --workers 2
+
+All requests and responses are JSON (except the raw files of /jobs/<id>/files/<name>):
+
+    POST /bots                    {"filename": "my_bot.py", "source": "..."}
+                                  -> 201 {"path", "name"}; the bot is loaded in a worker first
+                                  and only saved to bots/user-created if it loads
+    GET  /bots                    -> {"bots": [paths]}
+    POST /jobs                    {"kind": "tournament", "bots": ["bots/prebuilt", ...]} or
+                                  {"kind": "multiple", "bot": "bots/user-created/my_bot.py",
+                                   "opponents": ["bots/prebuilt"]}, both optionally with
+                                  "rounds", "noise", "move_noise", "seed"; a tournament also with "dedupe"
+                                  -> 202 {job}
+    GET  /jobs                    -> {"jobs": [jobs]}
+    GET  /jobs/<id>               -> {job}: id, kind, status (queued, running, done, failed),
+                                  submitted, started, finished, results_dir, error
+    GET  /jobs/<id>/result        -> {"id", "results_dir", "files", "summary", "metrics"}
+    GET  /jobs/<id>/files/<name>  -> a file of the job's results directory, as text
+
+Bot paths are relative to the repository root and must lie in bots/. Jobs wait in a
+bounded queue and run on a shared pool of worker processes, at most `workers` at a
+time, so a burst of requests queues up instead of starting a run each. The pool has
+one process more than that, so uploads are checked even while every job slot is busy.
+Jobs are kept in memory only; their results directories stay in logs/ as usual.
+"""
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from urllib.parse import unquote, urlsplit
+from simulation.log_retention import SUMMARY_FILES, list_run_files, read_run_file
+from simulation.match_engine import load_bot_class
+from simulation.metrics import METRICS_FILE
+from simulation.simulate_games import PrisonersDilemmaSimulation
+from simulation.simulate_tournament import TournamentSimulation
+from simulation.watch import bot_files
+from utils.game_config import RunConfig
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOTS_DIR = os.path.join(REPO_DIR, 'bots')
+UPLOAD_DIR = os.path.join(BOTS_DIR, 'user-created')
+
+MAX_QUEUED_JOBS = 100
+MAX_BODY_BYTES = 1 << 20
+BOT_FILENAME = re.compile(r"[A-Za-z][A-Za-z0-9_]*\.py")
+
+REASONS = {200: "OK", 201: "Created", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _check_bot(path):
+    """Load a bot file in a worker and return its name; raises if it is not a valid bot."""
+    return load_bot_class(path)().name
+
+
+def _new_pool(workers):
+    """A process pool whose workers do not inherit this process's sockets.
+
+    Forked workers would keep the listening socket and the client connections open at
+    the time of the fork, holding back their close until the pool goes away.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+
+
+def _run_job(kind, spec):
+    """Run a job in a worker and return its results directory."""
+    config = RunConfig.from_game_config(**spec['config'])
+    if kind == 'tournament':
+        return TournamentSimulation(config=config).run_all_against_all(spec['bots'], dedupe=spec['dedupe'])
+    return PrisonersDilemmaSimulation(spec['bot'], config=config).run_games(spec['opponents'])
+
+
+def resolve_bot_paths(paths):
+    """Absolute bot files for paths relative to the repository root, which must lie in bots/."""
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        raise HttpError(400, "Bot paths must be a list of strings")
+    resolved = []
+    for path in paths:
+        full = os.path.realpath(os.path.join(REPO_DIR, path))
+        if os.path.commonpath([full, os.path.realpath(BOTS_DIR)]) != os.path.realpath(BOTS_DIR):
+            raise HttpError(400, f"{path} is not in bots/")
+        if not os.path.exists(full):
+            raise HttpError(400, f"{path} does not exist")
+        resolved.append(full)
+    return bot_files(resolved)
+
+
+def job_config(request):
+    config = {}
+    if 'rounds' in request:
+        if not isinstance(request['rounds'], int) or request['rounds'] < 1:
+            raise HttpError(400, "rounds must be a positive integer")
+        config['number_of_rounds'] = request['rounds']
+    if 'noise' in request:
+        config['add_noise'] = bool(request['noise'])
+    if 'move_noise' in request:
+        if not isinstance(request['move_noise'], (int, float)) or not 0 <= request['move_noise'] <= 1:
+            raise HttpError(400, "move_noise must be a probability between 0 and 1")
+        config['move_noise'] = request['move_noise']
+    if request.get('seed') is not None:
+        if not isinstance(request['seed'], int):
+            raise HttpError(400, "seed must be an integer")
+        config['seed'] = request['seed']
+    return config
+
+
+class JobServer:
+    def __init__(self, host='127.0.0.1', port=8765, workers=None, upload_dir=UPLOAD_DIR):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.upload_dir = upload_dir
+        self.jobs = {}  # Id -> job dict, in submission order
+        self._ids = itertools.count(1)
+        self._queue = None
+        self._pool = None
+        self._server = None
+        self._runners = []
+
+    async def start(self):
+        self._queue = asyncio.Queue(MAX_QUEUED_JOBS)
+        self._pool = _new_pool(self.workers + 1)
+        self._runners = [asyncio.create_task(self._run_jobs()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # The actual port if 0 was asked for
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        self._server.close()
+        for runner in self._runners:
+            runner.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _in_worker(self, function, *args):
+        pool = self._pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, function, *args)
+        except BrokenProcessPool:
+            # A bot took a worker down; the first job to notice replaces the pool
+            if self._pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = _new_pool(self.workers + 1)
+            raise RuntimeError("A worker process died")
+
+    async def _run_jobs(self):
+        while True:
+            job, spec = await self._queue.get()
+            job.update(status='running', started=_now())
+            try:
+                job['results_dir'] = await self._in_worker(_run_job, job['kind'], spec)
+                job['status'] = 'done'
+            except Exception as e:
+                job.update(status='failed', error=f"{type(e).__name__}: {e}")
+            job['finished'] = _now()
+
+    # HTTP
+
+    async def _handle(self, reader, writer):
+        try:
+            status, body, content_type = await self._respond(reader)
+        except HttpError as e:
+            status, body, content_type = e.status, {'error': str(e)}, None
+        except Exception as e:
+            status, body, content_type = 500, {'error': f"{type(e).__name__}: {e}"}, None
+        if content_type is None:
+            content_type, body = 'application/json', json.dumps(body, indent=2).encode()
+        writer.write(f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _respond(self, reader):
+        try:
+            method, target, _ = (await reader.readline()).decode('latin-1').split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode('latin-1')
+                if line in ('\r\n', '\n', ''):
+                    break
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(400, "Malformed request")
+        if length > MAX_BODY_BYTES:
+            raise HttpError(413, f"Request bodies are limited to {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+
+        parts = [unquote(part) for part in urlsplit(target).path.strip('/').split('/')]
+        if parts == ['bots']:
+            if method == 'GET':
+                return 200, {'bots': [os.path.relpath(path, REPO_DIR) for path in self.bot_list()]}, None
+            if method == 'POST':
+                return 201, await self.upload(_json(body)), None
+        elif parts == ['jobs']:
+            if method == 'GET':
+                return 200, {'jobs': list(self.jobs.values())}, None
+            if method == 'POST':
+                return 202, self.submit(_json(body)), None
+        elif parts[0] == 'jobs' and len(parts) >= 2:
+            job = self.jobs.get(parts[1])
+            if job is None:
+                raise HttpError(404, f"No job {parts[1]}")
+            if method != 'GET':
+                raise HttpError(405, "Jobs are read with GET")
+            if len(parts) == 2:
+                return 200, job, None
+            if parts[2:] == ['result']:
+                return 200, self.result(job), None
+            if parts[2] == 'files' and len(parts) == 4:
+                return 200, self.result_file(job, parts[3]).encode(), 'text/plain; charset=utf-8'
+        else:
+            raise HttpError(404, f"No such endpoint: {target}")
+        raise HttpError(405 if len(parts) <= 2 else 404, f"{method} {target} is not supported")
+
+    # Endpoints
+
+    def bot_list(self):
+        return bot_files([os.path.join(BOTS_DIR, name) for name in sorted(os.listdir(BOTS_DIR))
+                          if os.path.isdir(os.path.join(BOTS_DIR, name))])
+
+    async def upload(self, request):
+        filename, source = request.get('filename'), request.get('source')
+        if not isinstance(filename, str) or not BOT_FILENAME.fullmatch(filename):
+            raise HttpError(400, "filename must be a plain Python file name such as my_bot.py")
+        if not isinstance(source, str):
+            raise HttpError(400, "source must be the bot's code")
+
+        os.makedirs(self.upload_dir, exist_ok=True)
+        path = os.path.join(self.upload_dir, filename)
+        # Check a copy under another name (skipped by bot listings, like __init__.py), so a
+        # broken upload never replaces a working bot
+        tmp_path = os.path.join(self.upload_dir, f"__upload_{next(self._ids)}_{filename}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(source)
+        try:
+            name = await self._in_worker(_check_bot, tmp_path)
+        except Exception as e:
+            os.remove(tmp_path)
+            raise HttpError(400, str(e))
+        os.replace(tmp_path, path)
+        return {'path': os.path.relpath(path, REPO_DIR), 'name': name}
+
+    def submit(self, request):
+        kind = request.get('kind')
+        if kind == 'tournament':
+            bots = resolve_bot_paths(request.get('bots'))
+            if len(bots) < 2:
+                raise HttpError(400, "A tournament needs at least 2 bots")
+            spec = {'bots': bots, 'dedupe': bool(request.get('dedupe'))}
+        elif kind == 'multiple':
+            bot = resolve_bot_paths([request.get('bot')] if isinstance(request.get('bot'), str) else None)
+            opponents = resolve_bot_paths(request.get('opponents'))
+            if len(bot) != 1 or not opponents:
+                raise HttpError(400, "A multiple test needs one bot file and at least one opponent")
+            spec = {'bot': bot[0], 'opponents': opponents}
+        else:
+            raise HttpError(400, "kind must be 'tournament' or 'multiple'")
+        spec['config'] = job_config(request)
+
+        job = {'id': str(next(self._ids)), 'kind': kind, 'status': 'queued', 'submitted': _now(),
+               'started': None, 'finished': None, 'results_dir': None, 'error': None}
+        try:
+            self._queue.put_nowait((job, spec))
+        except asyncio.QueueFull:
+            raise HttpError(503, f"{MAX_QUEUED_JOBS} jobs are already waiting, try again later")
+        self.jobs[job['id']] = job
+        return job
+
+    def result(self, job):
+        if job['status'] != 'done':
+            raise HttpError(409, f"Job {job['id']} is {job['status']}")
+        files = list_run_files(job['results_dir'])
+        summary = next((name for name in SUMMARY_FILES if name in files), None)
+        return {
+            'id': job['id'],
+            'results_dir': job['results_dir'],
+            'files': files,
+            'summary': read_run_file(job['results_dir'], summary) if summary else None,
+            'metrics': json.loads(read_run_file(job['results_dir'], METRICS_FILE)) if METRICS_FILE in files else None,
+        }
+
+    def result_file(self, job, name):
+        if job['status'] != 'done':
+            raise HttpError(409, f"Job {job['id']} is {job['status']}")
+        if name not in list_run_files(job['results_dir']):
+            raise HttpError(404, f"No file {name} in the results of job {job['id']}")
+        return read_run_file(job['results_dir'], name)
+
+
+def _json(body):
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        raise HttpError(400, "The body must be JSON")
+    if not isinstance(request, dict):
+        raise HttpError(400, "The body must be a JSON object")
+    return request
+
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
@@ -0,0 +1,183 @@
+import itertools
+import os
+import shutil
+import zipfile
+from utils.game_config import GameConfig
+
+ARCHIVE_SUFFIX = '.zip'
+RUNNING_FILE = ".running"  # Pid of the process writing a run, removed once the run is done
+SUMMARY_FILES = ("tournament_summary.txt", "games_summary.txt", "swiss_summary.txt", "adaptive_summary.txt",
+                 "matrix_summary.txt", "preflight_report.txt")
+
+
+def archive_path(run_dir):
+    return run_dir.rstrip(os.sep) + ARCHIVE_SUFFIX
+
+
+def read_run_file(run_dir, filename):
+    """Read a file of a run, whether the run is a plain directory or a packed archive."""
+    if os.path.isdir(run_dir):
+        with open(os.path.join(run_dir, filename), 'r') as f:
+            return f.read()
+    archive = archive_path(run_dir)
+    if os.path.exists(archive):
+        with zipfile.ZipFile(archive) as zf:
+            return zf.read(filename).decode()
+    raise FileNotFoundError(f"Run not found: {run_dir}")
+
+
+def _run_files(run_dir):
+    """(path, name relative to the run) of every file of a run directory, subdirectories included."""
+    for root, _, names in os.walk(run_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            yield path, os.path.relpath(path, run_dir).replace(os.sep, '/')
+
+
+def list_run_files(run_dir):
+    """List the file names of a run, whether it is a plain directory or a packed archive.
+
+    Files in subdirectories are listed by their relative path, as in the archive.
+    """
+    if os.path.isdir(run_dir):
+        return sorted(name for _, name in _run_files(run_dir) if name != RUNNING_FILE)
+    archive = archive_path(run_dir)
+    if os.path.exists(archive):
+        with zipfile.ZipFile(archive) as zf:
+            return sorted(zf.namelist())
+    raise FileNotFoundError(f"Run not found: {run_dir}")
+
+
+def run_exists(run_dir):
+    return os.path.isdir(run_dir) or os.path.exists(archive_path(run_dir))
+
+
+def create_run_dir(logs_dir, name):
+    """Create and return a new run directory logs_dir/name.
+
+    Runs are named after the second they start in, so runs started together can want
+    the same name; the later ones get _2, _3, ... appended instead of failing.
+    """
+    path = os.path.join(logs_dir, name)
+    for number in itertools.count(2):
+        if not os.path.exists(archive_path(path)):  # A packed run keeps its name
+            try:
+                os.makedirs(path)
+            except FileExistsError:
+                pass
+            else:
+                mark_running(path)
+                return path
+        path = os.path.join(logs_dir, f"{name}_{number}")
+
+
+def mark_running(run_dir):
+    """Protect a run from retention until finish_run, or until its process is gone."""
+    with open(os.path.join(run_dir, RUNNING_FILE), 'w') as f:
+        f.write(str(os.getpid()))
+
+
+def finish_run(run_dir):
+    try:
+        os.remove(os.path.join(run_dir, RUNNING_FILE))
+    except FileNotFoundError:
+        pass
+
+
+def is_running(run_dir):
+    """Whether the process that marked a run as running is still alive."""
+    try:
+        with open(os.path.join(run_dir, RUNNING_FILE), 'r') as f:
+            pid = int(f.read())
+    except (OSError, ValueError):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Alive, owned by someone else
+    return True
+
+
+def pack_run(run_dir):
+    """Pack a run directory into a single zip archive next to it and remove the directory."""
+    archive = archive_path(run_dir)
+    tmp_archive = archive + '.tmp'
+    mtime = os.stat(run_dir).st_mtime
+    with zipfile.ZipFile(tmp_archive, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for path, name in _run_files(run_dir):
+            if name != RUNNING_FILE:  # Left behind by a process that died
+                zf.write(path, name)
+    os.replace(tmp_archive, archive)
+    os.utime(archive, (mtime, mtime))  # Keep the run's place in the retention order
+    shutil.rmtree(run_dir)
+    return archive
+
+
+def is_finished(run_dir):
+    """A run is finished once its summary file has been written."""
+    return any(os.path.exists(os.path.join(run_dir, name)) for name in SUMMARY_FILES)
+
+
+def run_size(path):
+    if not os.path.isdir(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(file_path) for file_path, _ in _run_files(path))
+
+
+def list_runs(logs_dir):
+    """Return (path, mtime) for every run in the logs directory, oldest first."""
+    runs = []
+    for entry in os.scandir(logs_dir):
+        if entry.is_dir() or (entry.is_file() and entry.name.endswith(ARCHIVE_SUFFIX)):
+            runs.append((entry.path, entry.stat().st_mtime))
+    return sorted(runs, key=lambda run: run[1])
+
+
+def apply_retention(logs_dir, keep_runs=None, max_bytes=None, pack=False, exclude=()):
+    """Apply the retention policy to a logs directory.
+
+    Finished runs are packed into archives if pack is True, then the oldest runs are
+    deleted until at most keep_runs remain and their total size is within max_bytes.
+    Runs listed in exclude (e.g. the one that just finished) and runs still being
+    written by a live process (see mark_running) are never packed or deleted.
+    Returns a dict with the lists of packed and deleted runs.
+    """
+    exclude = {os.path.normpath(path) for path in exclude}
+    exclude |= {os.path.normpath(path) for path, _ in list_runs(logs_dir) if os.path.isdir(path) and is_running(path)}
+    result = {'packed': [], 'deleted': []}
+
+    if pack:
+        for path, _ in list_runs(logs_dir):
+            if os.path.isdir(path) and os.path.normpath(path) not in exclude and is_finished(path):
+                result['packed'].append(pack_run(path))
+
+    runs = [(path, run_size(path)) for path, _ in list_runs(logs_dir)]
+    remaining = len(runs)
+    total_size = sum(size for _, size in runs)
+    for path, size in runs:
+        over_count = keep_runs is not None and remaining > keep_runs
+        over_size = max_bytes is not None and total_size > max_bytes
+        if not (over_count or over_size):
+            break
+        run_dir = path[:-len(ARCHIVE_SUFFIX)] if path.endswith(ARCHIVE_SUFFIX) else path
+        if os.path.normpath(run_dir) in exclude:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+        remaining -= 1
+        total_size -= size
+        result['deleted'].append(path)
+    return result
+
+
+def apply_configured_retention(logs_dir, current_run):
+    """Mark a run as done and apply the retention policy from GameConfig, sparing the run itself."""
+    finish_run(current_run)
+    if GameConfig.LOG_KEEP_RUNS is None and GameConfig.LOG_MAX_BYTES is None and not GameConfig.PACK_LOGS:
+        return None
+    return apply_retention(logs_dir, keep_runs=GameConfig.LOG_KEEP_RUNS, max_bytes=GameConfig.LOG_MAX_BYTES,
+                           pack=GameConfig.PACK_LOGS, exclude=[current_run])
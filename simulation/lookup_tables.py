@@ -0,0 +1,174 @@
+"""Fast paths for lookup-table bots (see utils.lookup_table_bot).
+
+batch_round_robin plays a round-robin between any number of lookup-table bots as one
+vectorized NumPy computation: every round of all pairs at once instead of every match
+round by round. expected_payoffs computes the exact expected scores of two memory-one
+bots from their Markov chain over the four move pairs, without playing any rounds.
+
+NumPy is only needed for batch_round_robin and is imported when it is called.
+"""
+from utils.game_config import RunConfig
+from utils.lookup_table_bot import MAX_MEMORY
+
+# Pair codes as seen by the other bot: CD and DC swap
+SWAPPED = (0, 2, 1, 3)
+
+
+def _points(config):
+    """Points per pair code (0 CC, 1 CD, 2 DC, 3 DD) for the bot whose move comes first."""
+    return (config.mutual_cooperation_points, config.betrayed_points,
+            config.betrayal_points, config.mutual_defection_points)
+
+
+def batch_round_robin(bot_classes, config=None, seed=None, chunk_size=1 << 20):
+    """Play every pair of the lookup-table bot classes once; return a stats dict of NumPy arrays.
+
+    All matches have config.number_of_rounds rounds (add_noise is not applied).
+    Probabilistic bots and config.move_noise draw from numpy.random.default_rng(seed),
+    falling back to config.seed; the flips of a round are drawn for all pairs at once.
+    Pairs are simulated chunk_size at a time to bound memory use.
+
+    The result has 'names', 'rounds' and n x n matrices indexed [bot, opponent]:
+    'scores', 'mutual_cooperation', 'mutual_defection' and 'betrayals' (times the bot
+    betrayed the opponent), plus 'averages', the mean score per match of every bot.
+    With move noise there are also 'intended_cooperation' and 'flips' matrices (the
+    cooperations the bot meant to play and its moves the noise flipped).
+    """
+    import numpy as np
+
+    config = config or RunConfig.from_game_config()
+    rounds = config.number_of_rounds
+    n = len(bot_classes)
+    width = 4 ** MAX_MEMORY
+
+    # Tables padded to the largest memory; a bot only reads its own lowest digits
+    memory = np.array([bot_class.memory for bot_class in bot_classes])
+    tables = np.zeros((n, width))
+    openings = np.ones((n, MAX_MEMORY))
+    for b, bot_class in enumerate(bot_classes):
+        tables[b, :len(bot_class.cooperation)] = [float(p) for p in bot_class.cooperation]
+        openings[b, :bot_class.memory] = [float(p) for p in bot_class.opening]
+    deterministic = all(bot_class.deterministic for bot_class in bot_classes)
+    rng = np.random.default_rng(seed if seed is not None else config.seed)
+    points = np.array(_points(config))
+    swapped = np.array(SWAPPED)
+
+    noise = config.move_noise
+    names = ('scores', 'mutual_cooperation', 'mutual_defection', 'betrayals')
+    stats = {name: np.zeros((n, n), dtype=np.int64)
+             for name in names + (('intended_cooperation', 'flips') if noise else ())}
+    first_all, second_all = np.triu_indices(n, 1)
+    for start in range(0, len(first_all), chunk_size):
+        first, second = first_all[start:start + chunk_size], second_all[start:start + chunk_size]
+        pairs = len(first)
+        bots = (first, second)
+        moduli = (4 ** memory[first], 4 ** memory[second])
+        states = [np.zeros(pairs, dtype=np.int64), np.zeros(pairs, dtype=np.int64)]
+        scores = [np.zeros(pairs, dtype=np.int64), np.zeros(pairs, dtype=np.int64)]
+        outcomes = np.zeros((4, pairs), dtype=np.int64)  # Rounds per pair code of the first bot
+        intended = [np.zeros(pairs, dtype=np.int64), np.zeros(pairs, dtype=np.int64)]
+        flipped = [np.zeros(pairs, dtype=np.int64), np.zeros(pairs, dtype=np.int64)]
+
+        for t in range(rounds):
+            defects = []
+            for side in (0, 1):
+                p = tables[bots[side], states[side] % moduli[side]]
+                if t < MAX_MEMORY:
+                    p = np.where(t < memory[bots[side]], openings[bots[side], t], p)
+                defects.append(p < 1 if deterministic else rng.random(pairs) >= p)
+            if noise:
+                # Trembling hand: the bots remember the executed moves
+                flips = rng.random((2, pairs)) < noise
+                for side in (0, 1):
+                    intended[side] += ~defects[side]
+                    flipped[side] += flips[side]
+                    defects[side] = defects[side] ^ flips[side]
+            code = 2 * defects[0] + defects[1]
+            for side, side_code in ((0, code), (1, swapped[code])):
+                states[side] = (states[side] * 4 + side_code) % width
+                scores[side] += points[side_code]
+            outcomes += code == np.arange(4)[:, None]
+
+        stats['scores'][first, second] = scores[0]
+        stats['scores'][second, first] = scores[1]
+        for name, code in (('mutual_cooperation', 0), ('mutual_defection', 3)):
+            stats[name][first, second] = stats[name][second, first] = outcomes[code]
+        stats['betrayals'][first, second] = outcomes[2]
+        stats['betrayals'][second, first] = outcomes[1]
+        if noise:
+            for name, values in (('intended_cooperation', intended), ('flips', flipped)):
+                stats[name][first, second] = values[0]
+                stats[name][second, first] = values[1]
+
+    stats['names'] = [bot_class().name for bot_class in bot_classes]
+    stats['rounds'] = rounds
+    stats['averages'] = stats['scores'].sum(axis=1) / max(n - 1, 1)
+    return stats
+
+
+def _tremble(noise):
+    """Map an intended cooperation probability to the executed one under move noise."""
+    if not noise:
+        return lambda p: p
+    return lambda p: p * (1 - noise) + (1 - p) * noise
+
+
+def _transition_matrix(bot1_class, bot2_class, tremble):
+    """4 x 4 transition probabilities between pair codes, from bot1's point of view."""
+    matrix = []
+    for code in range(4):
+        p = tremble(bot1_class.cooperation[code])
+        q = tremble(bot2_class.cooperation[SWAPPED[code]])
+        matrix.append([p * q, p * (1 - q), (1 - p) * q, (1 - p) * (1 - q)])
+    return matrix
+
+
+def _multiply(a, b):
+    return [[sum(a[i][k] * b[k][j] for k in range(4)) for j in range(4)] for i in range(4)]
+
+
+def _add(a, b):
+    return [[a[i][j] + b[i][j] for j in range(4)] for i in range(4)]
+
+
+def _power_sum(matrix, exponent):
+    """Return (matrix ** exponent, sum of matrix ** t for t < exponent) by binary doubling."""
+    identity = [[int(i == j) for j in range(4)] for i in range(4)]
+    zero = [[0] * 4 for _ in range(4)]
+    power, total = identity, zero       # Result so far, for the exponent bits consumed
+    step_power, step_sum = matrix, identity  # matrix ** 2^k and the sum of its 2^k powers below it
+    while exponent:
+        if exponent & 1:
+            total = _add(total, _multiply(power, step_sum))
+            power = _multiply(power, step_power)
+        step_sum = _add(step_sum, _multiply(step_power, step_sum))
+        step_power = _multiply(step_power, step_power)
+        exponent >>= 1
+    return power, total
+
+
+def expected_payoffs(bot1_class, bot2_class, config=None, rounds=None):
+    """Exact expected total scores (bot1, bot2) of a match between two memory-one bots.
+
+    rounds defaults to config.number_of_rounds. The arithmetic follows the table values,
+    so probabilities given as fractions.Fraction give exact fractions. With
+    config.move_noise e a bot cooperates with probability p * (1 - e) + (1 - p) * e
+    where its table says p.
+    """
+    if bot1_class.memory != 1 or bot2_class.memory != 1:
+        raise ValueError("expected_payoffs needs two memory-one lookup-table bots")
+    config = config or RunConfig.from_game_config()
+    rounds = config.number_of_rounds if rounds is None else rounds
+    if rounds <= 0:
+        return 0, 0
+
+    tremble = _tremble(config.move_noise)
+    p0, q0 = tremble(bot1_class.opening[0]), tremble(bot2_class.opening[0])
+    start = [p0 * q0, p0 * (1 - q0), (1 - p0) * q0, (1 - p0) * (1 - q0)]
+    _, visits = _power_sum(_transition_matrix(bot1_class, bot2_class, tremble), rounds)
+    # Expected number of rounds spent in every pair code
+    expected = [sum(start[i] * visits[i][code] for i in range(4)) for code in range(4)]
+    points = _points(config)
+    score1 = sum(expected[code] * points[code] for code in range(4))
+    score2 = sum(expected[code] * points[SWAPPED[code]] for code in range(4))
+    return score1, score2
@@ -0,0 +1,191 @@
+"""Log-free match primitives shared by the batch runners (sweeps, shards, pools).
+
+The GUI simulations keep their own _run_match, which also renders the per-round log.
+"""
+import importlib.util
+import inspect
+from simulation.checkpoint import BotError
+from simulation.move_noise import match_noise
+from utils.abstract_bot import AbstractBot
+from utils.moves import Move
+
+
+def load_bot_class(bot_path):
+    """Load the bot class defined in a file, without instantiating it."""
+    try:
+        spec = importlib.util.spec_from_file_location("bot_module", bot_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        for item in dir(module):
+            obj = getattr(module, item)
+            if isinstance(obj, type) and issubclass(obj, AbstractBot) and not inspect.isabstract(obj):
+                return obj
+        raise ValueError("No valid bot class found in file")
+    except Exception as e:
+        raise Exception(f"Failed to load bot from {bot_path}: {e}")
+
+
+def _create(bot_class, config):
+    try:
+        return bot_class.create(config)
+    except Exception as e:
+        raise BotError(bot_class.__name__, e) from e
+
+
+def decide(bot):
+    """Ask a bot for its move; any failure or invalid move is raised as a BotError naming the bot."""
+    try:
+        move = bot.make_decision()
+    except Exception as e:
+        raise BotError(bot.name, e) from e
+    if not isinstance(move, Move):
+        raise BotError(bot.name, TypeError(f"make_decision returned {move!r}, not a Move"))
+    return move
+
+
+def forfeit_scores(rounds, config, faulting_first):
+    """Scores (bot1, bot2) of a forfeited match: 0 for the faulting bot, the mutual
+    cooperation payoff for every planned round for its opponent."""
+    points = rounds * config.mutual_cooperation_points
+    return (0, points) if faulting_first else (points, 0)
+
+
+def _snapshot(bot):
+    try:
+        return bot.state_snapshot()
+    except Exception as e:
+        raise BotError(bot.name, e) from e
+
+
+class CycleDetector:
+    """Spots the first repeated joint state of two bots during a match.
+
+    Both bots must report a state via AbstractBot.state_snapshot(); as soon as either
+    returns None the detector gives up for the rest of the match. A snapshot that
+    raises is a BotError of its bot, like a failing move.
+    """
+
+    def __init__(self):
+        self.seen = {}  # (snapshot1, snapshot2) -> round index it was first seen at
+        self.active = True
+
+    def check(self, bot1, bot2, round_index):
+        """Return the earlier round index with the same joint state as now, or None."""
+        if not self.active:
+            return None
+        snapshot1 = _snapshot(bot1)
+        snapshot2 = _snapshot(bot2)
+        if snapshot1 is None or snapshot2 is None:
+            self.active = False
+            self.seen.clear()
+            return None
+        key = (snapshot1, snapshot2)
+        start = self.seen.get(key)
+        if start is None:
+            self.seen[key] = round_index
+        return start
+
+
+def cycle_outcomes(moves1, moves2, start, remaining):
+    """Outcome counts of the next `remaining` rounds of a match whose moves from round
+    index `start` on repeat forever, i.e. the joint state at len(moves1) equals that at start."""
+    cycle = count_outcomes(moves1[start:], moves2[start:])
+    length = len(moves1) - start
+    repeats, rest = divmod(remaining, length)
+    partial = count_outcomes(moves1[start:start + rest], moves2[start:start + rest])
+    return {pair: n * repeats + partial[pair] for pair, n in cycle.items()}
+
+
+def play_rounds(bot1, bot2, rounds, detector=None, round_hooks=(), noise=None):
+    """Play up to `rounds` rounds between two created bots, extending their histories.
+
+    Returns None once all rounds are played. If the detector finds the joint state of an
+    earlier round, play stops and that round's index is returned: from there on the
+    match repeats the rounds between it and len(bot1.my_history).
+
+    With noise (a simulation.move_noise.MoveNoise) the histories and round hooks get the
+    executed moves and the noise keeps the intended ones.
+
+    Without a detector, round hooks or noise this runs a loop that does nothing per round
+    but ask the bots and record their moves.
+    """
+    if detector is None and not round_hooks and noise is None:
+        for _ in range(rounds):
+            move1 = decide(bot1)
+            move2 = decide(bot2)
+            bot1.my_history.append(move1)
+            bot1.opponent_history.append(move2)
+            bot2.my_history.append(move2)
+            bot2.opponent_history.append(move1)
+        return None
+    return _play_observed_rounds(bot1, bot2, rounds, detector, round_hooks, noise)
+
+
+def _play_observed_rounds(bot1, bot2, rounds, detector, round_hooks, noise):
+    for round_index in range(rounds):
+        if detector:
+            start = detector.check(bot1, bot2, round_index)
+            if start is not None:
+                return start
+        move1 = decide(bot1)
+        move2 = decide(bot2)
+        if noise:
+            move1, move2 = noise.execute(move1, move2)
+        bot1.my_history.append(move1)
+        bot1.opponent_history.append(move2)
+        bot2.my_history.append(move2)
+        bot2.opponent_history.append(move1)
+        for hook in round_hooks:
+            hook(bot1, bot2, round_index, move1, move2)
+    return None
+
+
+def play_match(bot1_class, bot2_class, rounds, config, round_hooks=()):
+    """Play a match between fresh instances of two bot classes and return both move lists.
+
+    With config.fast_forward the moves after the first repeated joint state are filled
+    in from the cycle instead of asking the bots (round hooks only see played rounds).
+    With config.move_noise the executed moves are returned and the match is never
+    fast-forwarded (the flips do not repeat).
+    """
+    bot1 = _create(bot1_class, config)
+    bot2 = _create(bot2_class, config)
+    noise = match_noise(config, bot1.name, bot2.name, rounds)
+    detector = CycleDetector() if config.fast_forward and noise is None else None
+    start = play_rounds(bot1, bot2, rounds, detector, round_hooks, noise)
+    if start is None:
+        return bot1.my_history, bot2.my_history
+    played = len(bot1.my_history)
+    repeats, rest = divmod(rounds - played, played - start)
+    cycle1, cycle2 = bot1.my_history[start:], bot2.my_history[start:]
+    return (bot1.my_history + cycle1 * repeats + cycle1[:rest],
+            bot2.my_history + cycle2 * repeats + cycle2[:rest])
+
+
+def count_outcomes(moves1, moves2):
+    """Count the (C,C), (C,D), (D,C) and (D,D) rounds of a match."""
+    counts = {(Move.COOPERATE, Move.COOPERATE): 0, (Move.COOPERATE, Move.DEFECT): 0,
+              (Move.DEFECT, Move.COOPERATE): 0, (Move.DEFECT, Move.DEFECT): 0}
+    for pair in zip(moves1, moves2):
+        counts[pair] += 1
+    return counts
+
+
+def score_outcomes(counts, config):
+    """Turn outcome counts into match stats under a config's payoffs.
+
+    Returns the same keys the results store records: scores as a (bot1, bot2) pair,
+    mutual cooperation/defection counts and betrayals per bot.
+    """
+    payoffs = config.payoff_table()
+    score1 = sum(payoffs[pair][0] * n for pair, n in counts.items())
+    score2 = sum(payoffs[pair][1] * n for pair, n in counts.items())
+    return {
+        'rounds': sum(counts.values()),
+        'scores': (score1, score2),
+        'mutual_cooperation': counts[Move.COOPERATE, Move.COOPERATE],
+        'mutual_defection': counts[Move.DEFECT, Move.DEFECT],
+        'betrayals1': counts[Move.DEFECT, Move.COOPERATE],
+        'betrayals2': counts[Move.COOPERATE, Move.DEFECT],
+    }
@@ -0,0 +1,331 @@
+"""Pairwise results of huge fields, stored as memory-mapped NumPy matrices.
+
+    matrix_dir = MatrixTournament(bot_paths).run(workers=8)
+    store = MatrixStore(matrix_dir)
+    store.top_k(10), store.row(store.names.index("Tit for Tat"))
+
+A matrix run directory holds one n x n .npy file per statistic, opened with
+numpy.memmap semantics, plus matrix_bots.json with the bot names and paths:
+
+    matrix_scores.npy               score of the row bot against the column bot (-1: not played)
+    matrix_mutual_cooperation.npy   rounds both cooperated (symmetric)
+    matrix_mutual_defection.npy     rounds both defected (symmetric)
+    matrix_betrayals.npy            times the row bot betrayed the column bot
+
+Worker processes open the files for writing and fill in the cells of their own
+matches directly, so results never pass through the parent process. Readers only
+page in what they touch: row() reads a single row, and averages() and top_k() stream
+over blocks of rows.
+
+NumPy is only imported by the functions that need it.
+"""
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from simulation.checkpoint import BotError
+from simulation.log_retention import create_run_dir, finish_run
+from simulation.match_engine import count_outcomes, forfeit_scores, load_bot_class, play_match, score_outcomes
+from simulation.metrics import RunMetrics
+from simulation.parameter_sweep import match_length
+from simulation.scheduling import CostModel, bot_key, schedule, utilization
+from utils.external_bot import is_external
+from utils.game_config import RunConfig
+
+BOTS_FILE = "matrix_bots.json"
+STATISTICS = ('scores', 'mutual_cooperation', 'mutual_defection', 'betrayals')
+UNPLAYED = -1
+
+# Rows per block when streaming over a matrix
+BLOCK_ROWS = 1024
+
+# Bots listed in matrix_summary.txt and results.csv
+SUMMARY_TOP = 50
+
+# Bot classes and open matrices of the current (worker) process
+_WORKER = None
+
+
+def matrix_path(directory, statistic):
+    return os.path.join(directory, f"matrix_{statistic}.npy")
+
+
+def is_matrix_dir(directory):
+    return os.path.exists(os.path.join(directory, BOTS_FILE))
+
+
+class MatrixStore:
+    """The matrices of one run directory, opened with mode 'r' (read) or 'r+' (write)."""
+
+    def __init__(self, directory, mode='r'):
+        import numpy as np
+
+        self.directory = directory
+        with open(os.path.join(directory, BOTS_FILE), 'r') as f:
+            bots = json.load(f)
+        self.names = bots['names']
+        self.paths = bots['paths']
+        self.n = len(self.names)
+        self.matrices = {statistic: np.load(matrix_path(directory, statistic), mmap_mode=mode)
+                         for statistic in STATISTICS}
+
+    @classmethod
+    def create(cls, directory, bot_names, bot_paths):
+        """Create zero-filled matrices for the bots (all scores unplayed) and open them for writing."""
+        from numpy.lib.format import open_memmap
+
+        with open(os.path.join(directory, BOTS_FILE), 'w') as f:
+            json.dump({'names': bot_names, 'paths': [os.path.abspath(path) for path in bot_paths]}, f)
+        n = len(bot_names)
+        for statistic in STATISTICS:
+            matrix = open_memmap(matrix_path(directory, statistic), mode='w+', dtype='int32', shape=(n, n))
+            if statistic == 'scores':
+                for start in range(0, n, BLOCK_ROWS):
+                    matrix[start:start + BLOCK_ROWS] = UNPLAYED
+            matrix.flush()
+            del matrix
+        return cls(directory, mode='r+')
+
+    def record(self, i, j, scores, mutual_cooperation, mutual_defection, betrayals):
+        """Write the result of the match between bots i and j into both of their rows."""
+        m = self.matrices
+        m['scores'][i, j], m['scores'][j, i] = scores
+        m['mutual_cooperation'][i, j] = m['mutual_cooperation'][j, i] = mutual_cooperation
+        m['mutual_defection'][i, j] = m['mutual_defection'][j, i] = mutual_defection
+        m['betrayals'][i, j], m['betrayals'][j, i] = betrayals
+
+    def flush(self):
+        for matrix in self.matrices.values():
+            if hasattr(matrix, 'flush'):
+                matrix.flush()
+
+    def row(self, i):
+        """The statistics of bot i against every opponent, as {statistic: array}."""
+        return {statistic: self.matrices[statistic][i].copy() for statistic in STATISTICS}
+
+    def _blocks(self):
+        for start in range(0, self.n, BLOCK_ROWS):
+            yield start, {statistic: self.matrices[statistic][start:start + BLOCK_ROWS] for statistic in STATISTICS}
+
+    def averages(self):
+        """Average score per played match of every bot (NaN for bots without matches)."""
+        import numpy as np
+
+        averages = np.full(self.n, np.nan)
+        for start, block in self._blocks():
+            played = block['scores'] >= 0
+            counts = played.sum(axis=1)
+            totals = np.where(played, block['scores'], 0).sum(axis=1, dtype=np.int64)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                averages[start:start + len(counts)] = np.where(counts > 0, totals / counts, np.nan)
+        return averages
+
+    def top_k(self, k):
+        """The k best bots by average score, as (index, name, average) best first."""
+        import numpy as np
+
+        averages = np.nan_to_num(self.averages(), nan=-np.inf)
+        k = min(k, self.n)
+        best = np.argpartition(-averages, k - 1)[:k] if k else []
+        best = sorted(best, key=lambda index: -averages[index])
+        return [(int(index), self.names[index], float(averages[index])) for index in best]
+
+    def totals(self):
+        """Matches and rounds of mutual cooperation, mutual defection and betrayal over the whole run."""
+        totals = {'matches': 0, 'mutual_cooperation': 0, 'mutual_defection': 0, 'betrayals': 0}
+        for _, block in self._blocks():
+            played = block['scores'] >= 0
+            totals['matches'] += int(played.sum())
+            for statistic in ('mutual_cooperation', 'mutual_defection', 'betrayals'):
+                totals[statistic] += int(block[statistic][played].sum())
+        # Every match fills two cells; betrayals are per bot, so their sum is already per match
+        totals['matches'] //= 2
+        totals['mutual_cooperation'] //= 2
+        totals['mutual_defection'] //= 2
+        return totals
+
+
+def _init_worker(bot_paths, directory, config):
+    global _WORKER
+    bot_classes = [load_bot_class(path) for path in bot_paths]
+    names = [bot_class().name for bot_class in bot_classes]
+    _WORKER = (bot_classes, names, MatrixStore(directory, mode='r+'), config)
+
+
+def _play_rows(rows):
+    """Play every match of the given rows against the bots after them.
+
+    Returns (row, matches, rounds, seconds) per row. Matches of external-program bots
+    are played first, all at once (see simulation.external_matches); their time is
+    shared among the rows by rounds.
+    """
+    bot_classes, names, store, config = _WORKER
+    seed = config.seed if config.seed is not None else 0
+    external = [(i, j, match_length(seed, i, j, config)) for i in rows for j in range(i + 1, len(bot_classes))
+                if is_external(bot_classes[i]) or is_external(bot_classes[j])]
+    outcomes = {}
+    external_seconds = {}
+    if external:
+        from simulation.external_matches import play_matches  # asyncio, only for external bots
+        start = time.perf_counter()
+        played = play_matches([(bot_classes[i], bot_classes[j], rounds) for i, j, rounds in external], config)
+        seconds_per_round = (time.perf_counter() - start) / sum(rounds for _, _, rounds in external)
+        for (i, j, rounds), outcome in zip(external, played):
+            outcomes[i, j] = outcome
+            external_seconds[i] = external_seconds.get(i, 0) + rounds * seconds_per_round
+
+    timed = []
+    for i in rows:
+        start = time.perf_counter()
+        rounds_played = 0
+        for j in range(i + 1, len(bot_classes)):
+            rounds = match_length(seed, i, j, config)
+            random.seed(zlib.crc32(f"{seed}:{i}:{j}".encode()))
+            try:
+                if (i, j) in outcomes:
+                    if isinstance(outcomes[i, j], BotError):
+                        raise outcomes[i, j]
+                    moves1, moves2 = outcomes[i, j]
+                else:
+                    moves1, moves2 = play_match(bot_classes[i], bot_classes[j], rounds, config)
+                stats = score_outcomes(count_outcomes(moves1, moves2), config)
+                store.record(i, j, stats['scores'], stats['mutual_cooperation'], stats['mutual_defection'],
+                             (stats['betrayals1'], stats['betrayals2']))
+            except BotError as e:
+                store.record(i, j, forfeit_scores(rounds, config, e.bot_name == names[i]), 0, 0, (0, 0))
+            rounds_played += rounds
+        seconds = time.perf_counter() - start + external_seconds.get(i, 0)
+        timed.append((i, len(bot_classes) - 1 - i, rounds_played, seconds))
+    store.flush()
+    return timed
+
+
+class MatrixTournament:
+    """Play every pair of a huge field of bots into the memory-mapped matrices of a run directory."""
+
+    def __init__(self, bot_paths, config=None):
+        self.bot_paths = list(bot_paths)
+        self.config = config or RunConfig.from_game_config()
+        self.logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+        os.makedirs(self.logs_dir, exist_ok=True)
+
+    def run(self, workers=1, progress=None, top=SUMMARY_TOP):
+        """Run the round robin and return its directory.
+
+        No match logs are written: the matrices hold every pairwise result, and
+        matrix_summary.txt and results.csv hold the top bots only. Row i covers the
+        matches of bot i against the bots after it; rows are scheduled longest-first
+        from the per-bot cost estimates (see simulation.scheduling) and every worker
+        writes the cells of its rows itself.
+        """
+        metrics = RunMetrics('matrix')
+        timestamp = datetime.now().strftime("%H%M%S")
+        matrix_dir = create_run_dir(self.logs_dir, f"{timestamp}_matrix")
+
+        with metrics.timed('bot_load'):
+            bot_names = [load_bot_class(path)().name for path in self.bot_paths]
+        with metrics.timed('io'):
+            MatrixStore.create(matrix_dir, bot_names, self.bot_paths)
+        with metrics.timed('engine'):
+            cost_model = CostModel.for_logs_dir(self.logs_dir)
+            keys = [bot_key(path) for path in self.bot_paths]
+            costs = cost_model.estimates(keys)
+            later_costs = list(itertools.accumulate(reversed(costs)))[::-1] + [0]  # Sum of costs[i:]
+            rows = range(len(self.bot_paths))
+
+        n = len(self.bot_paths)
+        total = n * (n - 1) // 2
+        timings = []  # (row, matches, rounds, seconds)
+
+        def collect(timed):
+            timings.extend(timed)
+            if progress:
+                progress(sum(matches for _, matches, _, _ in timings), total, "matrix matches")
+
+        if workers > 1:
+            chunks = schedule(rows, lambda i: (n - 1 - i) * costs[i] + later_costs[i + 1], workers)
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.bot_paths, matrix_dir, self.config)) as executor:
+                futures = [executor.submit(_play_rows, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    collect(future.result())
+            wall = time.perf_counter() - start
+            metrics.seconds['bot'] = metrics.seconds['engine'] = None  # Spent in the workers
+            metrics.utilization = utilization(sum(seconds for *_, seconds in timings), workers, wall)
+            print(f"Core utilization: {metrics.utilization:.0%} of {workers} workers", file=sys.stderr)
+        else:
+            with metrics.timed('bot'):
+                _init_worker(self.bot_paths, matrix_dir, self.config)
+                collect(_play_rows(rows))
+        for _, matches, rounds, _ in timings:
+            metrics.matches += matches
+            metrics.rounds += rounds
+
+        with metrics.timed('io'):
+            # A row's time per round, less the estimated cost of its opponents, is the row bot's cost
+            fitted = {keys[i]: seconds / rounds - (later_costs[i + 1] / matches)
+                      for i, matches, rounds, seconds in timings if matches and rounds}
+            cost_model.merge(fitted, names=dict(zip(keys, bot_names)))
+            cost_model.save()
+            store = MatrixStore(matrix_dir)
+            write_summary(store, matrix_dir, self.config, top)
+            write_top_results(store, matrix_dir, top)
+        metrics.write(matrix_dir)
+        finish_run(matrix_dir)
+        return matrix_dir
+
+
+def write_summary(store, directory, config, top=SUMMARY_TOP):
+    """Write matrix_summary.txt: the ranking of the top bots and the aggregate statistics."""
+    best = store.top_k(top)
+    totals = store.totals()
+    name_width = max([len(name) for _, name, _ in best] + [len("Bot")])
+
+    with open(os.path.join(directory, "matrix_summary.txt"), 'w') as f:
+        f.write("="*50 + "\n")
+        f.write("MATRIX TOURNAMENT SUMMARY\n")
+        f.write("="*50 + "\n\n")
+
+        f.write(f"TOP {len(best)} OF {store.n} BOTS\n")
+        f.write("-"*50 + "\n\n")
+        header = f"{'Rank':>4} | {'Bot'.ljust(name_width)} | {'Avg score':>9}"
+        f.write(header + "\n")
+        f.write("-" * len(header) + "\n")
+        for rank, (_, name, average) in enumerate(best, 1):
+            f.write(f"{rank:>4} | {name.ljust(name_width)} | {average:>9.1f}\n")
+        f.write("\n\n")
+
+        f.write("AGGREGATE STATISTICS\n")
+        f.write("-"*50 + "\n")
+        total_matches = totals['matches']
+        f.write(f"Total Matches: {total_matches}\n")
+        f.write(f"Rounds per Match: {config.number_of_rounds}{' (with noise)' if config.add_noise else ''}\n")
+        if config.move_noise:
+            f.write(f"Move Noise: every move flipped with probability {config.move_noise:g}\n")
+        if total_matches:
+            f.write(f"Average Mutual Cooperation: {totals['mutual_cooperation']/total_matches:.1f} per match\n")
+            f.write(f"Average Mutual Defection: {totals['mutual_defection']/total_matches:.1f} per match\n")
+            f.write(f"Average Bot Betrayals: {totals['betrayals']/total_matches:.1f} per match\n")
+        f.write("\nAll pairwise results are in the matrix_*.npy files of this directory.\n")
+
+
+def write_top_results(store, directory, top=SUMMARY_TOP):
+    """Write results.csv for the top bots, in the tournament's shape.
+
+    The score columns are the matches among the top bots; Average is the bot's
+    average over the whole field, so the visualizer ranks them as in the summary.
+    """
+    best = store.top_k(top)
+    indices = [index for index, _, _ in best]
+    with open(os.path.join(directory, "results.csv"), 'w') as f:
+        f.write("Bot," + ",".join(name for _, name, _ in best) + ",Average\n")
+        for index, name, average in best:
+            scores = store.matrices['scores'][index, indices]
+            row = [name] + ["" if opponent == index else str(int(score)) for opponent, score in zip(indices, scores)]
+            f.write(",".join(row + [f"{average:.1f}"]) + "\n")
@@ -0,0 +1,135 @@
+"""Throughput and timing metrics of a run, written next to its results.
+
+Every run writes metrics.json and metrics.prom (Prometheus text format) into its
+directory. Time is split into phases measured per match, never per round:
+
+    bot_load  loading bot files
+    bot       the round loop, i.e. the bots' decisions plus recording their moves
+    engine    planning, scoring and bookkeeping
+    io        match logs, summaries, CSV files and the results store
+
+Phases a run cannot attribute (e.g. work done in sweep worker processes) are null.
+Runs using worker processes also report the core utilization, the share of the
+workers' capacity spent on matches; it is null for single-process runs.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_FILE = "metrics.json"
+PROMETHEUS_FILE = "metrics.prom"
+PHASES = ('bot_load', 'bot', 'engine', 'io')
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process and its finished children, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak if sys.platform == 'darwin' else peak * 1024  # Linux reports kilobytes
+
+
+class RunMetrics:
+    def __init__(self, kind):
+        self.kind = kind
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        self.matches = 0
+        self.rounds = 0
+        self.seconds = {phase: 0.0 for phase in PHASES}
+        self.utilization = None  # Set by runs using worker processes
+
+    @contextmanager
+    def timed(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[phase] += time.perf_counter() - start
+
+    @contextmanager
+    def match(self, rounds):
+        """Time a whole match; the part its bot and io phases do not cover counts as engine time.
+
+        The match is only counted if it completes; a failed match's time still counts.
+        """
+        start = time.perf_counter()
+        covered = self.seconds['bot'] + self.seconds['io']
+        try:
+            yield
+            self.count_match(rounds)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds['engine'] += elapsed - (self.seconds['bot'] + self.seconds['io'] - covered)
+
+    def count_match(self, rounds):
+        self.matches += 1
+        self.rounds += rounds
+
+    def as_dict(self):
+        wall = time.perf_counter() - self._start
+        return {
+            'kind': self.kind,
+            'started_at': self.started_at,
+            'wall_seconds': wall,
+            'matches': self.matches,
+            'rounds': self.rounds,
+            'matches_per_second': self.matches / wall if wall else 0,
+            'rounds_per_second': self.rounds / wall if wall else 0,
+            'seconds': dict(self.seconds),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'core_utilization': self.utilization,
+        }
+
+    def write(self, directory):
+        """Write metrics.json and metrics.prom into directory and return the metrics dict."""
+        metrics = self.as_dict()
+        with open(os.path.join(directory, METRICS_FILE), 'w') as f:
+            json.dump(metrics, f, indent=2)
+        with open(os.path.join(directory, PROMETHEUS_FILE), 'w') as f:
+            f.write(prometheus_text(metrics))
+        return metrics
+
+
+def prometheus_text(metrics):
+    """Render a metrics dict in the Prometheus text exposition format."""
+    labels = f'kind="{metrics["kind"]}"'
+    series = [
+        ('pd_run_wall_seconds', 'Wall-clock duration of the run.', [(labels, metrics['wall_seconds'])]),
+        ('pd_run_matches', 'Matches played in the run.', [(labels, metrics['matches'])]),
+        ('pd_run_rounds', 'Rounds played in the run.', [(labels, metrics['rounds'])]),
+        ('pd_run_matches_per_second', 'Matches per second of wall-clock time.', [(labels, metrics['matches_per_second'])]),
+        ('pd_run_rounds_per_second', 'Rounds per second of wall-clock time.', [(labels, metrics['rounds_per_second'])]),
+        ('pd_run_phase_seconds', 'Time spent per phase of the run.',
+         [(f'{labels},phase="{phase}"', seconds) for phase, seconds in metrics['seconds'].items() if seconds is not None]),
+        ('pd_run_peak_rss_bytes', 'Peak resident set size of the run process.',
+         [(labels, metrics['peak_rss_bytes'])] if metrics['peak_rss_bytes'] is not None else []),
+        ('pd_run_core_utilization', 'Share of the worker processes\' capacity spent on matches.',
+         [(labels, metrics['core_utilization'])] if metrics.get('core_utilization') is not None else []),
+    ]
+    lines = []
+    for name, help_text, samples in series:
+        if not samples:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{{{sample_labels}}} {value}" for sample_labels, value in samples)
+    return "\n".join(lines) + "\n"
+
+
+def summary_line(metrics):
+    """One-line human-readable summary of a metrics dict."""
+    seconds = metrics['seconds']
+    phases = " / ".join(f"{phase} {seconds[phase]:.2f}s" for phase in PHASES if seconds.get(phase) is not None)
+    rss = metrics['peak_rss_bytes']
+    utilization = metrics.get('core_utilization')
+    return (f"{metrics['kind']}: {metrics['matches']} matches ({metrics['matches_per_second']:.1f}/s), "
+            f"{metrics['rounds']} rounds ({metrics['rounds_per_second']:.0f}/s) in {metrics['wall_seconds']:.2f}s; "
+            f"{phases}; peak RSS " + (f"{rss / 2 ** 20:.1f} MB" if rss is not None else "n/a")
+            + (f"; core utilization {utilization:.0%}" if utilization is not None else ""))
@@ -0,0 +1,72 @@
+"""Trembling-hand noise: every intended move is flipped with probability config.move_noise.
+
+    python -m simulation tournament bots/prebuilt --move-noise 0.05
+
+The flips of a match are drawn up front, as two boolean masks of one flag per round,
+from a stream of its own: seeded from config.seed and the bot names when a seed is
+set, from the global random state otherwise. Both bots see the executed moves in their
+histories, scores are computed from the executed moves, and MoveNoise keeps the
+intended moves for the stats. Because a shorter match draws a prefix of the flags of a
+longer one, matches of different lengths can share one simulation.
+
+The masks are drawn with NumPy when it is installed and with the random module
+otherwise; the two produce different (equally distributed) flips for the same seed.
+"""
+import random
+import zlib
+from utils.moves import Move
+
+FLIPPED = {Move.COOPERATE: Move.DEFECT, Move.DEFECT: Move.COOPERATE}
+
+
+def flip_masks(rounds, probability, seed):
+    """Two lists of `rounds` flags, True where the move of bot 1 / bot 2 is flipped."""
+    try:
+        import numpy as np
+    except ImportError:
+        rng = random.Random(seed)
+        draws = [rng.random() < probability for _ in range(2 * rounds)]
+        return draws[0::2], draws[1::2]
+    # One (bot 1, bot 2) pair of draws per round, so shorter matches draw a prefix
+    mask = np.random.default_rng(seed).random((rounds, 2)) < probability
+    return mask[:, 0].tolist(), mask[:, 1].tolist()
+
+
+def noise_seed(config, bot1_name, bot2_name):
+    if config.seed is None:
+        return random.getrandbits(64)
+    return zlib.crc32(f"{config.seed}:{bot1_name}:{bot2_name}".encode())
+
+
+class MoveNoise:
+    """The flips of one match; execute() turns the intended moves of a round into the executed ones."""
+
+    def __init__(self, rounds, probability, seed):
+        self.flips1, self.flips2 = flip_masks(rounds, probability, seed)
+        self.intended1 = []
+        self.intended2 = []
+
+    def execute(self, move1, move2):
+        round_index = len(self.intended1)
+        self.intended1.append(move1)
+        self.intended2.append(move2)
+        if self.flips1[round_index]:
+            move1 = FLIPPED[move1]
+        if self.flips2[round_index]:
+            move2 = FLIPPED[move2]
+        return move1, move2
+
+    def stats(self):
+        """Intended cooperations and flipped moves of both bots, as (bot1, bot2) lists."""
+        played = len(self.intended1)
+        return {
+            'intended_cooperation': [self.intended1.count(Move.COOPERATE), self.intended2.count(Move.COOPERATE)],
+            'flips': [sum(self.flips1[:played]), sum(self.flips2[:played])],
+        }
+
+
+def match_noise(config, bot1_name, bot2_name, rounds):
+    """The MoveNoise of a match, or None without config.move_noise."""
+    if not config.move_noise:
+        return None
+    return MoveNoise(rounds, config.move_noise, noise_seed(config, bot1_name, bot2_name))
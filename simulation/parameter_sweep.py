@@ -0,0 +1,259 @@
+import ast
+import csv
+import itertools
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from simulation.log_retention import create_run_dir, finish_run
+from simulation.match_engine import count_outcomes, load_bot_class, play_match, score_outcomes
+from simulation.metrics import RunMetrics
+from simulation.scheduling import CostModel, bot_key, schedule, utilization
+from utils.game_config import RunConfig
+
+PAYOFF_FIELDS = ('mutual_cooperation_points', 'betrayal_points', 'betrayed_points', 'mutual_defection_points')
+
+# Names whose presence in a bot's source means it can see the payoffs or the round count
+CONFIG_NAMES = {'GameConfig', 'RunConfig', 'config', 'configure', 'payoff_table'}
+PAYOFF_NAMES = CONFIG_NAMES | {name.upper() for name in PAYOFF_FIELDS} | set(PAYOFF_FIELDS)
+ROUNDS_NAMES = CONFIG_NAMES | {'total_rounds', 'NUMBER_OF_ROUNDS', 'number_of_rounds'}
+
+# Imports a bot may use without losing its independence guarantees
+SAFE_IMPORTS = {'utils.abstract_bot', 'utils.moves', 'typing', 'math', 'random', 'itertools',
+                'collections', 'functools', 'enum'}
+
+# Loaded bot classes of the current (worker) process, keyed by path
+_BOT_CLASSES = {}
+
+# (bot paths, configs, seed) of the sweep the current (worker) process works on
+_SWEEP = None
+
+
+def config_grid(**values):
+    """Return a RunConfig for every combination of the given field values.
+
+    Fields not mentioned keep their GameConfig defaults, e.g.
+    config_grid(betrayal_points=[5, 6], number_of_rounds=[50, 1000]) gives four configs.
+    """
+    fields = list(values)
+    return [RunConfig.from_game_config(**dict(zip(fields, combo)))
+            for combo in itertools.product(*(values[field] for field in fields))]
+
+
+def bot_dependencies(bot_path):
+    """Statically check whether a bot can depend on the payoffs and on the round count.
+
+    Returns (uses_payoffs, uses_rounds). Anything the check cannot see through (indirect
+    subclassing, imports of other project modules) counts as depending on both.
+    """
+    with open(bot_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=bot_path)
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            names.add(node.attr)
+        elif isinstance(node, ast.Import):
+            if any(alias.name not in SAFE_IMPORTS for alias in node.names):
+                return True, True
+        elif isinstance(node, ast.ImportFrom):
+            if node.module not in SAFE_IMPORTS:
+                return True, True
+        elif isinstance(node, ast.ClassDef):
+            if not all(getattr(base, 'id', None) in ('AbstractBot', 'ABC', 'object') for base in node.bases):
+                return True, True
+    return bool(names & PAYOFF_NAMES), bool(names & ROUNDS_NAMES)
+
+
+def match_length(seed, i, j, config):
+    """Rounds actually played by pair (i, j) under a config.
+
+    With add_noise the length is drawn between 80% and 120% of number_of_rounds from a
+    stream that depends only on the pair and number_of_rounds, so configs differing in
+    payoffs alone play matches of equal length.
+    """
+    if not config.add_noise:
+        return config.number_of_rounds
+    rounds = config.number_of_rounds
+    rng = random.Random(zlib.crc32(f"{seed}:{i}:{j}:{rounds}".encode()))
+    return rng.randint(int(rounds * 0.8), int(rounds * 1.2))
+
+
+def plan_tasks(bot_paths, configs, seed=0):
+    """Group the (config x pair) matches into simulation tasks that share a move sequence.
+
+    A task is (i, j, config index to simulate with, rounds to simulate, [(config index, rounds)]):
+    the match is simulated once and every listed config is scored from a prefix of it.
+    Matches between bots that ignore the payoffs share one simulation across payoff
+    variants; if they also ignore the round count, all round counts share the longest one.
+    Only configs with the same move_noise share a simulation.
+    """
+    dependencies = [bot_dependencies(path) for path in bot_paths]
+    tasks = []
+    for i, j in itertools.combinations(range(len(bot_paths)), 2):
+        uses_payoffs = dependencies[i][0] or dependencies[j][0]
+        uses_rounds = dependencies[i][1] or dependencies[j][1]
+        groups = {}
+        for config_index, config in enumerate(configs):
+            rounds = match_length(seed, i, j, config)
+            if uses_payoffs:
+                key = config_index
+            elif uses_rounds:
+                key = (config.move_noise, config.number_of_rounds, rounds)
+            else:
+                key = config.move_noise
+            groups.setdefault(key, []).append((config_index, rounds))
+        for members in groups.values():
+            longest = max(members, key=lambda member: member[1])
+            tasks.append((i, j, longest[0], longest[1], members))
+    return tasks
+
+
+def _init_worker(bot_paths, configs, seed):
+    global _SWEEP
+    _SWEEP = (bot_paths, configs, seed)
+    for path in bot_paths:
+        if path not in _BOT_CLASSES:
+            _BOT_CLASSES[path] = load_bot_class(path)
+
+
+def _run_task(task):
+    bot_paths, configs, seed = _SWEEP
+    i, j, sim_index, sim_rounds, members = task
+    random.seed(zlib.crc32(f"{seed}:{i}:{j}:{sim_index}".encode()))
+    moves1, moves2 = play_match(_BOT_CLASSES[bot_paths[i]], _BOT_CLASSES[bot_paths[j]],
+                                sim_rounds, configs[sim_index])
+
+    results = []
+    for config_index, rounds in members:
+        counts = count_outcomes(moves1[:rounds], moves2[:rounds])
+        results.append((config_index, i, j, score_outcomes(counts, configs[config_index])))
+    return results
+
+
+def _run_chunk(chunk):
+    """Run a chunk of tasks; return (task, results, seconds) for each."""
+    timed = []
+    for task in chunk:
+        start = time.perf_counter()
+        results = _run_task(task)
+        timed.append((task, results, time.perf_counter() - start))
+    return timed
+
+
+class ParameterSweep:
+    """Run every pair of bots under every config of a grid and rank the bots per config."""
+
+    def __init__(self, bot_paths, configs, seed=0):
+        self.bot_paths = list(bot_paths)
+        self.configs = list(configs)
+        self.seed = seed
+        self.logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+        os.makedirs(self.logs_dir, exist_ok=True)
+
+    def run(self, workers=1, progress=None):
+        """Run the sweep and return the directory holding sweep_results.csv and sweep_rankings.csv.
+
+        With workers > 1 tasks are spread over a process pool whose workers load each bot
+        class once and reuse it for all their tasks. Tasks are scheduled longest-first in
+        shrinking chunks from the per-bot cost estimates of earlier runs (see
+        simulation.scheduling); the timings of this run refine the estimates.
+        """
+        metrics = RunMetrics('sweep')
+        with metrics.timed('bot_load'):
+            _init_worker(self.bot_paths, self.configs, self.seed)
+            bot_names = [_BOT_CLASSES[path]().name for path in self.bot_paths]
+        with metrics.timed('engine'):
+            tasks = plan_tasks(self.bot_paths, self.configs, self.seed)
+            cost_model = CostModel.for_logs_dir(self.logs_dir)
+            keys = [bot_key(path) for path in self.bot_paths]
+            costs = cost_model.estimates(keys)
+
+        results = []
+        timings = []  # (task, seconds)
+        if workers > 1:
+            chunks = schedule(tasks, lambda task: task[3] * (costs[task[0]] + costs[task[1]]), workers)
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.bot_paths, self.configs, self.seed)) as executor:
+                futures = [executor.submit(_run_chunk, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    for task, task_results, seconds in future.result():
+                        results.extend(task_results)
+                        timings.append((task, seconds))
+                        if progress:
+                            progress(len(timings), len(tasks), "sweep tasks")
+            wall = time.perf_counter() - start
+            metrics.seconds['bot'] = metrics.seconds['engine'] = None  # Spent in the workers
+            metrics.utilization = utilization(sum(seconds for _, seconds in timings), workers, wall)
+            print(f"Core utilization: {metrics.utilization:.0%} of {workers} workers", file=sys.stderr)
+        else:
+            with metrics.timed('bot'):
+                for task in tasks:
+                    (_, task_results, seconds), = _run_chunk([task])
+                    results.extend(task_results)
+                    timings.append((task, seconds))
+                    if progress:
+                        progress(len(timings), len(tasks), "sweep tasks")
+        for _, _, _, stats in results:
+            metrics.count_match(stats['rounds'])
+
+        with metrics.timed('io'):
+            cost_model.update([(keys[task[0]], keys[task[1]], task[3], seconds) for task, seconds in timings],
+                              names=dict(zip(keys, bot_names)))
+            cost_model.save()
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        sweep_dir = create_run_dir(self.logs_dir, f"{timestamp}_sweep")
+        with metrics.timed('io'):
+            self._write_results(sweep_dir, bot_names, results)
+            self._write_rankings(sweep_dir, bot_names, results)
+        metrics.write(sweep_dir)
+        finish_run(sweep_dir)
+        return sweep_dir
+
+    def _config_columns(self, config_index):
+        config = self.configs[config_index].as_dict()
+        return [config_index] + [config[field] for field in sorted(config)]
+
+    def _config_header(self):
+        return ['config_id'] + sorted(self.configs[0].as_dict())
+
+    def _write_results(self, directory, bot_names, results):
+        """Write one row per bot per match (long format)."""
+        with open(os.path.join(directory, "sweep_results.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self._config_header() + ['bot', 'opponent', 'rounds', 'score', 'opponent_score',
+                                                     'mutual_cooperation', 'mutual_defection',
+                                                     'betrayals', 'opponent_betrayals'])
+            for config_index, i, j, stats in sorted(results, key=lambda r: r[:3]):
+                columns = self._config_columns(config_index)
+                shared = [stats['mutual_cooperation'], stats['mutual_defection']]
+                writer.writerow(columns + [bot_names[i], bot_names[j], stats['rounds'], *stats['scores']]
+                                + shared + [stats['betrayals1'], stats['betrayals2']])
+                writer.writerow(columns + [bot_names[j], bot_names[i], stats['rounds'], *stats['scores'][::-1]]
+                                + shared + [stats['betrayals2'], stats['betrayals1']])
+
+    def _write_rankings(self, directory, bot_names, results):
+        """Write the ranking by average score per match for every config; ties keep the bot order."""
+        totals = {}
+        for config_index, i, j, stats in sorted(results, key=lambda r: r[:3]):
+            for bot, score in [(i, stats['scores'][0]), (j, stats['scores'][1])]:
+                total = totals.setdefault((config_index, bot), [0, 0])
+                total[0] += score
+                total[1] += 1
+
+        with open(os.path.join(directory, "sweep_rankings.csv"), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self._config_header() + ['rank', 'bot', 'average_score'])
+            for config_index in range(len(self.configs)):
+                # Results arrive in completion order with workers, so ties are broken by bot index
+                averages = sorted((-total / matches, bot)
+                                  for (index, bot), (total, matches) in totals.items() if index == config_index)
+                for rank, (average, bot) in enumerate(averages, 1):
+                    writer.writerow(self._config_columns(config_index) + [rank, bot_names[bot], f"{-average:.1f}"])
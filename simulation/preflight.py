@@ -0,0 +1,313 @@
+"""Pre-flight checks that find broken bots before a run instead of in the middle of it.
+
+    reports = validate_bots(bot_paths, workers=4)
+    bot_paths = [path for path in bot_paths if path not in excluded_paths(reports)]
+    python -m simulation preflight bots/user-created
+    python -m simulation tournament --preflight bots/prebuilt bots/user-created
+
+Every bot is checked in a worker process, in parallel across bots:
+
+    load          the file loads and the bot can be created
+    moves         against the scripted opponents of simulation.fingerprint (fixed
+                  patterns, late defections, random sequences) with total_rounds of
+                  1, 2, 3, 10 and the run's rounds, every move is a Move and nothing raises
+    determinism   the same seed gives the same moves twice; if not, the bot keeps state
+                  between matches or draws from an unseeded source (a warning). Bots whose
+                  moves change with the seed are reported as random, which is fine
+    latency       no move takes longer than MOVE_TIME_LIMIT: REPEATED_SLOW_MOVES such moves
+                  exclude the bot, a single one only if it is as slow again when replayed
+                  (a one-off stall of the machine is a warning). A 99th percentile move time
+                  above SLOW_MOVE is a warning
+    memory        peak memory of a long match and memory kept after every match (warnings)
+    time          all checks finish within BOT_TIME_LIMIT seconds (catches endless loops;
+                  only enforced where signal.setitimer exists, i.e. not on Windows)
+
+A bot that fails load, moves, latency or time is excluded, and so is a bot that takes
+its worker process down. A report is a dict with path, name, status (ok, warning or
+excluded), problems ([{'severity', 'check', 'message'}]), checked (the checks that ran
+to the end), deterministic, moves,
+mean_move_seconds, p99_move_seconds, max_move_seconds, peak_bytes and retained_bytes.
+"""
+import contextlib
+import gc
+import json
+import os
+import random
+import signal
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from simulation.checkpoint import BotError
+from simulation.fingerprint import probe_sequences
+from simulation.match_engine import decide, load_bot_class
+from utils.game_config import RunConfig
+
+REPORT_FILE = "preflight_report.txt"
+EXCLUDED_FILE = "excluded.txt"
+
+CHECK_ROUNDS = (1, 2, 3, 10)  # total_rounds checked besides the run's own
+DETERMINISM_SEEDS = (1, 2)
+MOVE_TIME_LIMIT = 1.0       # Seconds; a slower move excludes the bot if it is repeatable
+REPEATED_SLOW_MOVES = 3     # Moves over MOVE_TIME_LIMIT that exclude a bot without replaying them
+SLOW_MOVE = 0.01            # Seconds; a slower 99th percentile move time is a warning
+BOT_TIME_LIMIT = 60         # Seconds for all checks of one bot
+MEMORY_MATCHES = 3          # Long matches played to measure memory
+PEAK_MEMORY_WARNING = 64 << 20
+RETAINED_MEMORY_WARNING = 256 << 10
+
+
+class PreflightTimeout(BaseException):
+    """Raised by the alarm; a BaseException so bots and decide() do not catch it."""
+
+
+def _alarm(signum, frame):
+    raise PreflightTimeout()
+
+
+class _Checker:
+    def __init__(self, bot_class, config):
+        self.bot_class = bot_class
+        self.config = config
+        self.move_seconds = []
+        self.slow_moves = []  # (seconds, opponent_moves, total_rounds, seed, round index) over MOVE_TIME_LIMIT
+
+    def play(self, opponent_moves, total_rounds, seed=None):
+        """Moves of a fresh bot against a scripted opponent, timing every move.
+
+        With a seed, the random module is seeded first and moves over MOVE_TIME_LIMIT
+        are kept in slow_moves, so that retime() can replay them.
+        """
+        if seed is not None:
+            random.seed(seed)
+        bot = self.bot_class.create(self.config.replace(number_of_rounds=total_rounds))
+        clock = time.perf_counter
+        for opponent_move in opponent_moves:
+            start = clock()
+            move = decide(bot)
+            seconds = clock() - start
+            self.move_seconds.append(seconds)
+            if seconds > MOVE_TIME_LIMIT and seed is not None:
+                self.slow_moves.append((seconds, opponent_moves, total_rounds, seed, len(bot.my_history)))
+            bot.my_history.append(move)
+            bot.opponent_history.append(opponent_move)
+        return bot.my_history
+
+    def retime(self, slow_move):
+        """Replay the match of a slow move up to that move and return how long it takes now."""
+        _, opponent_moves, total_rounds, seed, round_index = slow_move
+        random.seed(seed)
+        bot = self.bot_class.create(self.config.replace(number_of_rounds=total_rounds))
+        for opponent_move in opponent_moves[:round_index]:
+            bot.my_history.append(decide(bot))
+            bot.opponent_history.append(opponent_move)
+        start = time.perf_counter()
+        decide(bot)
+        return time.perf_counter() - start
+
+
+def check_bot(path, config):
+    """Run all checks on one bot file and return its report."""
+    report = {'path': path, 'name': None, 'status': 'ok', 'problems': [], 'checked': [], 'deterministic': None, 'moves': 0,
+              'mean_move_seconds': None, 'p99_move_seconds': None, 'max_move_seconds': None, 'peak_bytes': None,
+              'retained_bytes': None}
+
+    def problem(severity, check, message):
+        report['problems'].append({'severity': severity, 'check': check, 'message': message})
+        if severity == 'error':
+            report['status'] = 'excluded'
+        elif report['status'] == 'ok':
+            report['status'] = 'warning'
+
+    alarm = hasattr(signal, 'setitimer')
+    if alarm:
+        previous = signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, BOT_TIME_LIMIT)
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            _run_checks(path, config, report, problem)
+    except PreflightTimeout:
+        if 'latency' not in report['checked']:
+            problem('error', 'time', f"checks did not finish within {BOT_TIME_LIMIT} s (endless loop or far too slow)")
+        else:
+            skipped = [check for check in ('determinism', 'memory') if check not in report['checked']]
+            problem('warning', 'time', f"out of time after the move checks, {' and '.join(skipped)} not checked")
+    except BotError as e:
+        problem('error', 'moves', f"{e} (in a long match)")
+    except (Exception, SystemExit) as e:
+        problem('error', 'crash', f"{type(e).__name__}: {e}")
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return report
+
+
+def _run_checks(path, config, report, problem):
+    try:
+        bot_class = load_bot_class(path)
+        report['name'] = bot_class.create(config).name
+    except Exception as e:
+        problem('error', 'load', str(e))
+        return
+    report['checked'].append('load')
+
+    checker = _Checker(bot_class, config)
+    try:
+        for total_rounds in CHECK_ROUNDS + (config.number_of_rounds,):
+            for number, sequence in enumerate(probe_sequences(total_rounds)):
+                checker.play(sequence, total_rounds, seed=number)
+    except BotError as e:
+        problem('error', 'moves', f"{e} (total_rounds {total_rounds}, probe {number})")
+        return
+    except Exception as e:
+        problem('error', 'moves', f"could not be created: {type(e).__name__}: {e}")
+        return
+    finally:
+        if checker.move_seconds:
+            report['moves'] = len(checker.move_seconds)
+            report['mean_move_seconds'] = sum(checker.move_seconds) / len(checker.move_seconds)
+            report['p99_move_seconds'] = sorted(checker.move_seconds)[int(len(checker.move_seconds) * 0.99)]
+            report['max_move_seconds'] = max(checker.move_seconds)
+
+    slow_moves = sorted(checker.slow_moves, key=lambda slow_move: slow_move[0], reverse=True)
+    if len(slow_moves) >= REPEATED_SLOW_MOVES:
+        problem('error', 'latency', f"{len(slow_moves)} moves took over {MOVE_TIME_LIMIT:g} s, "
+                                    f"the slowest {report['max_move_seconds']:.2f} s")
+        return
+    for slow_move in slow_moves:
+        # A single slow move may be the machine stalling rather than the bot: time it again
+        seconds = checker.retime(slow_move)
+        if seconds > MOVE_TIME_LIMIT:
+            problem('error', 'latency', f"a move took {slow_move[0]:.2f} s, and {seconds:.2f} s when replayed")
+            return
+        problem('warning', 'latency', f"a move took {slow_move[0]:.2f} s once, but {seconds * 1000:.0f} ms when replayed")
+    if report['p99_move_seconds'] > SLOW_MOVE:
+        problem('warning', 'latency', f"99% of moves take up to {report['p99_move_seconds'] * 1000:.0f} ms")
+    report['checked'] += ['moves', 'latency']
+
+    rounds = config.number_of_rounds
+    sequence = probe_sequences(rounds)[-2]  # Mostly cooperative random opponent
+    runs = []
+    for seed in DETERMINISM_SEEDS:
+        for _ in range(2):
+            random.seed(seed)
+            runs.append(checker.play(sequence, rounds))
+    if runs[0] != runs[1] or runs[2] != runs[3]:
+        problem('warning', 'determinism', "moves differ with the same seed: the bot keeps state between "
+                                          "matches or uses randomness not drawn from the random module")
+    report['deterministic'] = runs[0] == runs[1] == runs[2] == runs[3]
+    report['checked'].append('determinism')
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        retained = []
+        for _ in range(MEMORY_MATCHES):
+            checker.play(sequence * 2, rounds * 2)
+            gc.collect()
+            retained.append(tracemalloc.get_traced_memory()[0] - baseline)
+        report['peak_bytes'] = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    report['retained_bytes'] = retained[-1]
+    growth = (retained[-1] - retained[0]) / max(MEMORY_MATCHES - 1, 1)
+    if report['peak_bytes'] > PEAK_MEMORY_WARNING:
+        problem('warning', 'memory', f"uses {report['peak_bytes'] >> 20} MB during a {rounds * 2}-round match")
+    if growth > RETAINED_MEMORY_WARNING:
+        problem('warning', 'memory', f"keeps {growth / 1024:.0f} KB more after every match")
+    report['checked'].append('memory')
+
+
+def _crashed_report(path):
+    return {'path': path, 'name': None, 'status': 'excluded',
+            'problems': [{'severity': 'error', 'check': 'crash', 'message': "the bot took its process down"}],
+            'checked': [],
+            'deterministic': None, 'moves': 0, 'mean_move_seconds': None, 'p99_move_seconds': None,
+            'max_move_seconds': None, 'peak_bytes': None, 'retained_bytes': None}
+
+
+def _check_all(bot_paths, config, workers, reports, progress=None, total=None):
+    """Check bots on a fresh pool, filling reports ({path: report}).
+
+    A bot that kills its worker breaks the pool and fails every check still running or
+    queued; those bots are checked again in halves until the culprit is alone.
+    """
+    broken = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(bot_paths))) as executor:
+        futures = [(path, executor.submit(check_bot, path, config)) for path in bot_paths]
+        for path, future in futures:
+            try:
+                reports[path] = future.result()
+            except BrokenProcessPool:
+                broken.append(path)
+                continue
+            if progress:
+                progress(len(reports), total, "bots checked")
+
+    if broken and len(bot_paths) == 1:
+        reports[broken[0]] = _crashed_report(broken[0])
+        if progress:
+            progress(len(reports), total, "bots checked")
+    elif broken:
+        half = (len(broken) + 1) // 2
+        for part in (broken[:half], broken[half:]):
+            if part:
+                _check_all(part, config, workers, reports, progress, total)
+
+
+def validate_bots(bot_paths, config=None, workers=None, progress=None):
+    """Check every bot in parallel and return the reports in the order of bot_paths."""
+    config = config or RunConfig.from_game_config()
+    reports = {}
+    if bot_paths:
+        _check_all(bot_paths, config, workers or os.cpu_count() or 1, reports, progress, len(bot_paths))
+    return [reports[path] for path in bot_paths]
+
+
+def excluded_paths(reports):
+    return [report['path'] for report in reports if report['status'] == 'excluded']
+
+
+def write_report(reports, directory):
+    """Write preflight_report.txt, preflight.json and excluded.txt (one bot path per line)."""
+    counts = {status: sum(report['status'] == status for report in reports) for status in ('ok', 'warning', 'excluded')}
+    labels = [report['name'] or os.path.basename(report['path']) for report in reports]
+    name_width = max([len(label) for label in labels] + [len("Bot")])
+
+    with open(os.path.join(directory, REPORT_FILE), 'w') as f:
+        f.write("="*50 + "\n")
+        f.write("PREFLIGHT REPORT\n")
+        f.write("="*50 + "\n\n")
+        f.write(f"Bots Checked: {len(reports)} (ok: {counts['ok']}, warnings: {counts['warning']}, "
+                f"excluded: {counts['excluded']})\n")
+
+        for severity, title in (('error', "EXCLUDED BOTS"), ('warning', "WARNINGS")):
+            lines = [f"{label} ({report['path']}): [{problem['check']}] {problem['message']}"
+                     for label, report in zip(labels, reports)
+                     for problem in report['problems'] if problem['severity'] == severity]
+            if lines:
+                f.write(f"\n\n{title}\n")
+                f.write("-"*50 + "\n")
+                f.write("\n".join(lines) + "\n")
+
+        f.write("\n\nDETAILS\n")
+        f.write("-"*50 + "\n\n")
+        header = (f"{'Bot'.ljust(name_width)} | {'Status':^8} | {'Moves':>6} | {'Mean move':>9} | "
+                  f"{'p99 move':>9} | {'Max move':>9} | {'Peak mem':>9} | {'Random':^6}")
+        f.write(header + "\n")
+        f.write("-" * len(header) + "\n")
+        for label, report in zip(labels, reports):
+            mean = f"{report['mean_move_seconds'] * 1e6:.0f} us" if report['mean_move_seconds'] is not None else "-"
+            p99 = f"{report['p99_move_seconds'] * 1e3:.1f} ms" if report['p99_move_seconds'] is not None else "-"
+            slowest = f"{report['max_move_seconds'] * 1e3:.1f} ms" if report['max_move_seconds'] is not None else "-"
+            peak = f"{report['peak_bytes'] / 1024:.0f} KB" if report['peak_bytes'] is not None else "-"
+            randomness = {True: "no", False: "yes", None: "-"}[report['deterministic']]
+            f.write(f"{label.ljust(name_width)} | {report['status']:^8} | {report['moves']:>6} | {mean:>9} | "
+                    f"{p99:>9} | {slowest:>9} | {peak:>9} | {randomness:^6}\n")
+
+    with open(os.path.join(directory, "preflight.json"), 'w') as f:
+        json.dump(reports, f, indent=2)
+    with open(os.path.join(directory, EXCLUDED_FILE), 'w') as f:
+        f.writelines(path + "\n" for path in excluded_paths(reports))
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs', 'results.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    directory TEXT NOT NULL,
+    summary_file TEXT,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS run_bots (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    bot_id INTEGER NOT NULL REFERENCES bots(id),
+    path TEXT,
+    PRIMARY KEY (run_id, bot_id)
+);
+CREATE TABLE IF NOT EXISTS matches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    bot1_id INTEGER NOT NULL REFERENCES bots(id),
+    bot2_id INTEGER NOT NULL REFERENCES bots(id),
+    rounds INTEGER NOT NULL,
+    score1 INTEGER NOT NULL,
+    score2 INTEGER NOT NULL,
+    mutual_cooperation INTEGER NOT NULL,
+    mutual_defection INTEGER NOT NULL,
+    betrayals1 INTEGER NOT NULL,
+    betrayals2 INTEGER NOT NULL,
+    log_file TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_kind ON runs(kind, id);
+CREATE INDEX IF NOT EXISTS idx_matches_run ON matches(run_id);
+CREATE INDEX IF NOT EXISTS idx_matches_bot1 ON matches(bot1_id, run_id);
+CREATE INDEX IF NOT EXISTS idx_matches_bot2 ON matches(bot2_id, run_id);
+"""
+
+MATCH_COLUMNS = """
+    m.run_id, r.kind, r.started_at, b1.name AS bot1, b2.name AS bot2, m.rounds,
+    m.score1, m.score2, m.mutual_cooperation, m.mutual_defection,
+    m.betrayals1, m.betrayals2, m.log_file
+"""
+
+
+class ResultsStore:
+    """SQLite history of tournament and multi-opponent runs.
+
+    A run is opened with start_run, matches are buffered by record_match and
+    written in one transaction by finish_run. Query methods return plain dicts.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._pending = {}  # run_id -> list of match rows not yet written
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    def _bot_id(self, conn, name):
+        conn.execute("INSERT OR IGNORE INTO bots (name) VALUES (?)", (name,))
+        return conn.execute("SELECT id FROM bots WHERE name = ?", (name,)).fetchone()[0]
+
+    def start_run(self, kind, directory, config, bots=None):
+        """Register a new run and return its id.
+
+        kind is 'tournament' or 'games', config a JSON-serializable dict and
+        bots an optional {bot name: bot file path} mapping of participants.
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (kind, started_at, directory, config) VALUES (?, ?, ?, ?)",
+                (kind, datetime.now().isoformat(timespec='seconds'), directory, json.dumps(config, sort_keys=True)))
+            run_id = cursor.lastrowid
+            for name, path in (bots or {}).items():
+                conn.execute("INSERT OR IGNORE INTO run_bots (run_id, bot_id, path) VALUES (?, ?, ?)",
+                             (run_id, self._bot_id(conn, name), path))
+        conn.close()
+        self._pending[run_id] = []
+        return run_id
+
+    def record_match(self, run_id, bot1, bot2, rounds, scores, mutual_cooperation, mutual_defection,
+                     betrayals1, betrayals2, log_file=None):
+        """Buffer the result of one match; scores is a (bot1 score, bot2 score) pair."""
+        self._pending[run_id].append((bot1, bot2, rounds, scores[0], scores[1], mutual_cooperation,
+                                      mutual_defection, betrayals1, betrayals2, log_file))
+
+    def finish_run(self, run_id, summary_file=None):
+        """Write buffered matches and mark the run finished."""
+        rows = self._pending.pop(run_id, [])
+        with self._connect() as conn:
+            bot_ids = {}
+            for row in rows:
+                for name in row[:2]:
+                    if name not in bot_ids:
+                        bot_ids[name] = self._bot_id(conn, name)
+                        conn.execute("INSERT OR IGNORE INTO run_bots (run_id, bot_id) VALUES (?, ?)",
+                                     (run_id, bot_ids[name]))
+            conn.executemany(
+                "INSERT INTO matches (run_id, bot1_id, bot2_id, rounds, score1, score2, mutual_cooperation, "
+                "mutual_defection, betrayals1, betrayals2, log_file) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, bot_ids[row[0]], bot_ids[row[1]]) + row[2:] for row in rows])
+            conn.execute("UPDATE runs SET finished_at = ?, summary_file = ? WHERE id = ?",
+                         (datetime.now().isoformat(timespec='seconds'), summary_file, run_id))
+        conn.close()
+
+    def latest_run(self, kind=None):
+        """Return the most recent finished run (optionally of one kind) or None."""
+        query = "SELECT * FROM runs WHERE finished_at IS NOT NULL"
+        params = ()
+        if kind:
+            query += " AND kind = ?"
+            params = (kind,)
+        with self._connect() as conn:
+            row = conn.execute(query + " ORDER BY id DESC LIMIT 1", params).fetchone()
+        conn.close()
+        return self._run_dict(row) if row else None
+
+    def runs(self, kind=None, limit=50):
+        """Return the last `limit` finished runs, newest first."""
+        query = "SELECT * FROM runs WHERE finished_at IS NOT NULL"
+        params = []
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        with self._connect() as conn:
+            rows = conn.execute(query + " ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+        conn.close()
+        return [self._run_dict(row) for row in rows]
+
+    def run_matches(self, run_id):
+        """Return every match of a run in the order it was played."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {MATCH_COLUMNS} FROM matches m JOIN runs r ON r.id = m.run_id "
+                "JOIN bots b1 ON b1.id = m.bot1_id JOIN bots b2 ON b2.id = m.bot2_id "
+                "WHERE m.run_id = ? ORDER BY m.id", (run_id,)).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    def matches_for_bot(self, bot_name, last_runs=50, kind=None):
+        """Return all matches of a bot across its last `last_runs` finished runs.
+
+        Each match is oriented so that 'bot1'/'score1'/'betrayals1' refer to bot_name.
+        """
+        kind_filter = "AND r.kind = ?" if kind else ""
+        params = [bot_name] + ([kind] if kind else []) + [last_runs]
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                WITH bot AS (SELECT id FROM bots WHERE name = ?),
+                     recent AS (
+                        SELECT r.id FROM runs r JOIN run_bots rb ON rb.run_id = r.id
+                        WHERE rb.bot_id = (SELECT id FROM bot) AND r.finished_at IS NOT NULL {kind_filter}
+                        ORDER BY r.id DESC LIMIT ?)
+                SELECT {MATCH_COLUMNS}, m.bot1_id = (SELECT id FROM bot) AS is_first
+                FROM matches m JOIN runs r ON r.id = m.run_id
+                JOIN bots b1 ON b1.id = m.bot1_id JOIN bots b2 ON b2.id = m.bot2_id
+                WHERE m.run_id IN (SELECT id FROM recent)
+                  AND (m.bot1_id = (SELECT id FROM bot) OR m.bot2_id = (SELECT id FROM bot))
+                ORDER BY m.run_id DESC, m.id
+                """, params).fetchall()
+        conn.close()
+
+        matches = []
+        for row in rows:
+            match = dict(row)
+            if not match.pop('is_first'):
+                for first, second in [('bot1', 'bot2'), ('score1', 'score2'), ('betrayals1', 'betrayals2')]:
+                    match[first], match[second] = match[second], match[first]
+            matches.append(match)
+        return matches
+
+    @staticmethod
+    def _run_dict(row):
+        run = dict(row)
+        run['config'] = json.loads(run['config'])
+        return run
@@ -0,0 +1,133 @@
+"""Cost-model scheduling of matches over worker processes.
+
+Match costs differ by orders of magnitude between bots, so equal-sized chunks leave
+workers idle at the end of a run. The cost model keeps an estimate of the seconds per
+round every bot spends deciding, learned from the timings of previous runs and stored
+in bot_costs.json in the logs directory, keyed by the hash of the bot file (editing a
+bot starts its estimate over). A match is estimated as rounds times the sum of the
+two bots' costs.
+
+schedule() orders the tasks longest-first and cuts them into chunks of decreasing
+estimated cost (guided self-scheduling). Idle workers pull the next chunk from the
+shared queue, so a worker that finishes early takes over work the others have not
+started. utilization() reports how busy the workers were.
+"""
+import hashlib
+import json
+import os
+import statistics
+from datetime import datetime
+
+COSTS_FILE = "bot_costs.json"
+
+# Seconds per round assumed for bots no run has timed yet, if no other estimate exists
+DEFAULT_COST = 2e-6
+
+# Lower bound of an estimate; the fit can push cheap bots to zero, which would lump
+# all their matches into one chunk
+MIN_COST = 1e-7
+
+# Smallest chunk of a schedule, as a share of the per-worker load
+MIN_CHUNK_SHARE = 0.02
+
+
+def bot_key(bot_path):
+    """Key of a bot in the cost file: the hash of its source."""
+    with open(bot_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class CostModel:
+    def __init__(self, path):
+        self.path = path
+        self.costs = {}  # Bot key -> {'name', 'seconds_per_round', 'updated'}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    self.costs = json.load(f)
+            except (OSError, ValueError):
+                self.costs = {}  # A damaged file only costs us the estimates
+
+    @classmethod
+    def for_logs_dir(cls, logs_dir):
+        return cls(os.path.join(logs_dir, COSTS_FILE))
+
+    def estimate(self, key, default=None):
+        entry = self.costs.get(key)
+        if entry is not None:
+            return entry['seconds_per_round']
+        return DEFAULT_COST if default is None else default
+
+    def estimates(self, keys):
+        """Cost per bot for the given keys; unknown bots get the median of the known ones."""
+        known = [self.costs[key]['seconds_per_round'] for key in keys if key in self.costs]
+        default = statistics.median(known) if known else DEFAULT_COST
+        return [self.estimate(key, default) for key in keys]
+
+    def update(self, observations, names=None):
+        """Fold match timings into the estimates.
+
+        observations are (key1, key2, rounds, seconds). Per-bot costs are fitted to the
+        additive model seconds = rounds * (cost1 + cost2) by a few Gauss-Seidel sweeps
+        and averaged with the previous estimates.
+        """
+        per_bot = {}
+        for key1, key2, rounds, seconds in observations:
+            if rounds:
+                per_bot.setdefault(key1, []).append((key2, seconds / rounds))
+                per_bot.setdefault(key2, []).append((key1, seconds / rounds))
+        fitted = {key: self.estimate(key, statistics.mean(y for _, y in samples) / 2)
+                  for key, samples in per_bot.items()}
+        for _ in range(5):
+            for key, samples in per_bot.items():
+                fitted[key] = max(MIN_COST, statistics.mean(y - fitted[other] for other, y in samples))
+        self.merge(fitted, names)
+
+    def merge(self, fitted, names=None):
+        """Average fitted per-bot costs ({key: seconds per round}) with the previous estimates."""
+        updated = datetime.now().isoformat(timespec='seconds')
+        for key, cost in fitted.items():
+            cost = max(MIN_COST, cost)
+            previous = self.costs.get(key)
+            if previous is not None:
+                cost = (previous['seconds_per_round'] + cost) / 2
+            name = (names or {}).get(key) or (previous or {}).get('name')
+            self.costs[key] = {'name': name, 'seconds_per_round': cost, 'updated': updated}
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.costs, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def schedule(tasks, cost, workers):
+    """Cut tasks into chunks for a shared work queue, longest first.
+
+    cost(task) is the estimated cost of a task. Each chunk takes the remaining tasks
+    worth about remaining cost / (2 * workers), but at least one task, so chunks start
+    large and shrink towards the end of the run, where they balance the workers' load.
+    """
+    ordered = sorted(tasks, key=cost, reverse=True)
+    costs = [cost(task) for task in ordered]
+    remaining = sum(costs)
+    minimum = remaining / max(workers, 1) * MIN_CHUNK_SHARE
+
+    chunks = []
+    start = 0
+    while start < len(ordered):
+        target = max(remaining / (2 * max(workers, 1)), minimum)
+        end, chunk_cost = start + 1, costs[start]
+        while end < len(ordered) and chunk_cost + costs[end] <= target:
+            chunk_cost += costs[end]
+            end += 1
+        chunks.append(ordered[start:end])
+        remaining -= chunk_cost
+        start = end
+    return chunks
+
+
+def utilization(busy_seconds, workers, wall_seconds):
+    """Share of the workers' capacity spent working, between 0 and 1."""
+    capacity = workers * wall_seconds
+    return min(1.0, busy_seconds / capacity) if capacity > 0 else 0.0
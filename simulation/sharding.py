@@ -0,0 +1,140 @@
+"""Shard files for spreading one round-robin tournament over several machines.
+
+Every shard plans the full tournament the same way and plays the pairs whose
+position in the plan is congruent to its index modulo the shard count. A shard
+file holds everything the merge step needs, so shards only have to share a
+directory, not bot files or log directories.
+"""
+import glob
+import hashlib
+import json
+import os
+from utils.game_config import RunConfig
+
+SHARD_FORMAT = 1
+
+
+def parse_shard(spec):
+    """Parse 'i/k' (shard i of k, zero-based) into (i, k)."""
+    index, _, count = spec.partition('/')
+    index, count = int(index), int(count)
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard {spec}: expected i/k with 0 <= i < k")
+    return index, count
+
+
+def select_shard(plan, index, count):
+    """Return the planned matches that belong to shard index of count."""
+    return [match for position, match in enumerate(plan) if position % count == index]
+
+
+def plan_digest(bot_names, config, plan):
+    """Fingerprint of a tournament plan; shards of one tournament must agree on it."""
+    payload = json.dumps({'bots': bot_names, 'config': config.as_dict(), 'plan': plan}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def match_record(i, j, bot1_name, bot2_name, rounds, match_stats):
+    """Flatten the stats returned by TournamentSimulation._run_match into a JSON-friendly record."""
+    record = {
+        'i': i,
+        'j': j,
+        'bot1': bot1_name,
+        'bot2': bot2_name,
+        'rounds': rounds,
+        'scores': [match_stats['scores'][bot1_name], match_stats['scores'][bot2_name]],
+        'mutual_cooperation': match_stats['mutual_cooperation'],
+        'mutual_defection': match_stats['mutual_defection'],
+        'betrayals': [match_stats['betrayals'][bot1_name], match_stats['betrayals'][bot2_name]],
+    }
+    if match_stats.get('forfeit'):
+        # Name of the bot that failed, and its error
+        record['forfeit'] = match_stats['forfeit']
+        record['error'] = match_stats['error']
+    if 'flips' in match_stats:
+        # Played with move noise: intended cooperations and flipped moves per bot
+        record['intended_cooperation'] = [match_stats['intended_cooperation'][bot1_name],
+                                          match_stats['intended_cooperation'][bot2_name]]
+        record['flips'] = [match_stats['flips'][bot1_name], match_stats['flips'][bot2_name]]
+    return record
+
+
+def shard_path(directory, index, count):
+    return os.path.join(directory, f"shard_{index}_of_{count}.json")
+
+
+def write_shard_file(directory, shard, bot_names, config, plan, records):
+    """Write the results of one shard; returns the file path."""
+    index, count = shard
+    os.makedirs(directory, exist_ok=True)
+    path = shard_path(directory, index, count)
+    data = {
+        'format': SHARD_FORMAT,
+        'shard': [index, count],
+        'bots': bot_names,
+        'config': config.as_dict(),
+        'plan_digest': plan_digest(bot_names, config, [list(match) for match in plan]),
+        'planned_matches': len(plan),
+        'matches': records,
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+    return path
+
+
+def expand_shard_paths(paths):
+    """Expand directories into the shard files they contain."""
+    shard_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            shard_paths.extend(sorted(glob.glob(os.path.join(path, "shard_*_of_*.json"))))
+        else:
+            shard_paths.append(path)
+    return shard_paths
+
+
+def merge_shard_files(shard_paths):
+    """Load and validate shard files; return (bot names, RunConfig, match records in plan order).
+
+    Raises ValueError if the shards come from different tournaments, a shard is missing
+    or duplicated, or any pair is not covered exactly once.
+    """
+    shards = []
+    for path in expand_shard_paths(shard_paths):
+        with open(path, 'r') as f:
+            shards.append(json.load(f))
+    if not shards:
+        raise ValueError("No shard files given")
+
+    first = shards[0]
+    count = first['shard'][1]
+    for shard in shards:
+        if shard.get('format') != SHARD_FORMAT:
+            raise ValueError(f"Unsupported shard format: {shard.get('format')}")
+        if shard['plan_digest'] != first['plan_digest'] or shard['shard'][1] != count:
+            raise ValueError("Shard files belong to different tournaments")
+
+    indexes = sorted(shard['shard'][0] for shard in shards)
+    if indexes != list(range(count)):
+        missing = sorted(set(range(count)) - set(indexes))
+        duplicated = sorted({index for index in indexes if indexes.count(index) > 1})
+        raise ValueError(f"Expected shards 0..{count - 1}; missing {missing}, duplicated {duplicated}")
+
+    bot_names = first['bots']
+    pairs = {}
+    for shard in shards:
+        for record in shard['matches']:
+            pair = (record['i'], record['j'])
+            if pair in pairs:
+                raise ValueError(f"Pair {bot_names[pair[0]]} vs {bot_names[pair[1]]} was played more than once")
+            pairs[pair] = record
+
+    expected = {(i, j) for i in range(len(bot_names)) for j in range(i + 1, len(bot_names))}
+    if set(pairs) != expected or len(pairs) != first['planned_matches']:
+        missing = sorted(expected - set(pairs))
+        raise ValueError(f"{len(missing)} pairs were not played, e.g. "
+                         + ", ".join(f"{bot_names[i]} vs {bot_names[j]}" for i, j in missing[:5]))
+
+    return bot_names, RunConfig(**first['config']), [pairs[pair] for pair in sorted(pairs)]
@@ -1,18 +1,30 @@
 import importlib.util
+import inspect
 from utils.abstract_bot import AbstractBot
 from utils.moves import Move
-from utils.game_config import GameConfig
+from utils.game_config import RunConfig
+from simulation.results_store import ResultsStore
+from simulation.log_retention import apply_configured_retention, create_run_dir
+from simulation.hooks import SimulationHooks
+from simulation.metrics import RunMetrics
+from simulation.match_engine import CycleDetector, cycle_outcomes, play_rounds, score_outcomes
+from simulation.move_noise import match_noise
 from datetime import datetime
 import os
 import random
+import sys
 
 class PrisonersDilemmaSimulation:
-    def __init__(self, bot1_path):
+    def __init__(self, bot1_path, results_store=None, config=None, hooks=None):
         self.bot1_path = bot1_path  # Store path instead of instance
+        self.config = config or RunConfig.from_game_config()
+        self.hooks = hooks or SimulationHooks()  # Analytics callbacks, see simulation.hooks
+        self.metrics = RunMetrics('games')  # Replaced at the start of every run
         
         self.logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
         if not os.path.exists(self.logs_dir):
             os.makedirs(self.logs_dir)
+        self.results_store = results_store or ResultsStore(os.path.join(self.logs_dir, 'results.db'))
 
     def load_bot(self, path):
         """Load a bot from a file path"""
@@ -23,7 +35,7 @@ class PrisonersDilemmaSimulation:
             
             for item in dir(module):
                 obj = getattr(module, item)
-                if isinstance(obj, type) and issubclass(obj, AbstractBot) and obj != AbstractBot:
+                if isinstance(obj, type) and issubclass(obj, AbstractBot) and not inspect.isabstract(obj):
                     return obj()
             raise ValueError("No valid bot class found in file")
         except Exception as e:
@@ -31,51 +43,73 @@ class PrisonersDilemmaSimulation:
 
     def calculate_score(self, move1: Move, move2: Move):
         """Calculate scores based on moves"""
-        if move1 == Move.COOPERATE and move2 == Move.COOPERATE:
-            return GameConfig.MUTUAL_COOPERATION_POINTS, GameConfig.MUTUAL_COOPERATION_POINTS
-        elif move1 == Move.COOPERATE and move2 == Move.DEFECT:
-            return GameConfig.BETRAYED_POINTS, GameConfig.BETRAYAL_POINTS
-        elif move1 == Move.DEFECT and move2 == Move.COOPERATE:
-            return GameConfig.BETRAYAL_POINTS, GameConfig.BETRAYED_POINTS
-        else:  # both defect
-            return GameConfig.MUTUAL_DEFECTION_POINTS, GameConfig.MUTUAL_DEFECTION_POINTS
-
-    def run_games(self, opponent_paths, rounds=GameConfig.NUMBER_OF_ROUNDS):
-        """Run games against multiple opponents."""
+        return self.config.payoff_table()[move1, move2]
+
+    def run_games(self, opponent_paths, rounds=None, progress=None):
+        """Run games against multiple opponents and return the directory with the logs.
+
+        Games are played with self.config; rounds, if given, overrides its number_of_rounds.
+        If given, progress(done, total, label) is called after every finished game.
+        """
+        config = self.config if rounds is None else self.config.replace(number_of_rounds=rounds)
+        rounds = config.number_of_rounds
+
         # Create fresh instance of bot1
-        self.bot1 = self.load_bot(self.bot1_path)
+        self.metrics = RunMetrics('games')
+        with self.metrics.timed('bot_load'):
+            self.bot1 = self.load_bot(self.bot1_path)
         
         timestamp = datetime.now().strftime("%H%M%S")
-        games_dir = os.path.join(self.logs_dir, f"{timestamp}_{self.bot1.name}_games")
-        os.makedirs(games_dir)
+        games_dir = create_run_dir(self.logs_dir, f"{timestamp}_{self.bot1.name}_games")
+        run_id = self.results_store.start_run('games', games_dir, config.as_dict(),
+                                              bots={self.bot1.name: self.bot1_path})
+        self.hooks.run_started('games', games_dir)
 
         all_stats = []
         for opponent_path in opponent_paths:
             # Load opponent bot
-            opponent = self.load_bot(opponent_path)
+            with self.metrics.timed('bot_load'):
+                opponent = self.load_bot(opponent_path)
             
             # Calculate number of rounds for this match
             match_rounds = rounds
-            if GameConfig.ADD_NOISE:
+            if config.add_noise:
                 min_rounds = int(rounds * 0.8)
                 max_rounds = int(rounds * 1.2)
                 match_rounds = random.randint(min_rounds, max_rounds)
 
-            match_stats = self._run_match(opponent, match_rounds, games_dir)
+            with self.metrics.match(match_rounds):
+                match_stats = self._run_match(opponent, match_rounds, games_dir, config)
+            self.results_store.record_match(
+                run_id, self.bot1.name, opponent.name, match_rounds,
+                (match_stats['scores'][self.bot1.name], match_stats['scores'][opponent.name]),
+                match_stats['mutual_cooperation'], match_stats['mutual_defection'],
+                match_stats['bot1_betrayals'], match_stats['opponent_betrayals'],
+                log_file=match_stats['log_file'])
             all_stats.append({
                 'opponent': opponent.name,
                 'stats': match_stats
             })
+            if progress:
+                progress(len(all_stats), len(opponent_paths), f"{self.bot1.name} vs {opponent.name}")
 
         # Write summary of all games
-        self._write_games_summary(games_dir, all_stats)
-        print(f"Games complete. Results saved to {games_dir}")
+        with self.metrics.timed('io'):
+            self._write_games_summary(games_dir, all_stats)
+            self.results_store.finish_run(run_id, summary_file="games_summary.txt")
+        self.metrics.write(games_dir)
+        self.hooks.run_finished('games', games_dir)
+        apply_configured_retention(self.logs_dir, games_dir)
+        print(f"Games complete. Results saved to {games_dir}", file=sys.stderr)
+        return games_dir
+
+    def _run_match(self, opponent, rounds, tournament_dir, config=None):
+        config = config or self.config
+        payoffs = config.payoff_table()
 
-    def _run_match(self, opponent, rounds, tournament_dir):
         # Reinitialize both bots for this match
-        bot1 = self.load_bot(self.bot1_path)
-        opponent_class = opponent.__class__
-        opponent = opponent_class()
+        bot1 = self.bot1.__class__.create(config)
+        opponent = opponent.__class__.create(config)
 
         stats = {
             'mutual_cooperation': 0,
@@ -102,39 +136,48 @@ class PrisonersDilemmaSimulation:
             "-"*60
         ])
 
-        for round_num in range(rounds):
-            move1 = bot1.make_decision()  # Change strategy([]) to make_decision()
-            move2 = opponent.make_decision()   # Change strategy([]) to make_decision()
-
-            # Update histories for both bots
-            bot1.my_history.append(move1)
-            bot1.opponent_history.append(move2)
-            opponent.my_history.append(move2)
-            opponent.opponent_history.append(move1)
+        # Play rounds, then score them from the histories (the executed moves under move noise)
+        noise = match_noise(config, bot1.name, opponent.name, rounds)
+        detector = CycleDetector() if config.fast_forward and noise is None else None
+        with self.metrics.timed('bot'):
+            cycle_start = play_rounds(bot1, opponent, rounds, detector, self.hooks.round, noise)
 
+        for round_num, (move1, move2) in enumerate(zip(bot1.my_history, opponent.my_history)):
             # Calculate score and determine round result
+            score1, score2 = payoffs[move1, move2]
+            round_result = f"{score1:^2} - {score2:^2}"
             if move1 == Move.COOPERATE and move2 == Move.COOPERATE:
-                round_result = f"{GameConfig.MUTUAL_COOPERATION_POINTS:^2} - {GameConfig.MUTUAL_COOPERATION_POINTS:^2}"
-                score1, score2 = GameConfig.MUTUAL_COOPERATION_POINTS, GameConfig.MUTUAL_COOPERATION_POINTS
                 stats['mutual_cooperation'] += 1
             elif move1 == Move.COOPERATE and move2 == Move.DEFECT:
-                round_result = f"{GameConfig.BETRAYED_POINTS:^2} - {GameConfig.BETRAYAL_POINTS:^2}"
-                score1, score2 = GameConfig.BETRAYED_POINTS, GameConfig.BETRAYAL_POINTS
                 stats['opponent_betrayals'] += 1
             elif move1 == Move.DEFECT and move2 == Move.COOPERATE:
-                round_result = f"{GameConfig.BETRAYAL_POINTS:^2} - {GameConfig.BETRAYED_POINTS:^2}"
-                score1, score2 = GameConfig.BETRAYAL_POINTS, GameConfig.BETRAYED_POINTS
                 stats['bot1_betrayals'] += 1
             else:  # Both defect
-                round_result = f"{GameConfig.MUTUAL_DEFECTION_POINTS:^2} - {GameConfig.MUTUAL_DEFECTION_POINTS:^2}"
-                score1, score2 = GameConfig.MUTUAL_DEFECTION_POINTS, GameConfig.MUTUAL_DEFECTION_POINTS
                 stats['mutual_defection'] += 1
 
             stats['scores'][bot1.name] += score1
             stats['scores'][opponent.name] += score2
 
             current_score = f"{stats['scores'][bot1.name]:^5} - {stats['scores'][opponent.name]:^5}"
-            output_lines.append(f"{round_num+1:^6} | {move1.name:^10} | {move2.name:^10} | {round_result:^12} | {current_score}")
+            shown1, shown2 = move1.name, move2.name
+            if noise is not None:
+                # Mark moves the noise flipped
+                shown1 += "*" if noise.flips1[round_num] else ""
+                shown2 += "*" if noise.flips2[round_num] else ""
+            output_lines.append(f"{round_num+1:^6} | {shown1:^10} | {shown2:^10} | {round_result:^12} | {current_score}")
+
+        if cycle_start is not None:
+            # Back in the joint state of an earlier round: the rest of the match repeats
+            round_num = len(bot1.my_history)
+            skipped = score_outcomes(cycle_outcomes(bot1.my_history, opponent.my_history, cycle_start, rounds - round_num), config)
+            stats['scores'][bot1.name] += skipped['scores'][0]
+            stats['scores'][opponent.name] += skipped['scores'][1]
+            stats['mutual_cooperation'] += skipped['mutual_cooperation']
+            stats['mutual_defection'] += skipped['mutual_defection']
+            stats['bot1_betrayals'] += skipped['betrayals1']
+            stats['opponent_betrayals'] += skipped['betrayals2']
+            current_score = f"{stats['scores'][bot1.name]:^5} - {stats['scores'][opponent.name]:^5}"
+            output_lines.append(f"Rounds {round_num+1}-{rounds} repeat rounds {cycle_start+1}-{round_num} (fast-forwarded) | {current_score}")
 
         output_lines.extend([
             "\nMATCH STATISTICS:",
@@ -144,6 +187,18 @@ class PrisonersDilemmaSimulation:
             f"Mutual Defection: {stats['mutual_defection']} ({stats['mutual_defection']/rounds*100:.1f}%)",
             f"Bot 1 Betrayals: {stats['bot1_betrayals']} ({stats['bot1_betrayals']/rounds*100:.1f}%)",
             f"Opponent Betrayals: {stats['opponent_betrayals']} ({stats['opponent_betrayals']/rounds*100:.1f}%)",
+        ])
+        if noise is not None:
+            noise_stats = noise.stats()
+            stats['bot1_intended_cooperation'], stats['opponent_intended_cooperation'] = noise_stats['intended_cooperation']
+            stats['bot1_flips'], stats['opponent_flips'] = noise_stats['flips']
+            output_lines.extend([
+                f"Bot 1 Moves Flipped by Noise (marked *): {stats['bot1_flips']}",
+                f"Opponent Moves Flipped by Noise (marked *): {stats['opponent_flips']}",
+                f"Bot 1 Intended Cooperations: {stats['bot1_intended_cooperation']}",
+                f"Opponent Intended Cooperations: {stats['opponent_intended_cooperation']}",
+            ])
+        output_lines.extend([
             "",
             "FINAL SCORES:",
             "-"*50,
@@ -152,9 +207,11 @@ class PrisonersDilemmaSimulation:
             "="*50
         ])
 
-        with open(log_path, 'w') as log_file:
+        with self.metrics.timed('io'), open(log_path, 'w') as log_file:
             log_file.write('\n'.join(output_lines))
 
+        stats['log_file'] = log_filename
+        self.hooks.match_finished(bot1, opponent, stats)
         return stats
 
     def _write_games_summary(self, directory, all_stats):
@@ -175,7 +232,12 @@ class PrisonersDilemmaSimulation:
                 f.write(f"Mutual Cooperation: {stats['mutual_cooperation']}\n")
                 f.write(f"Mutual Defection: {stats['mutual_defection']}\n")
                 f.write(f"Times Betrayed: {stats['opponent_betrayals']}\n")
-                f.write(f"Times Betrayed Opponent: {stats['bot1_betrayals']}\n\n")
+                f.write(f"Times Betrayed Opponent: {stats['bot1_betrayals']}\n")
+                if 'bot1_flips' in stats:
+                    f.write(f"Moves Flipped by Noise: {stats['bot1_flips']} - {stats['opponent_flips']}\n")
+                    f.write(f"Intended Cooperations: {stats['bot1_intended_cooperation']} - "
+                            f"{stats['opponent_intended_cooperation']}\n")
+                f.write("\n")
 
             # Overall statistics
             f.write("\nOVERALL STATISTICS\n")
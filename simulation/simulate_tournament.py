@@ -2,14 +2,41 @@ from datetime import datetime
 import os
 from utils.abstract_bot import AbstractBot
 from utils.moves import Move
-from utils.game_config import GameConfig
+from utils.game_config import RunConfig
+from simulation.results_store import ResultsStore
+from simulation.log_retention import apply_configured_retention, create_run_dir, finish_run, mark_running
+from simulation.sharding import match_record, merge_shard_files, select_shard, write_shard_file
+from simulation.checkpoint import BotError, MatchJournal, read_journal, truncate_torn_line
+from simulation.match_engine import (CycleDetector, count_outcomes, cycle_outcomes, forfeit_scores, load_bot_class,
+                                     play_match, play_rounds, score_outcomes)
+from simulation.adaptive import ScoreEstimates
+from simulation.fingerprint import equivalence_classes, equivalent_groups, fan_out, probe_rounds
+from simulation.events import EventStream, RunningTotals, match_event, publish
+from simulation.hooks import SimulationHooks
+from simulation.metrics import RunMetrics
+from simulation.move_noise import match_noise
+from simulation.swiss import SwissStandings, default_rounds as default_swiss_rounds, kendall_tau
+from utils.external_bot import is_external
 import importlib.util
+import inspect
+import math
 import random
+import sys
+import traceback
 
 class TournamentSimulation:
-    def __init__(self):
+    def __init__(self, results_store=None, config=None, hooks=None):
         self.logs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
         os.makedirs(self.logs_dir, exist_ok=True)
+        self.results_store = results_store or ResultsStore(os.path.join(self.logs_dir, 'results.db'))
+        self.config = config or RunConfig.from_game_config()
+        self.observers = []  # Callbacks receiving tournament events, see simulation.events
+        self.hooks = hooks or SimulationHooks()  # Analytics callbacks, see simulation.hooks
+        self.metrics = RunMetrics('tournament')  # Replaced at the start of every run
+
+    def add_observer(self, callback):
+        """Call callback(event) for every event of the following tournaments."""
+        self.observers.append(callback)
 
     def load_bot(self, bot_path):
         """Load a bot from a file path."""
@@ -20,55 +47,332 @@ class TournamentSimulation:
             
             for item in dir(module):
                 obj = getattr(module, item)
-                if isinstance(obj, type) and issubclass(obj, AbstractBot) and obj != AbstractBot:
+                if isinstance(obj, type) and issubclass(obj, AbstractBot) and not inspect.isabstract(obj):
                     return obj()
             raise ValueError("No valid bot class found in file")
         except Exception as e:
             raise Exception(f"Failed to load bot: {str(e)}")
 
-    def run_all_against_all(self, bot_paths, rounds=GameConfig.NUMBER_OF_ROUNDS, visualize=False):
+    def run_all_against_all(self, bot_paths, rounds=None, visualize=False, progress=None, shard=None, shard_dir=None,
+                            dedupe=False):
         """Conduct a round-robin tournament where each bot plays against each other.
         
-        If GameConfig.ADD_NOISE is True, the number of rounds per match will vary randomly
-        between 80% and 120% of the specified rounds value.
+        The tournament is played with self.config; rounds, if given, overrides its
+        number_of_rounds. If add_noise is set, the number of rounds per match will vary
+        randomly between 80% and 120% of the rounds value.
+
+        If given, progress(done, total, label) is called after every finished match.
+
+        With shard=(index, count) only that shard's share of the pairs is played and,
+        instead of the summary, a self-contained shard file is written to shard_dir
+        (the tournament directory by default); merge_shards combines the shard files.
+
+        Finished matches are journaled to journal.jsonl in the tournament directory, so
+        an interrupted tournament can be continued with resume(). A bot that raises
+        during a match forfeits that match instead of aborting the tournament.
+
+        Matches of external-program bots are played first, all at once on the pipelined
+        engine of simulation.external_matches (unless round hooks are registered).
+
+        With dedupe, bots are first fingerprinted (see simulation.fingerprint) and every
+        class of behaviorally identical deterministic bots plays each opponent only once;
+        the other members get copies of those results. Under move noise every match draws
+        its own flips, so copies would differ from playing; dedupe is then turned off.
         """
+        config = self.config if rounds is None else self.config.replace(number_of_rounds=rounds)
+        if dedupe and config.move_noise:
+            print("Warning: --dedupe is ignored with move noise, every match draws its own flips", file=sys.stderr)
+            dedupe = False
+        if shard and config.add_noise and config.seed is None:
+            raise ValueError("Sharded tournaments with noise need a config seed so all shards plan the same match lengths")
+
         timestamp = datetime.now().strftime("%H%M%S")
-        tournament_dir = os.path.join(self.logs_dir, f"{timestamp}_tournament")
-        os.makedirs(tournament_dir)
+        suffix = f"_shard{shard[0]}of{shard[1]}" if shard else ""
+        tournament_dir = create_run_dir(self.logs_dir, f"{timestamp}_tournament{suffix}")
 
-        # Track scores and statistics
-        scores = {}
-        matches_played = {}
-        stats = {
-            'mutual_cooperation': 0,
-            'mutual_defection': 0,
-            'betrayals': {}  # Will track betrayals per bot
-        }
+        self.metrics = RunMetrics('tournament')
+        with self.metrics.timed('bot_load'):
+            bots = [self.load_bot(bot_path) for bot_path in bot_paths]
+        with self.metrics.timed('engine'):
+            plan = self.plan_matches(bot_paths, config)
+            classes = equivalence_classes([bot.__class__ for bot in bots], config, probe_rounds(config)) if dedupe else None
+        journal = MatchJournal(tournament_dir)
+        journal.write_header(bot_paths, [bot.name for bot in bots], config, plan, shard, shard_dir, classes)
+        return self._play(tournament_dir, bots, config, plan, journal, {}, progress, shard, shard_dir, classes)
+
+    def resume(self, tournament_dir, progress=None):
+        """Continue an interrupted tournament from the journal in its directory.
+
+        The bots are reloaded from the paths recorded in the journal and only the pairs
+        without a journaled result are played; the plan (including noisy match lengths)
+        is taken from the journal, so the result is the same as an uninterrupted run.
+        Raises ValueError if there is no journal or the bot files no longer match it.
+        """
+        header, done = read_journal(tournament_dir)
+        self.metrics = RunMetrics('tournament')
+        with self.metrics.timed('bot_load'):
+            bots = [self.load_bot(bot_path) for bot_path in header['bot_paths']]
+        if [bot.name for bot in bots] != header['bots']:
+            raise ValueError("The bot files no longer match the journaled tournament")
+
+        truncate_torn_line(tournament_dir)
+        mark_running(tournament_dir)
+        journal = MatchJournal(tournament_dir)
+        shard = tuple(header['shard']) if header['shard'] else None
+        return self._play(tournament_dir, bots, header['config'], header['plan'], journal, done, progress,
+                          shard, header['shard_dir'], header.get('classes'))
+
+    def _play(self, tournament_dir, bots, config, plan, journal, done, progress, shard=None, shard_dir=None,
+              classes=None):
+        """Play the planned matches not yet in done ({(i, j): record}) and write the results.
+
+        classes, if given, maps every bot position to its equivalence class; a match
+        between classes that already met over the same number of rounds is copied.
+        """
+        bot_names = [bot.name for bot in bots]
+        matches = select_shard(plan, *shard) if shard else plan
+        observers = self._start_events('tournament', tournament_dir, bot_names, len(matches))
+        totals = RunningTotals(bot_names)
+        played = {}  # (class of bot1, class of bot2, rounds): record of the match that was played
+        external = self._play_external(bots, matches, done, config)
+
+        # Run the planned matches
+        records = []
+        try:
+            for match_index, (i, j, match_rounds) in enumerate(matches, 1):
+                record = done.get((i, j))
+                key = (classes[i], classes[j], match_rounds) if classes else None
+                if record is None and key in played:
+                    record = fan_out(played[key], i, j, bot_names[i], bot_names[j])
+                    journal.append(record)
+                elif record is None and key and (key[1], key[0], match_rounds) in played:
+                    record = fan_out(played[key[1], key[0], match_rounds], i, j, bot_names[i], bot_names[j], swapped=True)
+                    journal.append(record)
+                elif record is None:
+                    bot1, bot2 = bots[i], bots[j]
+                    try:
+                        with self.metrics.match(match_rounds):
+                            match_stats = self._run_match(bot1, bot2, match_rounds, tournament_dir, config,
+                                                          external.get((i, j)))
+                    except BotError as e:
+                        match_stats = self._forfeit(bot1, bot2, match_rounds, tournament_dir, config, e)
+                    record = match_record(i, j, bot1.name, bot2.name, match_rounds, match_stats)
+                    journal.append(record)
+                if key and 'same_as' not in record:
+                    played.setdefault(key, record)
+                records.append(record)
+                publish(observers, match_event(record, match_index, len(matches), totals.add(record)))
+
+                if progress:
+                    progress(match_index, len(matches), f"{record['bot1']} vs {record['bot2']}")
+        finally:
+            journal.close()
+
+        if shard:
+            with self.metrics.timed('io'):
+                write_shard_file(shard_dir or tournament_dir, shard, bot_names, config, plan, records)
+            self.metrics.write(tournament_dir)
+            self._finish_events(observers, 'tournament', tournament_dir)
+            finish_run(tournament_dir)
+            return tournament_dir
+
+        run_id = self.results_store.start_run('tournament', tournament_dir, config.as_dict())
+        for record in records:
+            i, j = record.get('same_as', (record['i'], record['j']))  # Copied results share the played match's log
+            self.results_store.record_match(
+                run_id, record['bot1'], record['bot2'], record['rounds'], record['scores'],
+                record['mutual_cooperation'], record['mutual_defection'], *record['betrayals'],
+                log_file=f"{bot_names[i]}_vs_{bot_names[j]}.txt")
+
+        # Write summary and export CSV
+        with self.metrics.timed('io'):
+            self.write_results(tournament_dir, bot_names, records, config.number_of_rounds,
+                               equivalent_groups(classes, bot_names) if classes else ())
+            self.results_store.finish_run(run_id, summary_file="tournament_summary.txt")
+        self.metrics.write(tournament_dir)
+        self._finish_events(observers, 'tournament', tournament_dir)
+        apply_configured_retention(self.logs_dir, tournament_dir)
+        
+        return tournament_dir
+
+    def _start_events(self, kind, directory, bot_names, total_matches):
+        """Return the observers of a run (including its events.jsonl) after announcing it."""
+        self.hooks.run_started(kind, directory)
+        observers = self.observers + [EventStream(directory)]
+        publish(observers, {'type': 'tournament_started', 'bots': bot_names,
+                            'total_matches': total_matches, 'directory': directory})
+        return observers
+
+    def _finish_events(self, observers, kind, directory):
+        publish(observers, {'type': 'tournament_finished', 'directory': directory})
+        self.hooks.run_finished(kind, directory)
+
+    def run_swiss(self, bot_paths, swiss_rounds=None, progress=None, compare=False):
+        """Conduct a Swiss-system tournament of swiss_rounds rounds (see simulation.swiss).
+
+        Each round pairs bots with similar average scores that have not met yet, so a
+        field of n bots plays about n/2 matches per round instead of n(n-1)/2 in total.
+        With add_noise every match length is drawn between 80% and 120% of the rounds.
+        With compare the field is also scored by a log-free round-robin and the summary
+        reports the Kendall tau between both rankings. Returns the results directory.
+        """
+        config = self.config
+        rng = random.Random(config.seed) if config.seed is not None else random.Random()
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        swiss_dir = create_run_dir(self.logs_dir, f"{timestamp}_swiss")
+
+        self.metrics = RunMetrics('swiss')
+        with self.metrics.timed('bot_load'):
+            bots = [self.load_bot(bot_path) for bot_path in bot_paths]
+        bot_names = [bot.name for bot in bots]
+        if swiss_rounds is None:
+            swiss_rounds = default_swiss_rounds(len(bots))
+        seeding = list(range(len(bots)))
+        rng.shuffle(seeding)
+        standings = SwissStandings(len(bots), seeding)
+        run_id = self.results_store.start_run('swiss', swiss_dir, dict(config.as_dict(), swiss_rounds=swiss_rounds))
+
+        records = []
+        total_matches = swiss_rounds * (len(bots) // 2)
+        observers = self._start_events('swiss', swiss_dir, bot_names, total_matches)
+        totals = RunningTotals(bot_names)
+        for swiss_round in range(swiss_rounds):
+            with self.metrics.timed('engine'):
+                pairs, bye = standings.pair_round()
+            for i, j in pairs:
+                bot1, bot2 = bots[i], bots[j]
+                rounds = config.number_of_rounds
+                if config.add_noise:
+                    rounds = rng.randint(int(rounds * 0.8), int(rounds * 1.2))
+                try:
+                    with self.metrics.match(rounds):
+                        match_stats = self._run_match(bot1, bot2, rounds, swiss_dir, config)
+                except BotError as e:
+                    match_stats = self._forfeit(bot1, bot2, rounds, swiss_dir, config, e)
+                record = match_record(i, j, bot1.name, bot2.name, rounds, match_stats)
+                record['swiss_round'] = swiss_round + 1
+                records.append(record)
+                standings.add_match(i, j, *record['scores'])
+                publish(observers, match_event(record, len(records), total_matches, totals.add(record)))
+                self.results_store.record_match(
+                    run_id, bot1.name, bot2.name, rounds, record['scores'],
+                    record['mutual_cooperation'], record['mutual_defection'], *record['betrayals'],
+                    log_file=f"{bot1.name}_vs_{bot2.name}.txt")
+
+                if progress:
+                    progress(len(records), total_matches, f"round {swiss_round + 1}: {bot1.name} vs {bot2.name}")
+
+        with self.metrics.timed('bot'):
+            reference = self.round_robin_averages(bot_paths, config) if compare else None
+        with self.metrics.timed('io'):
+            self._write_swiss_results(swiss_dir, bot_names, standings, records, swiss_rounds, reference)
+            self.results_store.finish_run(run_id, summary_file="swiss_summary.txt")
+        self.metrics.write(swiss_dir)
+        self._finish_events(observers, 'swiss', swiss_dir)
+        apply_configured_retention(self.logs_dir, swiss_dir)
+        return swiss_dir
+
+    def run_adaptive(self, bot_paths, top_k=3, confidence=0.95, min_matches=3, max_matches=None, progress=None):
+        """Conduct a tournament that samples pairings until the top-k ranking is settled.
+
+        Every bot first plays min_matches random opponents. After that, matches go to the
+        bots whose confidence interval (see simulation.adaptive) still overlaps the
+        boundary between the top k and the rest, until the top k are separated at the
+        given confidence, no such bot has an unplayed opponent left, or max_matches
+        matches were played. results.csv has the round-robin shape with NA for pairs
+        that were not sampled. Returns the results directory.
+        """
+        config = self.config
+        rng = random.Random(config.seed) if config.seed is not None else random.Random()
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        adaptive_dir = create_run_dir(self.logs_dir, f"{timestamp}_adaptive")
+
+        self.metrics = RunMetrics('adaptive')
+        with self.metrics.timed('bot_load'):
+            bots = [self.load_bot(bot_path) for bot_path in bot_paths]
+        bot_names = [bot.name for bot in bots]
+        full_matches = len(bots) * (len(bots) - 1) // 2
+        max_matches = min(max_matches or full_matches, full_matches)
+        estimates = ScoreEstimates(len(bots), confidence, rng)
+        run_id = self.results_store.start_run(
+            'adaptive', adaptive_dir, dict(config.as_dict(), top_k=top_k, confidence=confidence))
+
+        records = []
+        observers = self._start_events('adaptive', adaptive_dir, bot_names, max_matches)
+        totals = RunningTotals(bot_names)
+        while len(records) < max_matches:
+            with self.metrics.timed('engine'):
+                pair = estimates.next_pair(top_k, min_matches)
+            if pair is None:
+                break
+            i, j = sorted(pair)
+            bot1, bot2 = bots[i], bots[j]
+            rounds = config.number_of_rounds
+            if config.add_noise:
+                rounds = rng.randint(int(rounds * 0.8), int(rounds * 1.2))
+            try:
+                with self.metrics.match(rounds):
+                    match_stats = self._run_match(bot1, bot2, rounds, adaptive_dir, config)
+            except BotError as e:
+                match_stats = self._forfeit(bot1, bot2, rounds, adaptive_dir, config, e)
+            record = match_record(i, j, bot1.name, bot2.name, rounds, match_stats)
+            records.append(record)
+            estimates.add_match(i, j, *record['scores'])
+            publish(observers, match_event(record, len(records), max_matches, totals.add(record)))
+            self.results_store.record_match(
+                run_id, bot1.name, bot2.name, rounds, record['scores'],
+                record['mutual_cooperation'], record['mutual_defection'], *record['betrayals'],
+                log_file=f"{bot1.name}_vs_{bot2.name}.txt")
+
+            if progress:
+                progress(len(records), max_matches, f"{bot1.name} vs {bot2.name}")
+
+        with self.metrics.timed('io'):
+            self._write_adaptive_results(adaptive_dir, bot_names, estimates, records, top_k, confidence)
+            self.results_store.finish_run(run_id, summary_file="adaptive_summary.txt")
+        self.metrics.write(adaptive_dir)
+        self._finish_events(observers, 'adaptive', adaptive_dir)
+        apply_configured_retention(self.logs_dir, adaptive_dir)
+        return adaptive_dir
+
+    def round_robin_averages(self, bot_paths, config=None):
+        """Average score per match of every bot in a full round-robin, without writing logs."""
+        config = config or self.config
+        bot_classes = [load_bot_class(bot_path) for bot_path in bot_paths]
+        bot_names = [bot_class().name for bot_class in bot_classes]
+        totals = [0] * len(bot_paths)
+        for i, j, rounds in self.plan_matches(bot_paths, config):
+            try:
+                moves1, moves2 = play_match(bot_classes[i], bot_classes[j], rounds, config)
+                scores = score_outcomes(count_outcomes(moves1, moves2), config)['scores']
+            except BotError as e:
+                scores = forfeit_scores(rounds, config, e.bot_name in (bot_names[i], bot_classes[i].__name__))
+            totals[i] += scores[0]
+            totals[j] += scores[1]
+        return [total / (len(bot_paths) - 1) for total in totals]
+
+    def plan_matches(self, bot_paths, config):
+        """Return the (i, j, rounds) list of matches of a round-robin between bot_paths, in play order.
+
+        If config.add_noise is set, the number of rounds per match varies between 80% and
+        120% of config.number_of_rounds while every bot still plays the same total number
+        of rounds. The draw uses random.Random(config.seed) when a seed is set.
+        """
+        rounds = config.number_of_rounds
+        rng = random.Random(config.seed) if config.seed is not None else random
 
         # Calculate total rounds each bot should play
         num_opponents = len(bot_paths) - 1
         total_rounds_per_bot = num_opponents * rounds
         remaining_rounds = {bot_path: total_rounds_per_bot for bot_path in bot_paths}
 
-        # Run matches between all pairs of bots
+        plan = []
         for i, bot1_path in enumerate(bot_paths):
-            bot1 = self.load_bot(bot1_path)
-            stats['betrayals'][bot1.name] = 0
-            
             for j, bot2_path in enumerate(bot_paths[i+1:], i+1):
-                bot2 = self.load_bot(bot2_path)
-                if j == i: continue  # Skip self-play
-                
-                if bot2.name not in stats['betrayals']:
-                    stats['betrayals'][bot2.name] = 0
-
-                # Initialize scores if needed
-                for bot_name in [bot1.name, bot2.name]:
-                    scores.setdefault(bot_name, 0)
-                    matches_played.setdefault(bot_name, 0)
-
                 # Calculate rounds for this match while maintaining total
-                if GameConfig.ADD_NOISE:
+                if config.add_noise:
                     min_rounds = int(rounds * 0.8)
                     max_rounds = int(rounds * 1.2)
                     
@@ -90,79 +394,237 @@ class TournamentSimulation:
                                       remaining_rounds[bot1_path],
                                       remaining_rounds[bot2_path])
                         
-                        match_rounds = random.randint(match_min, max(match_min, match_max))
+                        match_rounds = rng.randint(match_min, max(match_min, match_max))
                 else:
                     match_rounds = rounds
 
                 # Update remaining rounds
                 remaining_rounds[bot1_path] -= match_rounds
                 remaining_rounds[bot2_path] -= match_rounds
+                plan.append((i, j, match_rounds))
 
-                # Run match
-                match_stats = self._run_match(bot1, bot2, match_rounds, tournament_dir)
-                
-                # Update scores and statistics
-                scores[bot1.name] += match_stats['scores'][bot1.name]
-                scores[bot2.name] += match_stats['scores'][bot2.name]
-                matches_played[bot1.name] += 1
-                matches_played[bot2.name] += 1
-                
-                stats['mutual_cooperation'] += match_stats['mutual_cooperation']
-                stats['mutual_defection'] += match_stats['mutual_defection']
-                stats['betrayals'][bot1.name] += match_stats['betrayals'][bot1.name]
-                stats['betrayals'][bot2.name] += match_stats['betrayals'][bot2.name]
-
-        # Verify all bots played their expected number of rounds
+        # Verify all bots are scheduled for their expected number of rounds
         for bot_path, remaining in remaining_rounds.items():
             if remaining != 0:
-                print(f"Warning: {os.path.basename(bot_path)} has {remaining} unplayed rounds")
+                print(f"Warning: {os.path.basename(bot_path)} has {remaining} unplayed rounds", file=sys.stderr)
+        return plan
+
+    def merge_shards(self, shard_paths):
+        """Combine shard files of one tournament into the usual summary and CSV.
+
+        Raises ValueError unless the shards belong to the same tournament and cover every
+        planned pair exactly once. Returns the directory holding the merged results.
+        """
+        self.metrics = RunMetrics('merge')
+        with self.metrics.timed('io'):
+            bot_names, config, records = merge_shard_files(shard_paths)
+
+        timestamp = datetime.now().strftime("%H%M%S")
+        tournament_dir = create_run_dir(self.logs_dir, f"{timestamp}_tournament")
+        run_id = self.results_store.start_run('tournament', tournament_dir, config.as_dict())
+        for record in records:
+            self.results_store.record_match(
+                run_id, record['bot1'], record['bot2'], record['rounds'], record['scores'],
+                record['mutual_cooperation'], record['mutual_defection'], *record['betrayals'])
+
+        with self.metrics.timed('io'):
+            self.write_results(tournament_dir, bot_names, records, config.number_of_rounds)
+            self.results_store.finish_run(run_id, summary_file="tournament_summary.txt")
+        self.metrics.write(tournament_dir)
+        finish_run(tournament_dir)
+        return tournament_dir
+
+    def write_results(self, tournament_dir, bot_names, records, rounds, equivalents=()):
+        """Aggregate match records and write tournament_summary.txt and results.csv.
+
+        equivalents lists groups of bot names that were deduplicated as identical.
+        """
+        # Track scores and statistics
+        scores = {name: 0 for name in bot_names}
+        matches_played = {name: 0 for name in bot_names}
+        stats = {
+            'mutual_cooperation': 0,
+            'mutual_defection': 0,
+            'betrayals': {name: 0 for name in bot_names}  # Will track betrayals per bot
+        }
+        match_scores = {}
+        noise = {}  # Bot name -> [intended cooperations, executed cooperations, flipped moves, rounds]
+        for record in records:
+            bot1, bot2 = record['bot1'], record['bot2']
+            if 'flips' in record:
+                for k, (bot, opponent_betrayals) in enumerate([(bot1, record['betrayals'][1]), (bot2, record['betrayals'][0])]):
+                    totals = noise.setdefault(bot, [0, 0, 0, 0])
+                    totals[0] += record['intended_cooperation'][k]
+                    totals[1] += record['mutual_cooperation'] + opponent_betrayals
+                    totals[2] += record['flips'][k]
+                    totals[3] += record['rounds']
+            scores[bot1] += record['scores'][0]
+            scores[bot2] += record['scores'][1]
+            matches_played[bot1] += 1
+            matches_played[bot2] += 1
+            stats['mutual_cooperation'] += record['mutual_cooperation']
+            stats['mutual_defection'] += record['mutual_defection']
+            stats['betrayals'][bot1] += record['betrayals'][0]
+            stats['betrayals'][bot2] += record['betrayals'][1]
+            match_scores[bot1, bot2] = record['scores'][0]
+            match_scores[bot2, bot1] = record['scores'][1]
+        forfeits = [record for record in records if record.get('forfeit')]
 
         # After matches are done and before writing summary
         bot_stats = []
         for bot_name in scores.keys():
-            avg_score = scores[bot_name] / matches_played[bot_name]
+            avg_score = scores[bot_name] / matches_played[bot_name] if matches_played[bot_name] else 0
             bot_stats.append((bot_name, avg_score))
         
         # Sort bots by average score
         bot_names = [bot[0] for bot in sorted(bot_stats, key=lambda x: x[1], reverse=True)]
         display_names = {name: name.replace(" Bot", "").strip() for name in bot_names}
         
-        # Create score matrix
-        score_matrix = {bot1: {bot2: 0 for bot2 in bot_names} for bot1 in bot_names}
+        # Create score matrix from match results
+        score_matrix = {bot1: {bot2: match_scores.get((bot1, bot2), 0) for bot2 in bot_names} for bot1 in bot_names}
         
-        # Fill score matrix from match results
-        for bot1 in bot_names:
-            for bot2 in bot_names:
-                if bot1 != bot2:
-                    match_file = os.path.join(tournament_dir, f"{bot1}_vs_{bot2}.txt")
-                    if os.path.exists(match_file):
-                        with open(match_file, 'r') as mf:
-                            for line in mf:
-                                if line.startswith(f"{bot1}: "):
-                                    score = int(line.split(": ")[1])
-                                    score_matrix[bot1][bot2] = score
-                    else:
-                        match_file = os.path.join(tournament_dir, f"{bot2}_vs_{bot1}.txt")
-                        if os.path.exists(match_file):
-                            with open(match_file, 'r') as mf:
-                                for line in mf:
-                                    if line.startswith(f"{bot1}: "):
-                                        score = int(line.split(": ")[1])
-                                        score_matrix[bot1][bot2] = score
-        
-        # Write summary and export CSV
-        self._write_tournament_summary(tournament_dir, scores, stats, matches_played, rounds, bot_names, display_names, score_matrix)
+        self._write_tournament_summary(tournament_dir, scores, stats, matches_played, rounds, bot_names, display_names, score_matrix, forfeits, equivalents, noise)
         self._export_score_matrix_csv(directory=tournament_dir, bot_names=bot_names, display_names=display_names, score_matrix=score_matrix)
-        
-        return tournament_dir
 
-    def _run_match(self, bot1, bot2, rounds, tournament_dir):
-        """Run a single match between two bots and return match statistics."""
+    def _write_swiss_results(self, swiss_dir, bot_names, standings, records, swiss_rounds, reference=None):
+        """Write swiss_summary.txt and swiss_standings.csv."""
+        ranking = standings.ranking()
+        name_width = max(len(name) for name in bot_names + ["Bot"])
+        reference_ranks = None
+        if reference is not None:
+            reference_order = sorted(range(len(bot_names)), key=lambda i: -reference[i])
+            reference_ranks = {bot: rank for rank, bot in enumerate(reference_order, 1)}
+
+        summary_path = os.path.join(swiss_dir, "swiss_summary.txt")
+        with open(summary_path, 'w') as f:
+            f.write("="*50 + "\n")
+            f.write("SWISS TOURNAMENT SUMMARY\n")
+            f.write("="*50 + "\n\n")
+
+            f.write("STANDINGS\n")
+            f.write("-"*50 + "\n\n")
+            header = f"{'Rank':>4} | {'Bot'.ljust(name_width)} | {'Matches':>7} | {'Avg score':>9} | {'Buchholz':>8} | {'Byes':>4}"
+            if reference_ranks:
+                header += f" | {'RR rank':>7}"
+            f.write(header + "\n")
+            f.write("-" * len(header) + "\n")
+            for rank, i in enumerate(ranking, 1):
+                line = (f"{rank:>4} | {bot_names[i].ljust(name_width)} | {standings.matches[i]:>7} | "
+                        f"{standings.average(i):>9.1f} | {standings.buchholz(i):>8.1f} | {standings.byes[i]:>4}")
+                if reference_ranks:
+                    line += f" | {reference_ranks[i]:>7}"
+                f.write(line + "\n")
+            f.write("\n\n")
+
+            f.write("AGGREGATE STATISTICS\n")
+            f.write("-"*50 + "\n")
+            total_matches = len(records)
+            full_matches = len(bot_names) * (len(bot_names) - 1) // 2
+            f.write(f"Swiss Rounds: {swiss_rounds}\n")
+            f.write(f"Total Matches: {total_matches} (a round-robin needs {full_matches})\n")
+            if total_matches:
+                f.write(f"Average Mutual Cooperation: {sum(r['mutual_cooperation'] for r in records)/total_matches:.1f} per match\n")
+                f.write(f"Average Mutual Defection: {sum(r['mutual_defection'] for r in records)/total_matches:.1f} per match\n")
+            if reference is not None:
+                swiss_averages = [standings.average(i) for i in range(len(bot_names))]
+                f.write(f"Kendall tau vs round-robin: {kendall_tau(swiss_averages, reference):.3f}\n")
+
+            forfeits = [record for record in records if record.get('forfeit')]
+            if forfeits:
+                f.write("\n\nFORFEITS\n")
+                f.write("-"*50 + "\n")
+                for record in forfeits:
+                    f.write(f"Round {record['swiss_round']}, {record['bot1']} vs {record['bot2']}: {record['error']}\n")
+
+        csv_path = os.path.join(swiss_dir, "swiss_standings.csv")
+        with open(csv_path, 'w') as f:
+            f.write("Rank,Bot,Matches,Total,Average,Buchholz,Byes" + (",Round robin rank,Round robin average" if reference_ranks else "") + "\n")
+            for rank, i in enumerate(ranking, 1):
+                row = [str(rank), bot_names[i], str(standings.matches[i]), str(standings.totals[i]),
+                       f"{standings.average(i):.1f}", f"{standings.buchholz(i):.1f}", str(standings.byes[i])]
+                if reference_ranks:
+                    row += [str(reference_ranks[i]), f"{reference[i]:.1f}"]
+                f.write(",".join(row) + "\n")
+
+    def _write_adaptive_results(self, adaptive_dir, bot_names, estimates, records, top_k, confidence):
+        """Write adaptive_summary.txt and the sparse results.csv."""
+        ranking = estimates.ranking()
+        settled = not estimates.uncertain(top_k)
+        full_matches = len(bot_names) * (len(bot_names) - 1) // 2
+        name_width = max(len(name) for name in bot_names + ["Bot"])
+
+        summary_path = os.path.join(adaptive_dir, "adaptive_summary.txt")
+        with open(summary_path, 'w') as f:
+            f.write("="*50 + "\n")
+            f.write("ADAPTIVE TOURNAMENT SUMMARY\n")
+            f.write("="*50 + "\n\n")
+
+            f.write(f"ESTIMATED RANKING ({confidence:.0%} confidence intervals)\n")
+            f.write("-"*50 + "\n\n")
+            header = f"{'Rank':>4} | {'Bot'.ljust(name_width)} | {'Matches':>7} | {'Avg score':>9} | {'Interval':^17}"
+            f.write(header + "\n")
+            f.write("-" * len(header) + "\n")
+            for rank, i in enumerate(ranking, 1):
+                lower, upper = estimates.bounds(i)
+                interval = f"{lower:.1f} - {upper:.1f}" if upper != math.inf else "unknown"
+                f.write(f"{rank:>4} | {bot_names[i].ljust(name_width)} | {estimates.counts[i]:>7} | "
+                        f"{estimates.mean(i):>9.1f} | {interval:^17}\n")
+                if rank == top_k:
+                    f.write("-" * len(header) + "\n")
+            f.write("\n\n")
+
+            f.write("AGGREGATE STATISTICS\n")
+            f.write("-"*50 + "\n")
+            f.write(f"Total Matches: {len(records)} of {full_matches} ({len(records) / full_matches:.0%})\n")
+            f.write(f"Top {top_k} settled: {'yes' if settled else 'no'}\n")
+
+            forfeits = [record for record in records if record.get('forfeit')]
+            if forfeits:
+                f.write("\n\nFORFEITS\n")
+                f.write("-"*50 + "\n")
+                for record in forfeits:
+                    f.write(f"{record['bot1']} vs {record['bot2']}: {record['error']}\n")
+
+        ranked_names = [bot_names[i] for i in ranking]
+        display_names = {name: name.replace(" Bot", "").strip() for name in ranked_names}
+        score_matrix = {bot1: {bot2: None for bot2 in ranked_names} for bot1 in ranked_names}
+        for record in records:
+            score_matrix[record['bot1']][record['bot2']] = record['scores'][0]
+            score_matrix[record['bot2']][record['bot1']] = record['scores'][1]
+        self._export_score_matrix_csv(adaptive_dir, ranked_names, display_names, score_matrix)
+
+    def _play_external(self, bots, matches, done, config):
+        """Play the pending matches of external-program bots concurrently (see simulation.external_matches).
+
+        Returns {(i, j): (moves1, moves2, noise) or BotError} for _run_match. Round hooks
+        need to see every round as it is played, so with round hooks nothing is played here.
+        """
+        pending = [(i, j, rounds) for i, j, rounds in matches if (i, j) not in done
+                   and (is_external(bots[i].__class__) or is_external(bots[j].__class__))]
+        if not pending or self.hooks.round:
+            return {}
+        from simulation.external_matches import play_matches  # asyncio, only for external bots
+        noises = [match_noise(config, bots[i].name, bots[j].name, rounds) for i, j, rounds in pending]
+        with self.metrics.timed('bot'):
+            outcomes = play_matches([(bots[i].__class__, bots[j].__class__, rounds) for i, j, rounds in pending],
+                                    config, noises=noises)
+        return {(i, j): outcome if isinstance(outcome, BotError) else (*outcome, noise)
+                for (i, j, _), outcome, noise in zip(pending, outcomes, noises)}
+
+    def _run_match(self, bot1, bot2, rounds, tournament_dir, config=None, played=None):
+        """Run a single match between two bots and return match statistics.
+
+        played, if given, is the (moves1, moves2, noise) of the match as already played
+        by _play_external, or the BotError it ended with; only its log is written then.
+        """
+        if isinstance(played, BotError):
+            raise played
+        config = config or self.config
+        payoffs = config.payoff_table()
+
         # Reinitialize bots for this match by creating new instances
-        bot1_class = bot1.__class__
-        bot2_class = bot2.__class__
-        bot1 = bot1_class()
-        bot2 = bot2_class()
+        bot1 = self._create_bot(bot1, config)
+        bot2 = self._create_bot(bot2, config)
         
         scores = {bot1.name: 0, bot2.name: 0}
         stats = {
@@ -190,42 +652,53 @@ class TournamentSimulation:
             "-"*60
         ]
         
-        # Play rounds
-        for round_num in range(rounds):
-            # Get both moves before updating histories
-            move1 = bot1.make_decision()
-            move2 = bot2.make_decision()
-            
-            # Update histories for both bots after both moves are known
-            bot1.opponent_history.append(move2)
-            bot1.my_history.append(move1)
-            bot2.opponent_history.append(move1)
-            bot2.my_history.append(move2)
-            
+        # Play rounds, then score them from the histories (the executed moves under move noise)
+        if played is not None:
+            moves1, moves2, noise = played
+            bot1.my_history, bot1.opponent_history = list(moves1), list(moves2)
+            bot2.my_history, bot2.opponent_history = list(moves2), list(moves1)
+            cycle_start = None
+        else:
+            noise = match_noise(config, bot1.name, bot2.name, rounds)
+            detector = CycleDetector() if config.fast_forward and noise is None else None
+            with self.metrics.timed('bot'):
+                cycle_start = play_rounds(bot1, bot2, rounds, detector, self.hooks.round, noise)
+
+        for round_num, (move1, move2) in enumerate(zip(bot1.my_history, bot2.my_history)):
             # Calculate round result and update scores
+            score1, score2 = payoffs[move1, move2]
+            round_result = f"{score1:^2} - {score2:^2}"
+            scores[bot1.name] += score1
+            scores[bot2.name] += score2
             if move1 == Move.COOPERATE and move2 == Move.COOPERATE:
-                round_result = f"{GameConfig.MUTUAL_COOPERATION_POINTS:^2} - {GameConfig.MUTUAL_COOPERATION_POINTS:^2}"
-                scores[bot1.name] += GameConfig.MUTUAL_COOPERATION_POINTS
-                scores[bot2.name] += GameConfig.MUTUAL_COOPERATION_POINTS
                 stats['mutual_cooperation'] += 1
             elif move1 == Move.COOPERATE and move2 == Move.DEFECT:
-                round_result = f"{GameConfig.BETRAYED_POINTS:^2} - {GameConfig.BETRAYAL_POINTS:^2}"
-                scores[bot1.name] += GameConfig.BETRAYED_POINTS
-                scores[bot2.name] += GameConfig.BETRAYAL_POINTS
                 stats['betrayals'][bot2.name] += 1
             elif move1 == Move.DEFECT and move2 == Move.COOPERATE:
-                round_result = f"{GameConfig.BETRAYAL_POINTS:^2} - {GameConfig.BETRAYED_POINTS:^2}"
-                scores[bot1.name] += GameConfig.BETRAYAL_POINTS
-                scores[bot2.name] += GameConfig.BETRAYED_POINTS
                 stats['betrayals'][bot1.name] += 1
             else:  # Both defect
-                round_result = f"{GameConfig.MUTUAL_DEFECTION_POINTS:^2} - {GameConfig.MUTUAL_DEFECTION_POINTS:^2}"
-                scores[bot1.name] += GameConfig.MUTUAL_DEFECTION_POINTS
-                scores[bot2.name] += GameConfig.MUTUAL_DEFECTION_POINTS
                 stats['mutual_defection'] += 1
                 
             current_score = f"{scores[bot1.name]:^5} - {scores[bot2.name]:^5}"
-            output_lines.append(f"{round_num+1:^6} | {move1.name:^10} | {move2.name:^10} | {round_result:^12} | {current_score}")
+            shown1, shown2 = move1.name, move2.name
+            if noise is not None:
+                # Mark moves the noise flipped
+                shown1 += "*" if noise.flips1[round_num] else ""
+                shown2 += "*" if noise.flips2[round_num] else ""
+            output_lines.append(f"{round_num+1:^6} | {shown1:^10} | {shown2:^10} | {round_result:^12} | {current_score}")
+
+        if cycle_start is not None:
+            # Back in the joint state of an earlier round: the rest of the match repeats
+            round_num = len(bot1.my_history)
+            skipped = score_outcomes(cycle_outcomes(bot1.my_history, bot2.my_history, cycle_start, rounds - round_num), config)
+            scores[bot1.name] += skipped['scores'][0]
+            scores[bot2.name] += skipped['scores'][1]
+            stats['mutual_cooperation'] += skipped['mutual_cooperation']
+            stats['mutual_defection'] += skipped['mutual_defection']
+            stats['betrayals'][bot1.name] += skipped['betrayals1']
+            stats['betrayals'][bot2.name] += skipped['betrayals2']
+            current_score = f"{scores[bot1.name]:^5} - {scores[bot2.name]:^5}"
+            output_lines.append(f"Rounds {round_num+1}-{rounds} repeat rounds {cycle_start+1}-{round_num} (fast-forwarded) | {current_score}")
         
         # Add final statistics
         output_lines.extend([
@@ -236,6 +709,18 @@ class TournamentSimulation:
             f"Mutual Defection: {stats['mutual_defection']} ({stats['mutual_defection']/rounds*100:.1f}%)",
             f"Betrayals by {bot1.name}: {stats['betrayals'][bot1.name]} ({stats['betrayals'][bot1.name]/rounds*100:.1f}%)",
             f"Betrayals by {bot2.name}: {stats['betrayals'][bot2.name]} ({stats['betrayals'][bot2.name]/rounds*100:.1f}%)",
+        ])
+        if noise is not None:
+            noise_stats = noise.stats()
+            stats['intended_cooperation'] = dict(zip((bot1.name, bot2.name), noise_stats['intended_cooperation']))
+            stats['flips'] = dict(zip((bot1.name, bot2.name), noise_stats['flips']))
+            output_lines.extend([
+                f"Moves flipped by noise (marked *): {bot1.name} {stats['flips'][bot1.name]}, "
+                f"{bot2.name} {stats['flips'][bot2.name]} (flip probability {config.move_noise:g})",
+                f"Intended cooperations: {bot1.name} {stats['intended_cooperation'][bot1.name]}, "
+                f"{bot2.name} {stats['intended_cooperation'][bot2.name]}",
+            ])
+        output_lines.extend([
             "",
             "FINAL SCORES:",
             "-"*50,
@@ -246,17 +731,58 @@ class TournamentSimulation:
         
         # Write match results to file
         match_file = os.path.join(tournament_dir, f"{bot1.name}_vs_{bot2.name}.txt")
-        with open(match_file, 'w') as f:
+        with self.metrics.timed('io'), open(match_file, 'w') as f:
             f.write('\n'.join(output_lines))
         
-        return {
+        match_stats = {
             'scores': scores,
             'mutual_cooperation': stats['mutual_cooperation'],
             'mutual_defection': stats['mutual_defection'],
             'betrayals': stats['betrayals']
         }
+        if noise is not None:
+            match_stats['intended_cooperation'] = stats['intended_cooperation']
+            match_stats['flips'] = stats['flips']
+        self.hooks.match_finished(bot1, bot2, match_stats)
+        return match_stats
+
+    @staticmethod
+    def _create_bot(bot, config):
+        try:
+            return bot.__class__.create(config)
+        except Exception as e:
+            raise BotError(bot.name, e) from e
+
+    def _forfeit(self, bot1, bot2, rounds, tournament_dir, config, error):
+        """Score a match a bot failed in and log the error in place of the round history.
+
+        The faulting bot scores 0 and its opponent gets the mutual cooperation payoff
+        for every planned round, as if the match had been played cooperatively.
+        """
+        self.metrics.count_match(0)
+        score1, score2 = forfeit_scores(rounds, config, error.bot_name == bot1.name)
+        scores = {bot1.name: score1, bot2.name: score2}
+
+        match_file = os.path.join(tournament_dir, f"{bot1.name}_vs_{bot2.name}.txt")
+        with open(match_file, 'w') as f:
+            f.write("="*50 + "\n")
+            f.write(f"MATCH FORFEITED - {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
+            f.write(f"Bot 1: {bot1.name}\n")
+            f.write(f"Bot 2: {bot2.name}\n")
+            f.write("="*50 + "\n\n")
+            f.write(f"{error.bot_name} failed and forfeits the match.\n\n")
+            f.write("".join(traceback.format_exception(error.error)))
+
+        return {
+            'scores': scores,
+            'mutual_cooperation': 0,
+            'mutual_defection': 0,
+            'betrayals': {bot1.name: 0, bot2.name: 0},
+            'forfeit': error.bot_name,
+            'error': str(error),
+        }
 
-    def _write_tournament_summary(self, directory, scores, stats, matches_played, rounds_per_match, bot_names, display_names, score_matrix):
+    def _write_tournament_summary(self, directory, scores, stats, matches_played, rounds_per_match, bot_names, display_names, score_matrix, forfeits=(), equivalents=(), noise=None):
         def clean_name(name):
             if name == "Always Cooperate":
                 return "Always C"
@@ -285,29 +811,6 @@ class TournamentSimulation:
             vs_width = max(len(f"vs {name}") for name in display_names.values())  # Width including "vs "
             score_width = max(vs_width, 5)  # Width for score columns
             
-            # Create and fill score matrix
-            score_matrix = {bot1: {bot2: 0 for bot2 in bot_names} for bot1 in bot_names}
-            
-            # Fill in score matrix from match results
-            for bot1 in bot_names:
-                for bot2 in bot_names:
-                    if bot1 != bot2:
-                        match_file = os.path.join(directory, f"{bot1}_vs_{bot2}.txt")
-                        if os.path.exists(match_file):
-                            with open(match_file, 'r') as mf:
-                                for line in mf:
-                                    if line.startswith(f"{bot1}: "):
-                                        score = int(line.split(": ")[1])
-                                        score_matrix[bot1][bot2] = score
-                        else:
-                            match_file = os.path.join(directory, f"{bot2}_vs_{bot1}.txt")
-                            if os.path.exists(match_file):
-                                with open(match_file, 'r') as mf:
-                                    for line in mf:
-                                        if line.startswith(f"{bot1}: "):
-                                            score = int(line.split(": ")[1])
-                                            score_matrix[bot1][bot2] = score
-
             # Write score matrix
             f.write("SCORE MATRIX\n")
             f.write("-"*50 + "\n\n")
@@ -351,12 +854,43 @@ class TournamentSimulation:
             f.write(f"Average Mutual Cooperation: {stats['mutual_cooperation']/total_matches:.1f} per match\n")
             f.write(f"Average Mutual Defection: {stats['mutual_defection']/total_matches:.1f} per match\n")
             f.write(f"Average Bot Betrayals: {sum(stats['betrayals'].values())/total_matches:.1f} per match\n")
+
+            # List matches decided by a bot failure
+            if forfeits:
+                f.write("\n\nFORFEITS\n")
+                f.write("-"*50 + "\n")
+                for record in forfeits:
+                    f.write(f"{record['bot1']} vs {record['bot2']}: {record['error']}\n")
+
+            # List bots that played alike and shared their matches
+            if equivalents:
+                f.write("\n\nEQUIVALENT BOTS\n")
+                f.write("-"*50 + "\n")
+                for names in equivalents:
+                    f.write(", ".join(names) + "\n")
+
+            # Intended vs executed moves of matches played with move noise
+            if noise:
+                f.write("\n\nMOVE NOISE\n")
+                f.write("-"*50 + "\n\n")
+                header = f"{'Bot'.ljust(name_width)} | {'Intended C':>10} | {'Executed C':>10} | {'Flipped':>7}"
+                f.write(header + "\n")
+                f.write("-" * len(header) + "\n")
+                for bot in bot_names:
+                    if bot in noise:
+                        intended, executed, flips, played = noise[bot]
+                        f.write(f"{display_names[bot].ljust(name_width)} | {intended / played:>10.1%} | "
+                                f"{executed / played:>10.1%} | {flips:>7}\n")
         
         # After writing the tournament summary, export the CSV
         self._export_score_matrix_csv(directory, bot_names, display_names, score_matrix)
 
     def _export_score_matrix_csv(self, directory, bot_names, display_names, score_matrix):
-        """Export the score matrix as a CSV file."""
+        """Export the score matrix as a CSV file.
+
+        Pairs that were not played (score None, e.g. in adaptive tournaments) are written
+        as NA and left out of the average.
+        """
         csv_path = os.path.join(directory, "results.csv")
         with open(csv_path, 'w') as f:
             # Write header row
@@ -371,6 +905,8 @@ class TournamentSimulation:
                 for bot2 in bot_names:
                     if bot1 == bot2:
                         row.append("")  # Empty cell for self-play
+                    elif score_matrix[bot1][bot2] is None:
+                        row.append("NA")  # Pair not sampled
                     else:
                         match_score = score_matrix[bot1][bot2]
                         row.append(str(match_score))
@@ -0,0 +1,133 @@
+"""Swiss-system pairing and standings for fields too large for a round-robin.
+
+Bots are ranked by average score per match played, with the Buchholz score (the
+average of their opponents' averages) as tiebreak. Every Swiss round pairs bots with
+similar standings that have not met yet; with an odd field the lowest-ranked bot
+without a bye sits the round out.
+"""
+import math
+
+# Backtracking steps allowed per round before rematches are accepted
+MAX_PAIRING_STEPS = 100000
+
+
+def default_rounds(bot_count):
+    """Number of Swiss rounds used when none is given: ceil(log2(n)) + 2, at most n - 1."""
+    if bot_count < 2:
+        return 0
+    return min(math.ceil(math.log2(bot_count)) + 2, bot_count - 1)
+
+
+def pair_players(order, played, max_steps=MAX_PAIRING_STEPS):
+    """Pair up the bots in order (best first) so that nobody meets a previous opponent.
+
+    Each bot is paired with the closest-ranked bot it has not played, backtracking when
+    the rest of the field cannot be paired. played is a set of frozenset({i, j}).
+    Returns a list of (i, j) pairs, or None if no rematch-free pairing was found.
+    """
+    count = len(order)
+    taken = [False] * count
+    choices = []  # (position, partner position) of the pairs made so far
+    first, start = 0, 1
+    steps = 0
+    while True:
+        partner = None
+        for position in range(start, count):
+            if not taken[position] and frozenset((order[first], order[position])) not in played:
+                partner = position
+                break
+        steps += 1
+
+        if partner is not None:
+            taken[first] = taken[partner] = True
+            choices.append((first, partner))
+            first = next((p for p in range(first + 1, count) if not taken[p]), None)
+            if first is None:
+                return [(order[a], order[b]) for a, b in choices]
+            start = first + 1
+        else:
+            if not choices or steps >= max_steps:
+                return None
+            first, previous = choices.pop()
+            taken[first] = taken[previous] = False
+            start = previous + 1
+
+
+class SwissStandings:
+    """Running scores of a Swiss tournament, indexed by bot position."""
+
+    def __init__(self, bot_count, seeding):
+        self.bot_count = bot_count
+        self.seeding = list(seeding)  # Initial order, breaks ties between equal standings
+        self.totals = [0] * bot_count
+        self.matches = [0] * bot_count
+        self.opponents = [[] for _ in range(bot_count)]
+        self.byes = [0] * bot_count
+        self.played = set()
+
+    def add_match(self, i, j, score_i, score_j):
+        self.totals[i] += score_i
+        self.totals[j] += score_j
+        self.matches[i] += 1
+        self.matches[j] += 1
+        self.opponents[i].append(j)
+        self.opponents[j].append(i)
+        self.played.add(frozenset((i, j)))
+
+    def average(self, i):
+        return self.totals[i] / self.matches[i] if self.matches[i] else 0
+
+    def buchholz(self, i):
+        """Average of the averages of the bots i has played."""
+        opponents = self.opponents[i]
+        return sum(self.average(j) for j in opponents) / len(opponents) if opponents else 0
+
+    def ranking(self):
+        """Bot positions from best to worst."""
+        rank_of_seed = {bot: rank for rank, bot in enumerate(self.seeding)}
+        return sorted(range(self.bot_count),
+                      key=lambda i: (-self.average(i), -self.buchholz(i), rank_of_seed[i]))
+
+    def pair_round(self):
+        """Return (pairs, bye) for the next round; bye is None for an even field.
+
+        Rematches are only allowed when no rematch-free pairing exists; then bots are
+        paired with their neighbours in the standings.
+        """
+        order = self.ranking()
+        bye = None
+        if len(order) % 2:
+            fewest = min(self.byes)
+            bye = next(i for i in reversed(order) if self.byes[i] == fewest)
+            order.remove(bye)
+            self.byes[bye] += 1
+
+        pairs = pair_players(order, self.played)
+        if pairs is None:
+            pairs = list(zip(order[::2], order[1::2]))
+        return pairs, bye
+
+
+def kendall_tau(scores_a, scores_b):
+    """Kendall tau-b rank correlation between two score lists over the same bots.
+
+    1 means both order every pair of bots the same way, -1 the opposite way.
+    """
+    concordant = discordant = ties_a = ties_b = 0
+    count = len(scores_a)
+    for i in range(count):
+        for j in range(i + 1, count):
+            a = scores_a[i] - scores_a[j]
+            b = scores_b[i] - scores_b[j]
+            if a == 0 and b == 0:
+                continue
+            if a == 0:
+                ties_a += 1
+            elif b == 0:
+                ties_b += 1
+            elif (a > 0) == (b > 0):
+                concordant += 1
+            else:
+                discordant += 1
+    denominator = math.sqrt((concordant + discordant + ties_a) * (concordant + discordant + ties_b))
+    return (concordant - discordant) / denominator if denominator else 1.0
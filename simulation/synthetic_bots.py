@@ -0,0 +1,166 @@
+"""Generate large fields of diverse synthetic bots for benchmarks and load tests.
+
+    bot_classes = generate_classes(5000, seed=1)           # in memory
+    bots_dir = write_bots(1000, seed=1)                     # files in a new temp directory
+    python -m simulation generate 1000 --out bots/generated --mix fsm=2,lookup=2,slow=1
+
+Kinds of bots (the default mix is DEFAULT_MIX):
+
+    fsm       random finite-state machine: every state has a move and a next state for
+              either opponent move
+    lookup    LookupTableBot with a random table of memory 1 to 3, partly probabilistic
+    schedule  repeats a random pattern of moves, ignoring the opponent
+    slow      fsm bot that also spins for SLOW_DELAY seconds per move
+    memory    fsm bot that also holds MEMORY_BALLAST bytes for the length of a match
+
+Generation is deterministic for a seed. Deterministic kinds implement state_snapshot(),
+so they also exercise fast-forwarding. Files import their base class from this module
+or utils.lookup_table_bot, so the repository must be on the path of whoever loads them.
+"""
+import os
+import random
+import tempfile
+import time
+from typing import List
+from utils.abstract_bot import AbstractBot
+from utils.lookup_table_bot import lookup_table_bot, state_keys
+from utils.moves import Move
+
+DEFAULT_MIX = {'fsm': 0.35, 'lookup': 0.35, 'schedule': 0.2, 'slow': 0.05, 'memory': 0.05}
+
+SLOW_DELAY = 5e-5          # Seconds per move of slow bots
+MEMORY_BALLAST = 16 << 20  # Bytes held by memory-hungry bots
+MAX_STATES = 6
+MAX_PERIOD = 12
+
+
+class FsmBot(AbstractBot):
+    """A finite-state machine; subclasses set moves, transitions and optionally delay and ballast."""
+    moves = "C"                # Move of each state
+    transitions = ((0, 0),)    # Next state of each state after the opponent cooperated, defected
+    delay = 0                  # Seconds to spin per move
+    ballast = 0                # Bytes to hold while the bot lives
+
+    def __init__(self):
+        super().__init__()
+        self.state = 0
+        self._ballast = b"\x01" * self.ballast if self.ballast else None  # Filled, so it is really resident
+
+    def state_snapshot(self):
+        return self.state, tuple(self.opponent_history[-1:])  # The last move is not applied yet
+
+    def strategy(self, my_history: List[Move], opponent_history: List[Move], current_round: int, total_rounds: int) -> Move:
+        if opponent_history:
+            self.state = self.transitions[self.state][opponent_history[-1] == Move.DEFECT]
+        if self.delay:
+            end = time.perf_counter() + self.delay
+            while time.perf_counter() < end:
+                pass
+        return Move(self.moves[self.state])
+
+
+class ScheduleBot(AbstractBot):
+    """Plays `pattern` over and over, whatever the opponent does."""
+    pattern = "C"
+
+    def state_snapshot(self):
+        return len(self.my_history) % len(self.pattern)
+
+    def strategy(self, my_history: List[Move], opponent_history: List[Move], current_round: int, total_rounds: int) -> Move:
+        return Move(self.pattern[len(my_history) % len(self.pattern)])
+
+
+def _random_fsm(rng):
+    states = rng.randint(1, MAX_STATES)
+    return {
+        'moves': "".join(rng.choice("CD") for _ in range(states)),
+        'transitions': tuple((rng.randrange(states), rng.randrange(states)) for _ in range(states)),
+    }
+
+
+def _random_table(rng):
+    memory = rng.choice((1, 1, 2, 3))
+    deterministic = rng.random() < 0.5
+    table = {key: rng.randint(0, 1) if deterministic or rng.random() < 0.5 else round(rng.random(), 2)
+             for key in state_keys(memory)}
+    return {'memory': memory, 'table': table, 'initial': rng.randint(0, 1)}
+
+
+def generate_specs(n, seed=0, mix=None):
+    """Describe n random bots as dicts with kind, name and the parameters of their kind."""
+    mix = mix or DEFAULT_MIX
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"Unknown bot kinds: {', '.join(sorted(unknown))}")
+    kinds = [kind for kind in mix if mix[kind] > 0]
+    rng = random.Random(seed)
+    width = len(str(max(n, 1)))
+
+    specs = []
+    for number, kind in enumerate(rng.choices(kinds, weights=[mix[kind] for kind in kinds], k=n), 1):
+        spec = {'kind': kind, 'name': f"Synthetic {kind} {number:0{width}d}"}
+        if kind == 'lookup':
+            spec.update(_random_table(rng))
+        elif kind == 'schedule':
+            spec['pattern'] = "".join(rng.choice("CD") for _ in range(rng.randint(1, MAX_PERIOD)))
+        else:
+            spec.update(_random_fsm(rng))
+            if kind == 'slow':
+                spec['delay'] = SLOW_DELAY
+            elif kind == 'memory':
+                spec['ballast'] = MEMORY_BALLAST
+        specs.append(spec)
+    return specs
+
+
+def _class_name(spec):
+    return "".join(part for part in spec['name'].title() if part.isalnum())
+
+
+def bot_class(spec):
+    """Create the bot class of a spec."""
+    if spec['kind'] == 'lookup':
+        return lookup_table_bot(spec['name'], spec['table'], initial=spec['initial'], memory=spec['memory'])
+    name = spec['name']
+    attributes = {'name': property(lambda self: name)}
+    if spec['kind'] == 'schedule':
+        attributes['pattern'] = spec['pattern']
+        return type(_class_name(spec), (ScheduleBot,), attributes)
+    for field in ('moves', 'transitions', 'delay', 'ballast'):
+        if field in spec:
+            attributes[field] = spec[field]
+    return type(_class_name(spec), (FsmBot,), attributes)
+
+
+def bot_source(spec):
+    """Source of a bot file defining the bot class of a spec."""
+    if spec['kind'] == 'lookup':
+        base, module = 'LookupTableBot', 'utils.lookup_table_bot'
+        fields = {'memory': spec['memory'], 'table': spec['table'], 'initial': spec['initial']}
+    elif spec['kind'] == 'schedule':
+        base, module = 'ScheduleBot', 'simulation.synthetic_bots'
+        fields = {'pattern': spec['pattern']}
+    else:
+        base, module = 'FsmBot', 'simulation.synthetic_bots'
+        fields = {field: spec[field] for field in ('moves', 'transitions', 'delay', 'ballast') if field in spec}
+    lines = [f"from {module} import {base}", "", "", f"class {_class_name(spec)}({base}):"]
+    lines += [f"    {field} = {value!r}" for field, value in fields.items()]
+    lines += ["", "    @property", "    def name(self):", f"        return {spec['name']!r}", ""]
+    return "\n".join(lines)
+
+
+def generate_classes(n, seed=0, mix=None):
+    return [bot_class(spec) for spec in generate_specs(n, seed, mix)]
+
+
+def write_bots(n, directory=None, seed=0, mix=None):
+    """Write n bot files into directory (a new temp directory by default) and return it."""
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix="synthetic_bots_")
+    os.makedirs(directory, exist_ok=True)
+    specs = generate_specs(n, seed, mix)
+    width = len(str(max(n, 1)))
+    for number, spec in enumerate(specs, 1):
+        with open(os.path.join(directory, f"synthetic_{number:0{width}d}_{spec['kind']}.py"), 'w') as f:
+            f.write(bot_source(spec))
+    return directory
@@ -0,0 +1,117 @@
+"""Re-test bots whenever their files change.
+
+    watcher = BotWatcher(["bots/user-created"], opponent_paths)
+    watcher.run(lambda report: print(format_report(report)))
+
+The watcher polls the modification times of the watched bot files and of the
+opponents (directories are expanded to the bot files they contain). Every new or
+changed bot file is evaluated against the opponents with a BatchEvaluator, whose
+workers reload only the changed module. When an opponent changes, the bots tested
+before are evaluated again; results are cached per pair of file contents, so only
+the matches against that opponent are played again. Evaluations use a fixed seed, so
+the score delta against the previous version comes from the code change and not from
+random bots.
+
+A report is a dict with path, and either error (the file could not be loaded) or
+result (see simulation.batch_eval), previous (the last result of the same file, or
+None) and delta (change of the average score, or None).
+"""
+import os
+import time
+from simulation.batch_eval import BatchEvaluator, format_result
+
+
+def bot_files(paths):
+    """Expand directories into the bot files they contain (skipping __init__ etc.)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path))
+                         if name.endswith('.py') and not name.startswith('__'))
+        else:
+            files.append(path)
+    return files
+
+
+class BotWatcher:
+    def __init__(self, paths, opponent_paths, evaluator=None, config=None, interval=0.25, seed=0):
+        self.paths = list(paths)
+        self.opponent_paths = list(opponent_paths)  # May be replaced between polls
+        self.evaluator = evaluator or BatchEvaluator(config=config)
+        self.config = config
+        self.interval = interval
+        self.seed = seed
+        self.results = {}  # Bot path -> result of its last evaluation
+        self.cache = {}    # Match results by file contents, see BatchEvaluator.evaluate
+        self._stamps = {}  # Bot path -> (mtime, size) when last seen
+
+    def changed_files(self, files):
+        """Return the files that are new or changed since they were last checked."""
+        changed = []
+        for path in files:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Deleted (or being replaced) since the directory was listed
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._stamps.get(path) != stamp:
+                self._stamps[path] = stamp
+                changed.append(path)
+        return changed
+
+    def poll(self):
+        """Evaluate every new or changed bot and, if an opponent changed, every bot tested before.
+
+        Returns the reports of the evaluations.
+        """
+        watched = bot_files(self.paths)
+        opponents = bot_files(self.opponent_paths)
+        changed = set(self.changed_files(watched + [path for path in opponents if path not in watched]))
+        opponent_changed = any(path in changed for path in opponents)
+        return [self.evaluate(path, opponents) for path in watched
+                if path in changed or (opponent_changed and path in self.results)]
+
+    def evaluate(self, path, opponents=None):
+        if opponents is None:
+            opponents = bot_files(self.opponent_paths)
+        opponents = [opponent for opponent in opponents if os.path.abspath(opponent) != os.path.abspath(path)]
+        try:
+            result = self.evaluator.evaluate(path, opponents, config=self.config, seed=self.seed, cache=self.cache)
+        except (ValueError, OSError) as e:
+            return {'path': path, 'error': str(e)}
+        previous = self.results.get(path)
+        self.results[path] = result
+        delta = result['average_score'] - previous['average_score'] if previous else None
+        return {'path': path, 'result': result, 'previous': previous, 'delta': delta}
+
+    def run(self, callback, stop=None):
+        """Poll until stop() returns true (forever by default), calling callback(report) for every evaluation."""
+        while not (stop and stop()):
+            for report in self.poll():
+                callback(report)
+            time.sleep(self.interval)
+
+    def close(self):
+        self.evaluator.close()
+
+
+def format_report(report):
+    """Render a report: the score changes per opponent followed by the full result."""
+    name = os.path.basename(report['path'])
+    if 'error' in report:
+        return f"{name}: could not be loaded\n{report['error']}"
+
+    result, previous = report['result'], report['previous']
+    lines = ["=" * 50, f"{name} at {time.strftime('%H:%M:%S')}"]
+    if previous is None:
+        lines.append(f"Average score: {result['average_score']:.1f}")
+    else:
+        lines.append(f"Average score: {result['average_score']:.1f} ({report['delta']:+.1f} vs previous version)")
+        before = {match['path']: match for match in previous['matches'] if 'score' in match}
+        for match in result['matches']:
+            old = before.get(match['path'])
+            if 'score' in match and old and match['score'] != old['score']:
+                lines.append(f"  vs {match['opponent']}: {match['score']} ({match['score'] - old['score']:+d})")
+    lines.append(f"{result['cached']} of {len(result['matches'])} matches reused, "
+                 f"evaluated in {result['seconds'] * 1000:.0f} ms")
+    return "\n".join(lines) + "\n\n" + format_result(result)
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from utils.moves import Move
-from utils.game_config import GameConfig
+from utils.game_config import GameConfig, RunConfig
 from typing import List
 
 class AbstractBot(ABC):
@@ -8,6 +8,19 @@ class AbstractBot(ABC):
         self.my_history = []
         self.opponent_history = []
         self.total_rounds = GameConfig.NUMBER_OF_ROUNDS
+        self.config = None  # RunConfig of the run, set by create()
+    
+    @classmethod
+    def create(cls, config: RunConfig = None) -> 'AbstractBot':
+        """Create a fresh bot for a run played with the given config (GameConfig defaults if None)"""
+        bot = cls()
+        bot.configure(config or RunConfig.from_game_config())
+        return bot
+    
+    def configure(self, config: RunConfig):
+        """Attach the run config to the bot"""
+        self.config = config
+        self.total_rounds = config.number_of_rounds
     
     @property
     @abstractmethod
@@ -18,6 +31,16 @@ class AbstractBot(ABC):
     def description(self) -> str:
         return ""  # Default empty description
     
+    def state_snapshot(self):
+        """Hashable snapshot of everything the bot's future moves depend on, or None.
+
+        Override only if the bot is deterministic and its moves depend on nothing but this
+        snapshot and the opponent's moves (not on the round number). Engines running with
+        fast_forward use it to detect a repeating joint state and skip the rest of the
+        match. None (the default) means the bot's state is unbounded or unknown.
+        """
+        return None
+    
     @abstractmethod
     def strategy(self, my_history: List[Move], opponent_history: List[Move], current_round: int, total_rounds: int) -> Move:
         pass
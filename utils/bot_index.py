@@ -0,0 +1,143 @@
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+from utils.abstract_bot import AbstractBot
+
+BOTS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', 'bots'))
+INDEX_PATH = os.path.join(BOTS_DIR, '.bot_index.json')
+
+
+class BotIndex:
+    """On-disk index of bot files: name, description, class name, path, mtime and content hash.
+
+    Entries are invalidated per file: an unchanged mtime reuses the entry as is, a changed
+    mtime with an unchanged hash only refreshes the mtime, anything else re-describes the file.
+    Files are described by parsing their source, so building the index does not run bot
+    code unless the name or description is not a plain string literal.
+    """
+
+    def __init__(self, index_path=INDEX_PATH):
+        self.index_path = index_path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, path):
+        """Return the entry for a bot file, or None if the file holds no bot."""
+        path = os.path.normpath(os.path.abspath(path))
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry['mtime'] == stat.st_mtime:
+            return entry if entry['class_name'] else None
+
+        content_hash = file_hash(path)
+        if entry is None or entry['hash'] != content_hash:
+            entry = describe_bot_file(path)
+            entry['hash'] = content_hash
+        entry['mtime'] = stat.st_mtime
+        self.entries[path] = entry
+        self.dirty = True
+        return entry if entry['class_name'] else None
+
+    def scan(self, directory):
+        """Return {path: entry} for every bot file in a directory."""
+        bots = {}
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if entry.is_file() and entry.name.endswith('.py') and not entry.name.startswith('__'):
+                try:
+                    bot = self.get(entry.path)
+                except (OSError, SyntaxError):
+                    continue
+                if bot:
+                    bots[entry.path] = bot
+        return bots
+
+    def save(self):
+        """Write the index back to disk if anything changed, dropping entries for deleted files."""
+        self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+        if not self.dirty:
+            return
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def describe_bot_file(path):
+    """Describe the bot class in a file, statically when possible."""
+    entry = {'path': path, 'class_name': None, 'name': None, 'description': ""}
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    # Like load_bot, take the alphabetically first AbstractBot subclass
+    classes = sorted((node for node in tree.body if isinstance(node, ast.ClassDef) and _is_bot_class(node)),
+                     key=lambda node: node.name)
+    if classes:
+        node = classes[0]
+        entry['class_name'] = node.name
+        entry['name'] = _property_literal(node, 'name')
+        description = _property_literal(node, 'description')
+        entry['description'] = description if description is not None else ""
+        if entry['name'] is not None and (description is not None or not _defines(node, 'description')):
+            return entry
+
+    # Dynamic name/description or an indirect subclass: run the module once
+    try:
+        bot = _load_bot_instance(path)
+    except Exception:
+        entry['class_name'] = None
+        return entry
+    entry.update(class_name=bot.__class__.__name__, name=bot.name, description=bot.description)
+    return entry
+
+
+def _is_bot_class(node):
+    for base in node.bases:
+        base_name = base.attr if isinstance(base, ast.Attribute) else getattr(base, 'id', None)
+        if base_name == 'AbstractBot':
+            return True
+    return False
+
+
+def _defines(node, attribute):
+    return any(isinstance(item, ast.FunctionDef) and item.name == attribute for item in node.body)
+
+
+def _property_literal(node, attribute):
+    """Return the string a property returns if its body is just `return "<literal>"`."""
+    for item in node.body:
+        if isinstance(item, ast.FunctionDef) and item.name == attribute:
+            body = item.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+                body = body[1:]  # Skip docstring
+            if (len(body) == 1 and isinstance(body[0], ast.Return)
+                    and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str)):
+                return body[0].value.value
+            return None
+    return None
+
+
+def _load_bot_instance(path):
+    spec = importlib.util.spec_from_file_location("bot_module", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    for item in dir(module):
+        obj = getattr(module, item)
+        if isinstance(obj, type) and issubclass(obj, AbstractBot) and not inspect.isabstract(obj):
+            return obj()
+    raise ValueError("No valid bot class found in file")
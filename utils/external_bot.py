@@ -0,0 +1,143 @@
+"""Bots that run as external programs, in any language, speaking a line protocol.
+
+    class MyProgramBot(ExternalBot):
+        command = ["./my_bot"]  # argv of the program, started once per simulator process
+
+        @property
+        def name(self):
+            return "My Program Bot"
+
+The program reads requests from stdin and writes replies to stdout, one ASCII line
+each. A request asks for the move of one game (one side of one match):
+
+    <game> <round> <total_rounds> <opponent's last move: C, D or - in round 1>
+
+and the reply names the game and the move:
+
+    <game> <C|D>
+
+A program serves many games at once, so it keeps its state per game id and may forget
+a game after answering its last round. Requests of different games can arrive before
+earlier ones are answered (see simulation.external_matches, which pipelines the
+requests of many concurrent matches), and replies may come in any order; a program
+should flush its replies when it has answered all the requests it has read. A
+program that exits, answers garbage or takes longer than `timeout` seconds forfeits
+the match. Anything it writes to stderr is passed through.
+"""
+import atexit
+import itertools
+import os
+import selectors
+import subprocess
+from typing import List
+from utils.abstract_bot import AbstractBot
+from utils.moves import Move
+
+# Game ids of the current process, unique across all external bots
+_GAME_IDS = itertools.count(1)
+
+# Running programs of the current process: (bot class, pid) -> ExternalProgram
+_PROGRAMS = {}
+
+
+class ExternalProgramError(Exception):
+    pass
+
+
+def format_request(game, current_round, total_rounds, opponent_last):
+    last = opponent_last.value if opponent_last is not None else '-'
+    return f"{game} {current_round} {total_rounds} {last}\n".encode('ascii')
+
+
+def parse_reply(line):
+    """Return (game, Move) from a reply line; raises ExternalProgramError if it is malformed."""
+    try:
+        game, move = line.split()
+        return int(game), Move(move.decode('ascii'))
+    except (ValueError, UnicodeDecodeError):
+        raise ExternalProgramError(f"invalid reply {line[:80]!r}")
+
+
+class ExternalProgram:
+    """A running bot program answering one request at a time (the simulators' engines)."""
+
+    def __init__(self, command, timeout):
+        self.timeout = timeout
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.process.stdout, selectors.EVENT_READ)
+        self.buffer = b""
+
+    def request(self, game, current_round, total_rounds, opponent_last):
+        try:
+            self.process.stdin.write(format_request(game, current_round, total_rounds, opponent_last))
+        except OSError as e:
+            raise ExternalProgramError(f"program exited ({e})")
+        while True:
+            line = self._read_line()
+            reply_game, move = parse_reply(line)
+            if reply_game == game:
+                return move  # Replies to other games are stale answers of forfeited ones
+
+    def _read_line(self):
+        while b"\n" not in self.buffer:
+            if not self.selector.select(self.timeout):
+                raise ExternalProgramError(f"no reply within {self.timeout} s")
+            chunk = os.read(self.process.stdout.fileno(), 65536)
+            if not chunk:
+                raise ExternalProgramError(f"program exited with code {self.process.wait()}")
+            self.buffer += chunk
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return line
+
+    def close(self):
+        self.selector.close()
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class ExternalBot(AbstractBot):
+    command = None  # argv of the bot program
+    timeout = 5.0   # Seconds a program may take for one reply
+
+    def __init__(self):
+        super().__init__()
+        self.game = next(_GAME_IDS)
+
+    @classmethod
+    def program(cls):
+        """The running program of this bot in the current process, started on first use."""
+        key = (cls, os.getpid())  # A forked worker must not share its parent's pipes
+        program = _PROGRAMS.get(key)
+        if program is None or program.process.poll() is not None:
+            program = _PROGRAMS[key] = ExternalProgram(cls.command, cls.timeout)
+        return program
+
+    @classmethod
+    def stop(cls):
+        program = _PROGRAMS.pop((cls, os.getpid()), None)
+        if program is not None:
+            program.close()
+
+    def strategy(self, my_history: List[Move], opponent_history: List[Move], current_round: int, total_rounds: int) -> Move:
+        opponent_last = opponent_history[-1] if opponent_history else None
+        try:
+            return self.program().request(self.game, current_round, total_rounds, opponent_last)
+        except ExternalProgramError:
+            self.stop()  # The next game starts a fresh program
+            raise
+
+
+@atexit.register
+def _stop_programs():
+    for (bot_class, pid), program in list(_PROGRAMS.items()):
+        if pid == os.getpid():
+            program.close()
+
+
+def is_external(bot_class):
+    return isinstance(bot_class, type) and issubclass(bot_class, ExternalBot)
@@ -1,3 +1,7 @@
+from dataclasses import asdict, dataclass, replace
+from utils.moves import Move
+
+
 class GameConfig:
     # Points awarded when both players cooperate
     MUTUAL_COOPERATION_POINTS = 4
@@ -15,4 +19,73 @@ class GameConfig:
     NUMBER_OF_ROUNDS = 200
 
     # Whether to add noise to number of rounds
-    ADD_NOISE = False
\ No newline at end of file
+    ADD_NOISE = False
+
+    # Probability that a bot's intended move is flipped (trembling hand; 0 for none)
+    MOVE_NOISE = 0.0
+
+    # Number of most recent runs kept in the logs directory (None keeps all)
+    LOG_KEEP_RUNS = None
+
+    # Maximum total size of the runs in the logs directory in bytes (None for no limit)
+    LOG_MAX_BYTES = None
+
+    # Whether finished run directories are packed into zip archives
+    PACK_LOGS = False
+
+    # Whether engines skip the rest of a match once two bots with bounded state
+    # (see AbstractBot.state_snapshot) repeat a joint state; results are unchanged
+    FAST_FORWARD = False
+
+    # Number of finished matches after which the tournament journal is synced to disk
+    CHECKPOINT_EVERY = 50
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """Immutable game settings for one run.
+
+    Simulations and bots read payoffs, round count and noise from here instead of
+    GameConfig, so runs with different settings can coexist in one process or be
+    shipped to worker processes. GameConfig provides the defaults.
+    """
+    mutual_cooperation_points: int
+    betrayal_points: int
+    betrayed_points: int
+    mutual_defection_points: int
+    number_of_rounds: int
+    add_noise: bool
+    seed: int = None  # Seed for noise draws; None draws from the global random state
+    fast_forward: bool = False  # Extrapolate matches between bots that fall into a cycle
+    move_noise: float = 0.0  # Probability of flipping each intended move, see simulation.move_noise
+
+    @classmethod
+    def from_game_config(cls, **overrides):
+        """Build a config from the current GameConfig values, with optional overrides."""
+        values = {
+            'mutual_cooperation_points': GameConfig.MUTUAL_COOPERATION_POINTS,
+            'betrayal_points': GameConfig.BETRAYAL_POINTS,
+            'betrayed_points': GameConfig.BETRAYED_POINTS,
+            'mutual_defection_points': GameConfig.MUTUAL_DEFECTION_POINTS,
+            'number_of_rounds': GameConfig.NUMBER_OF_ROUNDS,
+            'add_noise': GameConfig.ADD_NOISE,
+            'fast_forward': GameConfig.FAST_FORWARD,
+            'move_noise': GameConfig.MOVE_NOISE,
+        }
+        values.update(overrides)
+        return cls(**values)
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+    def as_dict(self):
+        return asdict(self)
+
+    def payoff_table(self):
+        """Return {(move1, move2): (points1, points2)} for all four move combinations."""
+        return {
+            (Move.COOPERATE, Move.COOPERATE): (self.mutual_cooperation_points, self.mutual_cooperation_points),
+            (Move.COOPERATE, Move.DEFECT): (self.betrayed_points, self.betrayal_points),
+            (Move.DEFECT, Move.COOPERATE): (self.betrayal_points, self.betrayed_points),
+            (Move.DEFECT, Move.DEFECT): (self.mutual_defection_points, self.mutual_defection_points),
+        }
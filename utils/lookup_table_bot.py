@@ -0,0 +1,122 @@
+"""Bots defined by a table of cooperation probabilities instead of code.
+
+A lookup-table bot looks at the last `memory` rounds (1 to 3) and cooperates with the
+probability its table gives for them. Keys are the moves of those rounds, oldest
+first, each round written as my move followed by the opponent's move:
+
+    class PavlovBot(LookupTableBot):
+        memory = 1
+        table = {"CC": 1, "CD": 0, "DC": 0, "DD": 1}  # Win-stay, lose-shift
+        initial = 1  # Cooperation probability of the first round
+
+        @property
+        def name(self):
+            return "Pavlov Bot"
+
+With memory 2 a key such as "CDCC" means two rounds ago I cooperated and the opponent
+defected, last round we both cooperated. Values are probabilities between 0 and 1 or
+Moves; a table of only 0s and 1s gives a deterministic bot. `initial` is the
+cooperation probability of the first `memory` rounds, a single value or one per round.
+"""
+import random
+from itertools import product
+from numbers import Real
+from typing import List
+from utils.abstract_bot import AbstractBot
+from utils.moves import Move
+
+MAX_MEMORY = 3
+
+
+def state_keys(memory):
+    """Table keys of a memory, in the order of the state index (see state_index)."""
+    return ["".join(pairs) for pairs in product(("CC", "CD", "DC", "DD"), repeat=memory)]
+
+
+def pair_code(my_move, opponent_move):
+    """0 for CC, 1 for CD, 2 for DC, 3 for DD (my move first)."""
+    return 2 * (my_move == Move.DEFECT) + (opponent_move == Move.DEFECT)
+
+
+def state_index(my_history, opponent_history, memory):
+    """Index of the last `memory` rounds: base-4 digits of the pair codes, most recent lowest."""
+    index = 0
+    for k in range(1, memory + 1):
+        index += pair_code(my_history[-k], opponent_history[-k]) * 4 ** (k - 1)
+    return index
+
+
+def _probability(value, what):
+    if isinstance(value, Move):
+        return 1 if value == Move.COOPERATE else 0
+    if isinstance(value, bool) or not isinstance(value, Real) or not 0 <= value <= 1:
+        raise ValueError(f"{what} must be a probability between 0 and 1 or a Move, not {value!r}")
+    return value
+
+
+class LookupTableBot(AbstractBot):
+    memory = 1
+    table = None    # {key: cooperation probability}, see the module docstring
+    initial = 1     # Cooperation probability of the first `memory` rounds, or one per round
+
+    # Filled from table and initial when a subclass is defined
+    cooperation = ()  # Cooperation probability per state index
+    opening = ()      # Cooperation probability per opening round
+    deterministic = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.table is None:
+            return  # Another abstract base
+        if not isinstance(cls.memory, int) or not 1 <= cls.memory <= MAX_MEMORY:
+            raise ValueError(f"{cls.__name__}.memory must be between 1 and {MAX_MEMORY}")
+
+        keys = state_keys(cls.memory)
+        table = {key.replace(" ", "").upper(): value for key, value in cls.table.items()}
+        missing = [key for key in keys if key not in table]
+        unknown = [key for key in table if key not in keys]
+        if missing or unknown:
+            raise ValueError(f"{cls.__name__}.table needs exactly the keys {', '.join(keys)}"
+                             + (f"; missing {', '.join(missing)}" if missing else "")
+                             + (f"; unknown {', '.join(unknown)}" if unknown else ""))
+        cls.cooperation = tuple(_probability(table[key], f"{cls.__name__}.table[{key!r}]") for key in keys)
+
+        initial = cls.initial if isinstance(cls.initial, (list, tuple)) else [cls.initial] * cls.memory
+        if len(initial) != cls.memory:
+            raise ValueError(f"{cls.__name__}.initial needs one value per opening round ({cls.memory})")
+        cls.opening = tuple(_probability(value, f"{cls.__name__}.initial") for value in initial)
+        cls.deterministic = all(p in (0, 1) for p in cls.cooperation + cls.opening)
+
+    @classmethod
+    def cooperation_probability(cls, my_history, opponent_history):
+        """Probability of cooperating in the round after the given histories."""
+        played = len(my_history)
+        if played < cls.memory:
+            return cls.opening[played]
+        return cls.cooperation[state_index(my_history, opponent_history, cls.memory)]
+
+    def state_snapshot(self):
+        # Opening moves depend on the round number, later ones only on the last rounds
+        if len(self.my_history) < self.memory or not self.deterministic:
+            return None
+        return state_index(self.my_history, self.opponent_history, self.memory)
+
+    def strategy(self, my_history: List[Move], opponent_history: List[Move], current_round: int, total_rounds: int) -> Move:
+        p = self.cooperation_probability(my_history, opponent_history)
+        if p >= 1 or (p > 0 and random.random() < p):
+            return self.cooperate
+        return self.defect
+
+
+def lookup_table_bot(name, table, initial=1, memory=None, description=""):
+    """Create a LookupTableBot subclass at runtime; memory defaults to the length of the keys."""
+    if memory is None:
+        memory = len(next(iter(table)).replace(" ", "")) // 2
+    class_name = "".join(part for part in name.title() if part.isalnum()) or "LookupTable"
+    return type(class_name, (LookupTableBot,), {
+        'memory': memory,
+        'table': dict(table),
+        'initial': initial,
+        'name': property(lambda self: name),
+        'description': property(lambda self: description),
+    })